@@ -0,0 +1,90 @@
+from datetime import datetime
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QAbstractItemView, QHeaderView
+)
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import pyqtSignal
+
+# Only the newest active alerts are listed; the summary still counts all of them
+MAX_ALERT_ROWS = 1000
+SEVERITY_COLORS = {"critical": "#DC3545", "warning": "#FF751A"}
+
+
+class AlertDock(QDockWidget):
+    # Non-modal list of active alerts, newest first. Emits the lockerId of a double-clicked alert.
+    lockerActivated = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__("Alerts", parent)
+        self.setObjectName("alert_dock")
+        # {(lockerId, rule): event}, oldest first
+        self.active = {}
+        contents = QWidget()
+        layout = QVBoxLayout(contents)
+        header_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.btn_dismiss = QPushButton("Dismiss All")
+        self.btn_dismiss.setToolTip("Hide the listed alerts until they are raised again")
+        self.btn_dismiss.clicked.connect(self.dismiss_all)
+        header_layout.addWidget(self.summary_label, 1)
+        header_layout.addWidget(self.btn_dismiss)
+        layout.addLayout(header_layout)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Time", "Locker ID", "Severity", "Alert"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        # Columns are sized once per refresh; ResizeToContents would re-measure every row on each setItem
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(lambda row, column: self.lockerActivated.emit(self.table.item(row, 1).text()))
+        layout.addWidget(self.table)
+        self.setWidget(contents)
+        self.refresh()
+
+    def add_events(self, events):
+        for event in events:
+            key = (event["lockerId"], event["rule"])
+            self.active.pop(key, None)
+            if event["raised"]:
+                self.active[key] = event
+        if events:
+            self.refresh()
+
+    def forget(self, locker_ids):
+        locker_ids = set(locker_ids)
+        keys = [key for key in self.active if key[0] in locker_ids]
+        for key in keys:
+            del self.active[key]
+        if keys:
+            self.refresh()
+
+    def dismiss_all(self):
+        self.active.clear()
+        self.refresh()
+
+    def refresh(self):
+        critical = sum(1 for event in self.active.values() if event["severity"] == "critical")
+        if not self.active:
+            self.summary_label.setText("No active alerts")
+        else:
+            self.summary_label.setText(f"{len(self.active)} active alerts ({critical} critical)")
+        events = list(self.active.values())[-MAX_ALERT_ROWS:]
+        events.reverse()
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(events))
+        for row, event in enumerate(events):
+            values = [
+                datetime.fromtimestamp(event["time"]).strftime("%Y-%m-%d %H:%M:%S"),
+                event["lockerId"], event["severity"].capitalize(), event["message"]
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 2:
+                    item.setForeground(QColor(SEVERITY_COLORS.get(event["severity"], "#595959")))
+                self.table.setItem(row, column, item)
+        for column in range(3):
+            self.table.resizeColumnToContents(column)
+        self.table.setUpdatesEnabled(True)
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import logging
+from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_WARNING = "warning"
+SEVERITY_CRITICAL = "critical"
+# A rule is held back on lockers where a rule of higher rank on the same field is active
+SEVERITY_RANKS = {SEVERITY_WARNING: 0, SEVERITY_CRITICAL: 1}
+
+FIELDS = ("battery", "status", "lightStatus", "age")
+OPERATORS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal,
+}
+
+DEFAULT_RULES = [
+    {"name": "battery_critical", "field": "battery", "op": "<", "value": 5, "clear": 8,
+     "severity": SEVERITY_CRITICAL, "message": "Battery critical ({value:.0f}%)"},
+    {"name": "battery_low", "field": "battery", "op": "<", "value": 20, "clear": 25,
+     "message": "Battery low ({value:.0f}%)"},
+    {"name": "stuck_unlocked", "field": "status", "op": "==", "value": "unlocked", "hold": 30 * 60,
+     "message": "Unlocked for more than 30 minutes"},
+    {"name": "stale", "field": "age", "op": ">", "value": 60 * 60,
+     "message": "No update for {hours:.1f} hours"},
+]
+
+
+def parse_timestamp(value):
+    # updatedAt as epoch seconds, or NaN when missing or unreadable
+    if isinstance(value, (int, float)):
+        # Numeric timestamps in milliseconds are common in JSON APIs
+        return value / 1000 if value > 1e11 else float(value)
+    if not isinstance(value, str) or not value:
+        return np.nan
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return np.nan
+
+
+def load_rules(path=None):
+    # Rules come from the JSON file named by LOCKER_ALERT_RULES, or the defaults
+    path = path or os.environ.get("LOCKER_ALERT_RULES")
+    if not path:
+        return [AlertRule(**rule) for rule in DEFAULT_RULES]
+    with open(path, "r", encoding="utf-8") as rules_file:
+        return [AlertRule(**rule) for rule in json.load(rules_file)]
+
+
+class AlertRule:
+    # A condition "field op value" on one locker field. It fires once the condition has held for
+    # `hold` seconds and, for hysteresis, stays active until "field op clear" stops holding, so a
+    # reading hovering around the threshold does not raise and clear alerts over and over.
+    def __init__(self, name, field, op, value, clear=None, hold=0, severity=SEVERITY_WARNING, message=None):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown alert field '{field}', expected one of {', '.join(FIELDS)}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown alert operator '{op}', expected one of {', '.join(OPERATORS)}")
+        self.name = name
+        self.field = field
+        self.op = op
+        self.value = value
+        self.clear = value if clear is None else clear
+        self.hold = hold
+        self.severity = severity
+        self.message = message or f"{field} {op} {value}"
+
+    def time_based(self):
+        # Such rules can fire on lockers whose record did not change, so they see every locker
+        return self.hold > 0 or self.field == "age"
+
+    def compile(self, engine):
+        # A vectorized predicate (values, active) -> holding. String fields compare the engine's
+        # integer codes, so every rule runs as one numpy comparison over all its lockers.
+        compare = OPERATORS[self.op]
+        if self.field in ("status", "lightStatus"):
+            value, clear = engine.code(self.value), engine.code(self.clear)
+        else:
+            value, clear = float(self.value), float(self.clear)
+        if value == clear:
+            return lambda values, active: compare(values, value)
+        return lambda values, active: np.where(active, compare(values, clear), compare(values, value))
+
+    def describe(self, value):
+        if self.field in ("status", "lightStatus"):
+            return self.message
+        return self.message.format(value=value, hours=value / 3600, minutes=value / 60)
+
+
+class AlertEngine:
+    # Evaluates alert rules incrementally. Field values are kept in per-locker slots of numpy
+    # columns; each run copies in only the lockers the store reports as changed, evaluates the
+    # value rules on those slots and the time-based rules (hold, staleness) on every slot.
+    # Only transitions are reported: an alert is raised once and cleared once. Of the rules on one
+    # field, only the most severe active one shows, so a battery at 3% is critical but not also low.
+    def __init__(self, rules=None, initial_slots=1024):
+        self.rules = list(load_rules() if rules is None else rules)
+        self._slot_of = {}
+        self._locker_of = []
+        self._free_slots = []
+        self._codes = {None: 0}
+        self.battery = np.full(initial_slots, np.nan)
+        self.status = np.zeros(initial_slots, dtype=np.int32)
+        self.light_status = np.zeros(initial_slots, dtype=np.int32)
+        self.updated = np.full(initial_slots, np.nan)
+        self.used = np.zeros(initial_slots, dtype=bool)
+        # Per rule: whether the alert is active, and since when its condition has held (NaN if not)
+        self.active = np.zeros((len(self.rules), initial_slots), dtype=bool)
+        self.since = np.full((len(self.rules), initial_slots), np.nan)
+        self._predicates = [rule.compile(self) for rule in self.rules]
+        # Rules are evaluated most severe first, each after the rules that outrank it
+        rank = [SEVERITY_RANKS.get(rule.severity, 0) for rule in self.rules]
+        self._order = sorted(range(len(self.rules)), key=lambda index: -rank[index])
+        self._outranking = [
+            [other for other in range(len(self.rules)) if self.rules[other].field == rule.field and rank[other] > rank[index]]
+            for index, rule in enumerate(self.rules)
+        ]
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self._codes)
+        return code
+
+    def _grow(self):
+        size = len(self.used) * 2
+        for name in ("battery", "status", "light_status", "updated", "used"):
+            column = getattr(self, name)
+            grown = np.full(size, np.nan) if column.dtype == np.float64 else np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        active = np.zeros((len(self.rules), size), dtype=bool)
+        active[:, :self.active.shape[1]] = self.active
+        since = np.full((len(self.rules), size), np.nan)
+        since[:, :self.since.shape[1]] = self.since
+        self.active, self.since = active, since
+
+    def slot(self, locker_id):
+        slot = self._slot_of.get(locker_id)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._locker_of)
+                self._locker_of.append(None)
+                if slot >= len(self.used):
+                    self._grow()
+            self._slot_of[locker_id] = slot
+            self._locker_of[slot] = locker_id
+            self.used[slot] = True
+        return slot
+
+    def remove(self, locker_ids):
+        # Forget lockers without reporting their alerts as cleared
+        for locker_id in locker_ids:
+            slot = self._slot_of.pop(locker_id, None)
+            if slot is None:
+                continue
+            self._locker_of[slot] = None
+            self._free_slots.append(slot)
+            self.used[slot] = False
+            self.active[:, slot] = False
+            self.since[:, slot] = np.nan
+
+    def prune(self, store):
+        self.remove([locker_id for locker_id in self._slot_of if store.row_of(locker_id) is None])
+
+    def process(self, store, now=None):
+        # Returns the alert transitions since the last run, raised and cleared
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        changed = []
+        for locker_id in store.take_changed():
+            row = store.row_of(locker_id)
+            if row is None:
+                continue
+            slot = self.slot(locker_id)
+            self.battery[slot] = store.battery[row]
+            self.status[slot] = self.code(store.status[row])
+            self.light_status[slot] = self.code(store.light_status[row])
+            extras = store.extras[row]
+            self.updated[slot] = parse_timestamp(extras.get("updatedAt")) if extras else np.nan
+            changed.append(slot)
+        changed = np.array(changed, dtype=np.int64)
+        every = np.flatnonzero(self.used)
+
+        events = []
+        for index in self._order:
+            rule = self.rules[index]
+            outranking = self._outranking[index]
+            # Lockers whose outranking alerts may have changed are checked again as well
+            time_based = rule.time_based() or any(self.rules[other].time_based() for other in outranking)
+            slots = every if time_based else changed
+            if len(slots):
+                outranked = self.active[outranking][:, slots].any(axis=0) if outranking else None
+                events.extend(self._evaluate(index, rule, self._predicates[index], slots, now, outranked))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(f"Alert rules checked {len(changed)} changed of {len(every)} lockers in {elapsed_ms:.1f} ms, {len(events)} transitions")
+        return events
+
+    def _values(self, rule, slots, now):
+        if rule.field == "battery":
+            return self.battery[slots]
+        if rule.field == "status":
+            return self.status[slots]
+        if rule.field == "lightStatus":
+            return self.light_status[slots]
+        return now - self.updated[slots]
+
+    def _evaluate(self, index, rule, predicate, slots, now, outranked=None):
+        values = self._values(rule, slots, now)
+        active = self.active[index, slots]
+        holding = predicate(values, active)
+        since = self.since[index, slots]
+        since = np.where(holding, np.where(np.isnan(since), now, since), np.nan)
+        self.since[index, slots] = since
+        # Active alerts stay up while the clear condition holds; new ones wait out the hold time
+        fire = holding & (active | (now - since >= rule.hold))
+        if outranked is not None:
+            fire &= ~outranked
+        self.active[index, slots] = fire
+        events = []
+        for position in np.flatnonzero(fire != active).tolist():
+            raised = bool(fire[position])
+            value = values[position].item()
+            events.append({
+                "lockerId": self._locker_of[slots[position]],
+                "rule": rule.name,
+                "severity": rule.severity,
+                "message": rule.describe(value) if raised else f"{rule.name.replace('_', ' ').capitalize()} cleared",
+                "raised": raised,
+                "time": now,
+            })
+        return events
+
+    def active_alerts(self):
+        # (lockerId, rule) of every active alert
+        for index, rule in enumerate(self.rules):
+            for slot in np.flatnonzero(self.active[index]).tolist():
+                yield self._locker_of[slot], rule
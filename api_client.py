@@ -0,0 +1,164 @@
+import os
+import random
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from diagnostics import timed
+from json_stream import JsonArrayReader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://locker-api.vercel.app"
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 15)
+# /locker/all is decoded while it downloads, this many bytes at a time. Records are handed on
+# in batches that start small, so the first rows show quickly, and double up to the maximum.
+STREAM_CHUNK_SIZE = 1 << 16
+FIRST_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 32000
+# Values the API accepts for status and lightStatus, and the status each command leads to
+STATUS_VALUES = ("locked", "unlocked")
+LIGHT_STATUS_VALUES = ("on", "off")
+COMMAND_STATUS = {"lock": "locked", "unlock": "unlocked"}
+
+
+class LockerApiError(Exception):
+    pass
+
+
+class JitteredRetry(Retry):
+    # Spread retries from many clients out instead of having them hit the server in lockstep
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return random.uniform(0, backoff)
+
+
+class LockerApiClient:
+    def __init__(self, base_url=None, timeout=DEFAULT_TIMEOUT, retries=3, backoff_factor=0.5, pool_size=16, page_size=None):
+        self.base_url = (base_url or os.environ.get("LOCKER_API_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        # Records per /locker/all page to ask for; 0 leaves paging to the server
+        self.page_size = page_size or int(os.environ.get("LOCKER_PAGE_SIZE") or 0)
+        # POST is left out on purpose: a retried command or register could run twice.
+        # Connection errors are still retried for every method since nothing was sent.
+        retry = JitteredRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "PUT", "DELETE"]),
+            raise_on_status=False
+        )
+        # One pooled keep-alive session, so only the first call pays the TCP+TLS handshake
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        logger.debug(f"LockerApiClient using {self.base_url}")
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, timeout=None, **kwargs):
+        # Timed per endpoint without the locker id, e.g. "api PUT /locker/update"
+        endpoint = "/".join(path.split("/")[:3])
+        with timed(f"api {method} {endpoint}"):
+            response = self.session.request(method, self.url(path), timeout=timeout or self.timeout, **kwargs)
+        response.raise_for_status()
+        with timed("json decode"):
+            result = response.json()
+        if not result.get("success"):
+            raise LockerApiError(result.get("message", f"{method} {path} was not successful"))
+        return result
+
+    def get_all_lockers(self, timeout=None):
+        return self.request("GET", "/locker/all", timeout=timeout)
+
+    def get_changed_lockers(self, etag=None, last_modified=None, watermark=None, timeout=None, on_lockers=None):
+        # Conditional GET: returns None on 304 Not Modified, otherwise the payload plus new validators.
+        # Servers that understand updatedSince answer with only the changed records and mark the
+        # payload "partial" (optionally listing "deletedIds"); others just send the full fleet.
+        # The body is decoded record by record while it downloads. With on_lockers, records are
+        # passed on in batches as they arrive and "lockers" is None instead of a list.
+        # A server that pages its answer sets "nextCursor", which is followed with ?cursor= until
+        # it is missing; page_size asks for pages of that size with ?limit=.
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        params = {}
+        if watermark:
+            params["updatedSince"] = watermark
+        if self.page_size:
+            params["limit"] = self.page_size
+        result = {"lockers": None if on_lockers else [], "partial": False, "deletedIds": []}
+        emit = on_lockers or result["lockers"].extend
+        cursor = None
+        batch_size = FIRST_BATCH_SIZE
+        while True:
+            first_page = cursor is None
+            with timed("api GET /locker/all"):
+                response = self.session.get(
+                    self.url("/locker/all"), headers=headers if first_page else None,
+                    params=dict(params, cursor=cursor) if cursor else params or None,
+                    timeout=timeout or self.timeout, stream=True
+                )
+            with response:
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+                reader = JsonArrayReader(response.iter_content(STREAM_CHUNK_SIZE), key="lockers")
+                with timed("json stream /locker/all"):
+                    batch = []
+                    for locker in reader:
+                        batch.append(locker)
+                        if len(batch) >= batch_size:
+                            emit(batch)
+                            batch = []
+                            batch_size = min(batch_size * 2, MAX_BATCH_SIZE)
+                    if batch:
+                        emit(batch)
+            members = reader.members
+            if not members.get("success"):
+                raise LockerApiError(members.get("message", "GET /locker/all was not successful"))
+            if not reader.found:
+                raise LockerApiError("GET /locker/all returned no lockers")
+            if first_page:
+                result.update(
+                    partial=bool(members.get("partial")),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            result["deletedIds"].extend(members.get("deletedIds", []))
+            cursor = members.get("nextCursor")
+            if not cursor:
+                return result
+
+    def send_command(self, locker_id, command, timeout=None):
+        payload = {
+            "id": locker_id,
+            "command": command
+        }
+        return self.request("POST", "/locker/command", json=payload, timeout=timeout)
+
+    def lock_locker(self, locker_id, timeout=None):
+        return self.send_command(locker_id, "lock", timeout=timeout)
+
+    def unlock_locker(self, locker_id, timeout=None):
+        return self.send_command(locker_id, "unlock", timeout=timeout)
+
+    def update_locker(self, locker_id, data, timeout=None):
+        return self.request("PUT", f"/locker/update/{locker_id}", json=data, timeout=timeout)
+
+    def register_locker(self, timeout=None):
+        return self.request("POST", "/locker/register", timeout=timeout)
+
+    def delete_locker(self, locker_id, timeout=None):
+        return self.request("DELETE", f"/locker/delete/{locker_id}", timeout=timeout)
+
+    def close(self):
+        self.session.close()
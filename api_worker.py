@@ -0,0 +1,157 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+    partial = pyqtSignal(object)
+    done = pyqtSignal()
+
+
+class TaskContext:
+    # Handed to long-running task functions so they can report progress and stop early
+    def __init__(self, signals):
+        self._signals = signals
+        self.cancelled = False
+
+    def report(self, done, total):
+        if not self.cancelled:
+            self._signals.progress.emit(done, total)
+
+    def publish(self, result):
+        # Part of the result, delivered on the GUI thread before the task finishes
+        if not self.cancelled:
+            self._signals.partial.emit(result)
+
+
+class ApiTask(QRunnable):
+    def __init__(self, fn, args, kwargs, key=None, with_context=False):
+        super().__init__()
+        # The runner keeps its own reference until the task is done
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.signals = TaskSignals()
+        self.context = TaskContext(self.signals)
+        self.with_context = with_context
+        # Set once the result or error has been emitted; later joiners would miss it
+        self.emit_lock = threading.Lock()
+        self.emitted = False
+        # (signal, callback) pairs already connected, so a joiner never gets a result twice
+        self.connected = set()
+
+    @property
+    def cancelled(self):
+        return self.context.cancelled
+
+    def cancel(self):
+        self.context.cancelled = True
+
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            if self.with_context:
+                result = self.fn(*self.args, context=self.context, **self.kwargs)
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+            # A cancelled task may still finish its request, but nobody wants the result anymore
+            if not self.cancelled:
+                with self.emit_lock:
+                    self.emitted = True
+                    self.signals.finished.emit(result)
+        except Exception as e:
+            if not self.cancelled:
+                logger.error(f"Background task {self.key or self.fn.__name__} failed: {str(e)}")
+                with self.emit_lock:
+                    self.emitted = True
+                    self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
+
+
+class ApiTaskRunner(QObject):
+    # Runs blocking API calls on a thread pool and delivers results on the GUI thread
+    busyChanged = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._tasks = set()
+        self._keyed = {}
+        self._cancelled = set()
+
+    def submit(self, fn, *args, key=None, on_result=None, on_error=None, on_progress=None, on_partial=None, with_context=False, **kwargs):
+        # Repeated submits with the same key join the request already in flight, unless its
+        # result is already on the way to the earlier callers; then they get a fresh request
+        if key is not None and key in self._keyed:
+            task = self._keyed[key]
+            with task.emit_lock:
+                if not task.emitted:
+                    logger.debug(f"Coalesced task {key} into the request already in flight")
+                    self._connect(task, on_result, on_error, on_progress, on_partial)
+                    return task
+
+        task = ApiTask(fn, args, kwargs, key=key, with_context=with_context)
+        self._connect(task, on_result, on_error, on_progress, on_partial)
+        task.signals.done.connect(lambda t=task: self._task_done(t))
+        was_busy = self.is_busy()
+        self._tasks.add(task)
+        if key is not None:
+            self._keyed[key] = task
+        self.pool.start(task)
+        if not was_busy:
+            self.busyChanged.emit(True)
+        return task
+
+    def _connect(self, task, on_result, on_error, on_progress, on_partial=None):
+        signals = task.signals
+        for name, callback in (("finished", on_result), ("failed", on_error), ("progress", on_progress), ("partial", on_partial)):
+            if callback and (name, callback) not in task.connected:
+                task.connected.add((name, callback))
+                getattr(signals, name).connect(callback)
+
+    def _task_done(self, task):
+        self._cancelled.discard(task)
+        self._forget(task)
+
+    def _forget(self, task):
+        if task not in self._tasks:
+            return
+        self._tasks.discard(task)
+        if task.key is not None and self._keyed.get(task.key) is task:
+            del self._keyed[task.key]
+        if not self.is_busy():
+            self.busyChanged.emit(False)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def is_running(self, key):
+        return key in self._keyed
+
+    def cancel(self, task):
+        task.cancel()
+        for signal in (task.signals.finished, task.signals.failed, task.signals.progress, task.signals.partial):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+        # Tasks still waiting in the queue can be dropped outright; running ones are
+        # kept alive until their thread returns, but no longer count as busy
+        if task in self._tasks and not self.pool.tryTake(task):
+            self._cancelled.add(task)
+        self._forget(task)
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            self.cancel(task)
+        logger.debug("Cancelled all background tasks")
@@ -0,0 +1,216 @@
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+STATUSES = ["locked", "unlocked"]
+LIGHT_STATUSES = ["on", "off"]
+
+
+def timestamp():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def make_locker(number, updated_at):
+    # Lockers spread over a few hundred kilometres around Mataram so spatial queries have work to do
+    return {
+        "_id": f"{number:024x}",
+        "lockerId": f"LKR{number:07d}",
+        "status": STATUSES[number % 2],
+        "lightStatus": LIGHT_STATUSES[number % 3 == 0],
+        "batteryPercentage": float(number * 37 % 101),
+        "latitude": -8.58 + (number % 997) * 0.003,
+        "longitude": 116.1 + (number // 997 % 997) * 0.003,
+        "isRunCommand": False,
+        "createdAt": updated_at,
+        "updatedAt": updated_at,
+    }
+
+
+class FakeLockerApi:
+    # In-process stand-in for locker-api with the endpoints the app uses. It answers
+    # conditional GETs with an ETag and honours updatedSince with partial payloads like the
+    # real API may, and pages with ?limit= and ?cursor= (answering "nextCursor") when asked.
+    # Every request waits `latency` seconds first. POST /__bench/mutate changes
+    # a fraction of the fleet so benchmarks can measure incremental refreshes.
+    def __init__(self, size=1000, latency=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.version = 0
+        self.deleted = []
+        created = timestamp()
+        self.lockers = {}
+        for number in range(size):
+            locker = make_locker(number, created)
+            self.lockers[locker["lockerId"]] = locker
+        self.next_number = size
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="FakeLockerApi", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def touch(self, locker):
+        locker["updatedAt"] = timestamp()
+        self.version += 1
+
+    def mutate(self, fraction):
+        # Drain batteries and flip lights on a random sample of lockers
+        with self.lock:
+            sample = random.sample(list(self.lockers.values()), max(1, int(len(self.lockers) * fraction)))
+            for locker in sample:
+                locker["batteryPercentage"] = max(0.0, locker["batteryPercentage"] - 1)
+                locker["lightStatus"] = "off" if locker["lightStatus"] == "on" else "on"
+                self.touch(locker)
+            return [locker["lockerId"] for locker in sample]
+
+    def handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def not_found(self):
+                self.send_json({"success": False, "message": "Locker not found"}, 404)
+
+            def do_GET(self):
+                time.sleep(api.latency)
+                url = urlsplit(self.path)
+                if url.path != "/locker/all":
+                    return self.not_found()
+                with api.lock:
+                    etag = f'"{api.version}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    query = parse_qs(url.query)
+                    since = query.get("updatedSince", [None])[0]
+                    if since:
+                        lockers = [locker for locker in api.lockers.values() if locker["updatedAt"] > since]
+                        deleted = [locker_id for locker_id, deleted_at in api.deleted if deleted_at > since]
+                        payload = {"success": True, "lockers": lockers, "partial": True, "deletedIds": deleted}
+                    else:
+                        payload = {"success": True, "lockers": list(api.lockers.values())}
+                    if "limit" in query:
+                        # The cursor is simply the offset of the next page
+                        start = int(query.get("cursor", ["0"])[0])
+                        end = start + int(query["limit"][0])
+                        if end < len(payload["lockers"]):
+                            payload["nextCursor"] = str(end)
+                        payload["lockers"] = payload["lockers"][start:end]
+                    body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                time.sleep(api.latency)
+                url = urlsplit(self.path)
+                data = self.read_json()
+                if url.path == "/__bench/mutate":
+                    changed = api.mutate(float(data.get("fraction", 0.01)))
+                    return self.send_json({"success": True, "lockerIds": changed})
+                if url.path == "/locker/command":
+                    with api.lock:
+                        locker = api.lockers.get(data.get("id"))
+                        if locker is None:
+                            return self.not_found()
+                        locker["status"] = {"lock": "locked", "unlock": "unlocked"}.get(data.get("command"), locker["status"])
+                        locker["isRunCommand"] = True
+                        api.touch(locker)
+                        return self.send_json({"success": True, "message": "Command sent", "locker": dict(locker)})
+                if url.path == "/locker/register":
+                    with api.lock:
+                        locker = make_locker(api.next_number, timestamp())
+                        api.next_number += 1
+                        api.lockers[locker["lockerId"]] = locker
+                        api.version += 1
+                        return self.send_json({"success": True, "message": "Locker registered", "locker": dict(locker)})
+                self.not_found()
+
+            def do_PUT(self):
+                time.sleep(api.latency)
+                prefix = "/locker/update/"
+                if not self.path.startswith(prefix):
+                    return self.not_found()
+                data = self.read_json()
+                with api.lock:
+                    locker = api.lockers.get(self.path[len(prefix):])
+                    if locker is None:
+                        return self.not_found()
+                    locker.update({key: value for key, value in data.items() if key not in ("_id", "lockerId")})
+                    api.touch(locker)
+                    return self.send_json({"success": True, "message": "Locker updated", "locker": dict(locker)})
+
+            def do_DELETE(self):
+                time.sleep(api.latency)
+                prefix = "/locker/delete/"
+                if not self.path.startswith(prefix):
+                    return self.not_found()
+                locker_id = self.path[len(prefix):]
+                with api.lock:
+                    if api.lockers.pop(locker_id, None) is None:
+                        return self.not_found()
+                    api.deleted.append((locker_id, timestamp()))
+                    api.version += 1
+                return self.send_json({"success": True, "message": "Locker deleted"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for locker-api")
+    parser.add_argument("--size", type=int, default=1000, help="number of lockers")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    api = FakeLockerApi(args.size, args.latency, args.host, args.port)
+    print(f"Serving {args.size} lockers at {api.url}, set LOCKER_API_URL={api.url}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
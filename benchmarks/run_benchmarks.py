@@ -0,0 +1,228 @@
+# Usage: python benchmarks/run_benchmarks.py [--sizes 1000,10000,100000] [--latency 0.05]
+# Starts the fake locker-api for each fleet size, runs LockerApp against it under offscreen Qt
+# in a separate process and saves timings and peak memory to benchmarks/results/<timestamp>.json.
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from fake_locker_api import FakeLockerApi
+
+DEFAULT_SIZES = "1000,10000,100000"
+SCENARIOS = ["startup", "first_rows", "full_refresh", "incremental_refresh", "bulk_command", "map_generation", "csv_export"]
+# Upper bound for one scenario waiting on the event loop
+SCENARIO_TIMEOUT = 600
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Worker:
+    # Runs LockerApp under offscreen Qt in this process against the fake API named by
+    # LOCKER_API_URL and prints one JSON line per finished scenario, so a crash in a later
+    # scenario still leaves the earlier results to the parent.
+    def __init__(self, args):
+        self.args = args
+        self.trace_memory = args.trace_memory
+        if self.trace_memory:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            tracemalloc.start()
+
+    def report(self, scenario, seconds=None, **extra):
+        result = {"scenario": scenario, "seconds": None if seconds is None else round(seconds, 4), "peak_rss_mb": peak_rss_mb()}
+        if self.trace_memory:
+            result["python_peak_mb"] = round(self.tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            self.tracemalloc.reset_peak()
+        result.update(extra)
+        print(json.dumps(result), flush=True)
+
+    def wait_until(self, condition, timeout=SCENARIO_TIMEOUT):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Timed out waiting for the app")
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def run(self):
+        sys.path.insert(0, REPO_DIR)
+        os.chdir(REPO_DIR)
+        from PyQt5.QtCore import QCoreApplication, Qt, QItemSelection, QItemSelectionModel
+        from PyQt5.QtWidgets import QApplication, QMessageBox
+        QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+        self.app = QApplication([])
+        # Nobody is there to close message boxes, so they are answered right away
+        for name in ("information", "warning", "critical"):
+            setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.Ok))
+        import main
+        from logging_setup import setup_logging
+        setup_logging()
+
+        size = self.args.size
+        started = time.perf_counter()
+        window = main.LockerApp()
+        window.show()
+        self.app.processEvents()
+        self.report("startup", time.perf_counter() - started)
+        # Rows show up while /locker/all streams in; the refresh is done once it is applied and cached
+        self.wait_until(lambda: len(window.locker_store) > 0)
+        self.report("first_rows", time.perf_counter() - started, lockers=len(window.locker_store))
+        self.wait_until(lambda: len(window.locker_store) >= size and not window.api_runner.is_running("refresh"))
+        self.report("full_refresh", time.perf_counter() - started, lockers=len(window.locker_store))
+
+        # Change a fraction of the fleet on the server, then time one refresh until it is applied
+        request = urllib.request.Request(
+            f"{os.environ['LOCKER_API_URL']}/__bench/mutate", method="POST",
+            data=json.dumps({"fraction": self.args.mutate}).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            changed = json.load(response)["lockerIds"]
+        loaded = []
+        on_lockers_loaded = window.on_lockers_loaded
+        window.on_lockers_loaded = lambda data, quiet=False: loaded.append(on_lockers_loaded(data, quiet))
+        started = time.perf_counter()
+        window.get_all_lockers()
+        self.wait_until(lambda: loaded)
+        self.report("incremental_refresh", time.perf_counter() - started, changed=len(changed))
+        window.on_lockers_loaded = on_lockers_loaded
+
+        # Select the first rows and send them one bulk command
+        count = min(self.args.bulk_count, len(window.locker_store))
+        proxy = window.locker_proxy
+        window.table_lockers.selectionModel().select(
+            QItemSelection(proxy.index(0, 0), proxy.index(count - 1, proxy.columnCount() - 1)),
+            QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows
+        )
+        started = time.perf_counter()
+        window.bulk_send_command("unlock")
+        # Bulk commands go through the outbox; done once every entry is sent
+        self.wait_until(lambda: not any(window.outbox.counts().values()) and not window.api_runner.is_running("outbox"))
+        self.report("bulk_command", time.perf_counter() - started, lockers=count)
+
+        # Everything the fleet map does to fill the page: spatial index, area query, marker rows
+        # and the update sent to the map page. Needs QtWebEngine.
+        try:
+            started = time.perf_counter()
+            map_dialog = main.load_map_module()
+            dialog = map_dialog.FleetMapDialog(window.locker_model, window)
+            dialog.show()
+            dialog.area = (-90.0, -180.0, 90.0, 180.0)
+            dialog.show_area()
+            self.report("map_generation", time.perf_counter() - started, markers=len(dialog.engine.rows))
+            dialog.hide()
+        except Exception as e:
+            self.report("map_generation", error=f"{type(e).__name__}: {str(e)}")
+
+        from exporter import export_records
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lockers.csv")
+            started = time.perf_counter()
+            written = export_records(window.locker_store.snapshot(), path)
+            self.report("csv_export", time.perf_counter() - started, rows=written["rows"], megabytes=round(os.path.getsize(path) / (1024 * 1024), 2))
+
+        window.close()
+
+
+def run_size(args, size):
+    # A fresh fake API and a fresh worker process per fleet size, so peak memory is per size
+    api = FakeLockerApi(size, args.latency).start()
+    scenarios = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Everything the app writes or connects to stays in the temp dir and on the fake API,
+        # so a run never touches the user's cache, queued commands or push service
+        env = dict(
+            os.environ, LOCKER_API_URL=api.url, LOCKER_CACHE_PATH=os.path.join(directory, "cache.sqlite3"),
+            LOCKER_OUTBOX_PATH=os.path.join(directory, "outbox.sqlite3"), LOCKER_LOG_PATH=os.path.join(directory, "app.log"),
+            LOCKER_LOG_LEVEL="WARNING", QT_QPA_PLATFORM="offscreen"
+        )
+        for name in ("LOCKER_PUSH_URL", "LOCKER_TELEMETRY_SPILL"):
+            env.pop(name, None)
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker", "--size", str(size),
+            "--mutate", str(args.mutate), "--bulk-count", str(args.bulk_count)
+        ]
+        if args.trace_memory:
+            command.append("--trace-memory")
+        try:
+            process = subprocess.run(command, env=env, capture_output=True, text=True, timeout=SCENARIO_TIMEOUT * len(SCENARIOS))
+            output, errors, returncode = process.stdout, process.stderr, process.returncode
+        except subprocess.TimeoutExpired as e:
+            output, errors, returncode = e.stdout or "", "worker timed out", None
+        finally:
+            api.stop()
+    for line in output.splitlines():
+        if line.startswith("{"):
+            result = json.loads(line)
+            scenarios[result.pop("scenario")] = result
+    for scenario in SCENARIOS:
+        if scenario not in scenarios:
+            scenarios[scenario] = {"error": f"worker exited with {returncode}: {errors.strip()[-500:]}"}
+    return {"size": size, "scenarios": scenarios}
+
+
+def print_table(results):
+    print(f"{'lockers':>8}  " + "  ".join(f"{scenario:>20}" for scenario in SCENARIOS))
+    for run in results["runs"]:
+        cells = []
+        for scenario in SCENARIOS:
+            result = run["scenarios"][scenario]
+            cells.append(f"{result['seconds'] * 1000:>17.0f} ms" if result.get("seconds") is not None else f"{'n/a':>20}")
+        print(f"{run['size']:>8}  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LockerApp against a local fake locker-api")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated fleet sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake API adds to every request")
+    parser.add_argument("--mutate", type=float, default=0.01, help="fraction of lockers changed for the incremental refresh")
+    parser.add_argument("--bulk-count", type=int, default=200, help="lockers sent one bulk command")
+    parser.add_argument("--trace-memory", action="store_true", help="also report the Python heap peak per scenario (slower)")
+    parser.add_argument("--output", help="JSON results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        Worker(args).run()
+        return
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": args.latency,
+        "mutate": args.mutate,
+        "bulk_count": args.bulk_count,
+        "runs": [],
+    }
+    for size in (int(value) for value in args.sizes.split(",")):
+        print(f"Benchmarking {size} lockers...", flush=True)
+        results["runs"].append(run_size(args, size))
+
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print_table(results)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
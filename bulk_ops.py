@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 16
+
+
+def run_concurrently(fn, items, max_workers=DEFAULT_CONCURRENCY, progress=None, stop_event=None):
+    # Run fn(item) for every item with at most max_workers calls in flight.
+    # Yields (item, result, error) as calls complete; stops submitting once stop_event is set.
+    items = iter(items)
+    total = None
+    if hasattr(items, "__length_hint__"):
+        total = items.__length_hint__()
+    done_count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        def fill():
+            while len(in_flight) < max_workers * 2:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                in_flight[executor.submit(fn, item)] = item
+
+        fill()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item = in_flight.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+                done_count += 1
+                if progress:
+                    progress(done_count, total if total is not None else done_count + len(in_flight))
+            fill()
+
+
+def bulk_command(client, locker_ids, command, max_workers=DEFAULT_CONCURRENCY, progress=None, stop_event=None):
+    summary = {
+        "command": command,
+        "requested": len(locker_ids),
+        "succeeded": [],
+        "failed": [],
+        "will_run": 0,
+        "will_not_run": 0,
+        "cancelled": 0,
+    }
+    send = lambda locker_id: client.send_command(locker_id, command)
+    for locker_id, result, error in run_concurrently(send, locker_ids, max_workers, progress, stop_event):
+        if error is not None:
+            summary["failed"].append((locker_id, str(error)))
+            continue
+        locker = result.get("locker") or {"lockerId": locker_id}
+        summary["succeeded"].append(locker)
+        if locker.get("isRunCommand"):
+            summary["will_run"] += 1
+        else:
+            summary["will_not_run"] += 1
+    summary["cancelled"] = summary["requested"] - len(summary["succeeded"]) - len(summary["failed"])
+    logger.debug(
+        f"Bulk '{command}': {len(summary['succeeded'])} succeeded, {len(summary['failed'])} failed, "
+        f"{summary['cancelled']} cancelled"
+    )
+    return summary
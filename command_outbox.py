@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+import logging
+import requests
+from api_client import COMMAND_STATUS
+from bulk_ops import run_concurrently, DEFAULT_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_PATH = os.path.join(os.path.expanduser("~"), ".locker_control", "outbox.sqlite3")
+
+# Entry kinds and states
+KIND_COMMAND = "command"
+KIND_UPDATE = "update"
+STATE_PENDING = "pending"
+STATE_SENDING = "sending"
+STATE_FAILED = "failed"
+
+# Entries taken per flush round and requests in flight at once, the same as a bulk command
+BATCH_SIZE = 200
+FLUSH_CONCURRENCY = DEFAULT_CONCURRENCY
+# Retry delay in seconds: doubles per failed attempt up to the cap, with jitter
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 5 * 60
+
+
+def is_retryable(error):
+    # Unreachable or overloaded API: keep the entry and try again later.
+    # Anything the API itself rejected (4xx, success=false) would fail the same way again.
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+    return random.uniform(delay / 2, delay)
+
+
+def describe(entry):
+    if entry["kind"] == KIND_COMMAND:
+        return entry["payload"]["command"]
+    return "update " + ", ".join(sorted(entry["payload"]))
+
+
+def expected_fields(kind, payload):
+    # The fields a queued entry changes once the API takes it
+    if kind == KIND_COMMAND:
+        command = payload["command"]
+        return {"status": COMMAND_STATUS[command]} if command in COMMAND_STATUS else {}
+    return dict(payload)
+
+
+class CommandOutbox:
+    # On-disk journal of lock/unlock commands and field updates waiting to reach the API.
+    # A new entry replaces (command) or is merged into (update) the newest entry of the same
+    # kind for that locker while that one is still waiting, so lock→unlock→lock clicks send
+    # one command. Entries of one locker go out in order, one at a time.
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("LOCKER_OUTBOX_PATH") or DEFAULT_OUTBOX_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Every queued command must survive a crash or power loss, unlike the fleet cache
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, locker_id TEXT NOT NULL, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL DEFAULT 0, "
+            "error TEXT, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_locker ON outbox (locker_id, state)")
+        # Entries that were being sent when the app stopped are sent again; lock, unlock and
+        # field updates are idempotent, so a repeat is harmless
+        with self._conn:
+            self._conn.execute("UPDATE outbox SET state = ? WHERE state = ?", (STATE_PENDING, STATE_SENDING))
+        logger.debug(f"Command outbox opened at {self.path}")
+
+    def enqueue(self, locker_id, kind, payload):
+        return self.enqueue_many([(locker_id, kind, payload)])[0]
+
+    def enqueue_many(self, items):
+        # (lockerId, kind, payload) items in one transaction, e.g. a bulk command; returns the entry ids
+        entry_ids = []
+        with self._lock, self._conn:
+            for locker_id, kind, payload in items:
+                row = self._conn.execute(
+                    "SELECT id, kind, payload, state FROM outbox WHERE locker_id = ? AND state != ? ORDER BY id DESC LIMIT 1",
+                    (locker_id, STATE_FAILED)
+                ).fetchone()
+                if row and row[1] == kind and row[3] == STATE_PENDING:
+                    if kind == KIND_UPDATE:
+                        payload = {**json.loads(row[2]), **payload}
+                    self._conn.execute(
+                        "UPDATE outbox SET payload = ?, attempts = 0, next_attempt = 0, error = NULL WHERE id = ?",
+                        (json.dumps(payload), row[0])
+                    )
+                    logger.debug(f"Coalesced {kind} for locker {locker_id} into queued entry {row[0]}")
+                    entry_ids.append(row[0])
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO outbox (locker_id, kind, payload, state, created) VALUES (?, ?, ?, ?, ?)",
+                    (locker_id, kind, json.dumps(payload), STATE_PENDING, time.time())
+                )
+                entry_ids.append(cursor.lastrowid)
+        return entry_ids
+
+    def take_batch(self, limit=BATCH_SIZE, now=None):
+        # The oldest waiting entry of every locker that has nothing in flight and is due, marked as sending
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, locker_id, kind, payload, state, attempts, next_attempt, error, created FROM outbox AS o "
+                "WHERE state = ? AND next_attempt <= ? AND id = ("
+                "SELECT MIN(id) FROM outbox WHERE locker_id = o.locker_id AND state IN (?, ?)) "
+                "ORDER BY id LIMIT ?",
+                (STATE_PENDING, now, STATE_PENDING, STATE_SENDING, limit)
+            ).fetchall()
+            self._conn.executemany("UPDATE outbox SET state = ? WHERE id = ?", [(STATE_SENDING, row[0]) for row in rows])
+        return [self._entry(row) for row in rows]
+
+    def complete(self, entry_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(entry_id,) for entry_id in entry_ids])
+
+    def retry_later(self, entry, error, now=None):
+        now = time.time() if now is None else now
+        attempts = entry["attempts"] + 1
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET state = ?, attempts = ?, next_attempt = ?, error = ? WHERE id = ?",
+                (STATE_PENDING, attempts, now + retry_delay(attempts), str(error), entry["id"])
+            )
+
+    def fail(self, entry, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET state = ?, attempts = attempts + 1, error = ? WHERE id = ?",
+                (STATE_FAILED, str(error), entry["id"])
+            )
+
+    def release(self, entry_ids):
+        # Taken but never sent, e.g. after a flush was stopped
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE outbox SET state = ? WHERE id = ? AND state = ?",
+                [(STATE_PENDING, entry_id, STATE_SENDING) for entry_id in entry_ids]
+            )
+
+    def wake(self):
+        # The API answered again, so entries backing off are due right away
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE outbox SET next_attempt = 0 WHERE state = ? AND next_attempt > 0", (STATE_PENDING,)
+            ).rowcount
+
+    def retry_failed(self):
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE outbox SET state = ?, attempts = 0, next_attempt = 0 WHERE state = ?", (STATE_PENDING, STATE_FAILED)
+            ).rowcount
+
+    def discard_failed(self):
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM outbox WHERE state = ?", (STATE_FAILED,)).rowcount
+
+    def has_active(self, locker_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM outbox WHERE locker_id = ? AND state != ? LIMIT 1", (locker_id, STATE_FAILED)
+            ).fetchone()
+        return row is not None
+
+    def expected(self, locker_id=None):
+        # {lockerId: fields} every waiting or in-flight entry will change, later entries winning
+        query = "SELECT locker_id, kind, payload FROM outbox WHERE state != ?"
+        params = (STATE_FAILED,)
+        if locker_id is not None:
+            query += " AND locker_id = ?"
+            params += (locker_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        expected = {}
+        for row_locker_id, kind, payload in rows:
+            expected.setdefault(row_locker_id, {}).update(expected_fields(kind, json.loads(payload)))
+        return expected
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall()
+        counts = {STATE_PENDING: 0, STATE_SENDING: 0, STATE_FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def next_due(self):
+        # Seconds until the next waiting entry is due, or None when nothing waits
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt) FROM outbox WHERE state = ?", (STATE_PENDING,)).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def entries(self, limit=None):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, locker_id, kind, payload, state, attempts, next_attempt, error, created FROM outbox "
+                "ORDER BY id LIMIT ?", (-1 if limit is None else limit,)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def _entry(self, row):
+        return {
+            "id": row[0], "lockerId": row[1], "kind": row[2], "payload": json.loads(row[3]), "state": row[4],
+            "attempts": row[5], "nextAttempt": row[6], "error": row[7], "created": row[8],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def send_entry(client, entry):
+    if entry["kind"] == KIND_COMMAND:
+        return client.send_command(entry["lockerId"], entry["payload"]["command"])
+    return client.update_locker(entry["lockerId"], entry["payload"])
+
+
+def flush_outbox(outbox, client, max_workers=FLUSH_CONCURRENCY, stop_event=None):
+    # Sends every due entry, a batch at a time, and records each outcome in the journal.
+    # Returns what happened so the caller can merge responses and report failures.
+    summary = {"sent": [], "retrying": [], "failed": []}
+    while stop_event is None or not stop_event.is_set():
+        batch = outbox.take_batch()
+        if not batch:
+            break
+        unsent = {entry["id"] for entry in batch}
+        sent = []
+        send = lambda entry: send_entry(client, entry)
+        for entry, result, error in run_concurrently(send, batch, max_workers, stop_event=stop_event):
+            unsent.discard(entry["id"])
+            if error is None:
+                sent.append(entry["id"])
+                summary["sent"].append((entry, result))
+            elif is_retryable(error):
+                outbox.retry_later(entry, error)
+                summary["retrying"].append((entry, str(error)))
+            else:
+                outbox.fail(entry, error)
+                summary["failed"].append((entry, str(error)))
+        outbox.complete(sent)
+        outbox.release(unsent)
+        # The API is unreachable; stop here instead of draining the rest into backoff
+        if summary["retrying"] or unsent:
+            break
+    logger.debug(
+        f"Outbox flush: {len(summary['sent'])} sent, {len(summary['retrying'])} retrying, {len(summary['failed'])} failed"
+    )
+    return summary
@@ -0,0 +1,85 @@
+import math
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Histogram buckets grow by 2^(1/8) (about 9%) from 10 microseconds to over 5 minutes, so a
+# percentile is off by at most one bucket width while recording stays O(log buckets)
+BUCKET_GROWTH = 2 ** (1 / 8)
+BUCKET_MIN_MS = 0.01
+BUCKET_BOUNDS = [BUCKET_MIN_MS * BUCKET_GROWTH ** i for i in range(200)]
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    # Fixed log-spaced buckets of durations in milliseconds. Memory does not grow with the
+    # number of samples, and percentiles are read from the cumulative bucket counts.
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, percent):
+        # Upper bound of the bucket holding the sample at this percentile, capped by the maximum seen
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Diagnostics:
+    # Named latency histograms shared by the GUI and worker threads
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.add(ms)
+
+    @contextmanager
+    def timed(self, name):
+        # Records the duration of the with block, also when it raises
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def summary(self):
+        # [(name, count, mean, p50, p95, p99, max)] sorted by name, durations in milliseconds
+        with self._lock:
+            return [
+                (name, histogram.count, histogram.mean(), *(histogram.percentile(p) for p in PERCENTILES), histogram.max)
+                for name, histogram in sorted(self._histograms.items())
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+# Process-wide collector; modules time their work with diagnostics.timed("name")
+metrics = Diagnostics()
+timed = metrics.timed
+record = metrics.record
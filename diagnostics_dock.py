@@ -0,0 +1,65 @@
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QAbstractItemView, QHeaderView
+)
+from PyQt5.QtCore import Qt, QTimer
+from diagnostics import metrics
+
+# The table is refreshed this often while the dock is visible
+REFRESH_INTERVAL_MS = 2000
+COLUMNS = ["Operation", "Count", "Mean", "p50", "p95", "p99", "Max"]
+
+
+class DiagnosticsDock(QDockWidget):
+    # Latency percentiles (in ms) of every timed operation: API calls, JSON decoding,
+    # table updates and map builds
+    def __init__(self, parent=None):
+        super().__init__("Diagnostics", parent)
+        self.setObjectName("diagnostics_dock")
+        contents = QWidget()
+        layout = QVBoxLayout(contents)
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(QLabel("Latency in milliseconds since start or last reset"), 1)
+        self.btn_reset = QPushButton("Reset")
+        self.btn_reset.clicked.connect(self.reset)
+        header_layout.addWidget(self.btn_reset)
+        layout.addLayout(header_layout)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+        self.setWidget(contents)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        summary = metrics.summary()
+        self.table.setRowCount(len(summary))
+        for row, (name, count, *durations) in enumerate(summary):
+            values = [name, str(count)] + [f"{ms:.1f}" for ms in durations]
+            for column, value in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self.table.setItem(row, column, item)
+                item.setText(value)
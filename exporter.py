@@ -0,0 +1,143 @@
+import os
+import csv
+import gzip
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Records are written in chunks of this size; progress is reported once per chunk
+EXPORT_CHUNK_SIZE = 5000
+
+EXPORT_FORMATS = {
+    "csv": "CSV Files (*.csv)",
+    "csv.gz": "Gzip CSV Files (*.csv.gz)",
+    "parquet": "Parquet Files (*.parquet)",
+    "arrow": "Arrow IPC Files (*.arrow)",
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_format(path):
+    lower = path.lower()
+    for extension in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if lower.endswith("." + extension):
+            return extension
+    raise ValueError(f"Unsupported export format for '{path}'")
+
+
+def collect_schema(records):
+    # Union of fields in first-seen order, with a column type that fits every value seen
+    fields = {}
+    for record in records:
+        for key, value in record.items():
+            kind = value_kind(value)
+            previous = fields.get(key)
+            if previous is None or previous == "null":
+                fields[key] = kind
+            elif kind != "null" and kind != previous:
+                fields[key] = "float" if {kind, previous} == {"int", "float"} else "string"
+    return fields
+
+
+def value_kind(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "string"
+
+
+def flatten_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def iter_chunks(records, chunk_size):
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+
+def export_records(records, path, progress=None, stop_event=None, chunk_size=EXPORT_CHUNK_SIZE):
+    # Stream records to a temporary file chunk by chunk and move it into place when done,
+    # so a cancelled or failed export never leaves a truncated file behind.
+    fmt = export_format(path)
+    schema = collect_schema(records)
+    temp_path = f"{path}.part"
+    writers = {
+        "csv": write_csv,
+        "csv.gz": write_csv,
+        "parquet": write_arrow,
+        "arrow": write_arrow,
+    }
+    try:
+        written = writers[fmt](records, temp_path, fmt, schema, progress, stop_event, chunk_size)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    logger.debug(f"Exported {written} lockers with {len(schema)} fields to {path}")
+    return {"path": path, "rows": written, "fields": list(schema)}
+
+
+def write_csv(records, path, fmt, schema, progress, stop_event, chunk_size):
+    opener = gzip.open if fmt == "csv.gz" else open
+    written = 0
+    with opener(path, "wt", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(schema), restval="")
+        writer.writeheader()
+        for chunk in iter_chunks(records, chunk_size):
+            if stop_event is not None and stop_event.is_set():
+                raise ExportCancelled()
+            writer.writerows({key: flatten_value(value) for key, value in record.items()} for record in chunk)
+            written += len(chunk)
+            if progress:
+                progress(written, len(records))
+    return written
+
+
+def write_arrow(records, path, fmt, schema, progress, stop_event, chunk_size):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Parquet and Arrow export need the 'pyarrow' module. Please install it using 'pip install pyarrow'.")
+    arrow_types = {
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "string": pa.string(),
+        "null": pa.string(),
+    }
+    arrow_schema = pa.schema([(key, arrow_types[kind]) for key, kind in schema.items()])
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, arrow_schema)
+    else:
+        writer = pa.ipc.new_file(path, arrow_schema)
+    written = 0
+    try:
+        for chunk in iter_chunks(records, chunk_size):
+            if stop_event is not None and stop_event.is_set():
+                raise ExportCancelled()
+            columns = []
+            for key, kind in schema.items():
+                values = [record.get(key) for record in chunk]
+                if kind == "string" or kind == "null":
+                    values = [None if value is None else str(flatten_value(value)) for value in values]
+                columns.append(pa.array(values, type=arrow_types[kind]))
+            writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=arrow_schema))
+            written += len(chunk)
+            if progress:
+                progress(written, len(records))
+    finally:
+        writer.close()
+    return written
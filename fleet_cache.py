@@ -0,0 +1,107 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".locker_control", "fleet_cache.sqlite3")
+# Ids per query when merge looks up the positions of existing records
+MERGE_LOOKUP_SIZE = 500
+
+
+class FleetCache:
+    # Last-known fleet kept on disk so the table can be shown before the API answers.
+    # Each locker is stored as its JSON payload; validators for conditional GETs live in meta.
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("LOCKER_CACHE_PATH") or DEFAULT_CACHE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lockers ("
+            "locker_id TEXT PRIMARY KEY, position INTEGER, updated_at TEXT, payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        logger.debug(f"Fleet cache opened at {self.path}")
+
+    def load(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM lockers ORDER BY position").fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def validators(self):
+        return {
+            "etag": self.get_meta("etag"),
+            "last_modified": self.get_meta("last_modified"),
+            "watermark": self.get_meta("watermark"),
+        }
+
+    def save_snapshot(self, lockers, etag=None, last_modified=None):
+        # Write only the records whose payload changed and drop the ones the API no longer returns
+        with self._lock, self._conn:
+            stored = dict(self._conn.execute("SELECT locker_id, payload FROM lockers"))
+            changed = []
+            for position, locker in enumerate(lockers):
+                payload = json.dumps(locker, sort_keys=True)
+                if stored.pop(locker["lockerId"], None) != payload:
+                    changed.append((locker["lockerId"], position, locker.get("updatedAt"), payload))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lockers (locker_id, position, updated_at, payload) VALUES (?, ?, ?, ?)",
+                changed
+            )
+            self._conn.executemany("DELETE FROM lockers WHERE locker_id = ?", [(locker_id,) for locker_id in stored])
+            self._set_validators(etag, last_modified)
+        logger.debug(f"Fleet cache snapshot: {len(changed)} written, {len(stored)} removed")
+        return len(changed), len(stored)
+
+    def merge(self, lockers, deleted_ids=(), etag=None, last_modified=None):
+        with self._lock, self._conn:
+            next_position = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM lockers").fetchone()[0]
+            # Existing positions are looked up a few hundred ids per query instead of one by one
+            locker_ids = [locker["lockerId"] for locker in lockers]
+            positions = {}
+            for start in range(0, len(locker_ids), MERGE_LOOKUP_SIZE):
+                chunk = locker_ids[start:start + MERGE_LOOKUP_SIZE]
+                positions.update(self._conn.execute(
+                    f"SELECT locker_id, position FROM lockers WHERE locker_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            rows = []
+            for locker in lockers:
+                position = positions.get(locker["lockerId"])
+                if position is None:
+                    position = positions[locker["lockerId"]] = next_position
+                    next_position += 1
+                rows.append((locker["lockerId"], position, locker.get("updatedAt"), json.dumps(locker, sort_keys=True)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lockers (locker_id, position, updated_at, payload) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany("DELETE FROM lockers WHERE locker_id = ?", [(locker_id,) for locker_id in deleted_ids])
+            if etag or last_modified:
+                self._set_validators(etag, last_modified)
+
+    def remove(self, locker_ids):
+        self.merge([], deleted_ids=locker_ids)
+
+    def _set_validators(self, etag, last_modified):
+        watermark = self._conn.execute("SELECT MAX(updated_at) FROM lockers").fetchone()[0]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("etag", etag), ("last_modified", last_modified), ("watermark", watermark)]
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,169 @@
+import os
+import io
+import csv
+import gzip
+import logging
+from api_client import STATUS_VALUES, LIGHT_STATUS_VALUES
+from bulk_ops import run_concurrently, DEFAULT_CONCURRENCY
+from json_stream import JsonArrayReader, read_chunks
+from locker_store import float_or_none
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {
+    "csv": "CSV Files (*.csv)",
+    "csv.gz": "Gzip CSV Files (*.csv.gz)",
+    "json": "JSON Files (*.json)",
+}
+
+# Fields an import may change; everything else in a row (_id, updatedAt, ...) is ignored
+IMPORT_FIELDS = ("status", "lightStatus", "batteryPercentage", "latitude", "longitude")
+ALLOWED_VALUES = {"status": STATUS_VALUES, "lightStatus": LIGHT_STATUS_VALUES}
+NUMBER_RANGES = {"batteryPercentage": (0, 100), "latitude": (-90, 90), "longitude": (-180, 180)}
+# Progress is reported once per this many rows read
+PROGRESS_ROWS = 1000
+
+
+def import_format(path):
+    lower = path.lower()
+    for extension in sorted(IMPORT_FORMATS, key=len, reverse=True):
+        if lower.endswith("." + extension):
+            return extension
+    raise ValueError(f"Unsupported import format for '{path}'")
+
+
+def read_records(raw, fmt):
+    # (row number, record) pairs streamed from an open binary file; JSON is an array of
+    # objects, either the whole document or under "lockers" like the /locker/all payload
+    if fmt == "json":
+        for number, record in enumerate(JsonArrayReader(read_chunks(raw), key="lockers"), 1):
+            yield number, record
+        return
+    stream = gzip.GzipFile(fileobj=raw, mode="rb") if fmt == "csv.gz" else raw
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        for number, record in enumerate(csv.DictReader(text), 1):
+            yield number, record
+    finally:
+        # Detached rather than closed, so the caller's file stays open
+        text.detach()
+
+
+def parse_row(record):
+    # (lockerId, {field: value}) for the importable fields the row sets; blank cells are left alone
+    if not isinstance(record, dict):
+        raise ValueError("Row is not an object")
+    locker_id = record.get("lockerId")
+    if isinstance(locker_id, str):
+        locker_id = locker_id.strip()
+    if not locker_id or not isinstance(locker_id, str):
+        raise ValueError("Missing lockerId")
+    fields = {}
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        if field in NUMBER_RANGES:
+            low, high = NUMBER_RANGES[field]
+            try:
+                if isinstance(value, bool):
+                    raise ValueError()
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} is not a number: {value!r}")
+            if not low <= number <= high:
+                raise ValueError(f"{field} must be between {low} and {high}, got {value}")
+            fields[field] = number
+        else:
+            if value not in ALLOWED_VALUES[field]:
+                raise ValueError(f"{field} must be one of {', '.join(ALLOWED_VALUES[field])}, got {value!r}")
+            fields[field] = value
+    return locker_id, fields
+
+
+def changed_fields(current, fields):
+    # The subset of fields whose value differs from the current record; numbers compare as floats
+    changes = {}
+    for field, value in fields.items():
+        old = current.get(field)
+        number = float_or_none(value)
+        if number is not None and float_or_none(old) is not None:
+            if float_or_none(old) != number:
+                changes[field] = value
+        elif old != value:
+            changes[field] = value
+    return changes
+
+
+def error_file_path(path):
+    fmt = import_format(path)
+    return f"{path[:-len(fmt) - 1]}.errors.csv"
+
+
+def write_errors(path, errors):
+    with open(path, "w", newline="", encoding="utf-8") as error_file:
+        writer = csv.writer(error_file)
+        writer.writerow(["row", "lockerId", "error"])
+        writer.writerows(sorted(errors, key=lambda error: error[0]))
+
+
+def import_records(client, path, current, max_workers=DEFAULT_CONCURRENCY, progress=None, stop_event=None):
+    # Streams the file, validates every row and diffs it against `current` (anything with
+    # .get(lockerId) -> record). Only lockers with changes get a PUT, carrying just the
+    # changed fields; PUTs run while later rows are still being read. Row errors and failed
+    # PUTs go to <name>.errors.csv next to the file.
+    fmt = import_format(path)
+    summary = {"path": path, "rows": 0, "updated": [], "unchanged": 0, "errors": [], "errors_path": None, "cancelled": False}
+    seen = set()
+    with open(path, "rb") as raw:
+        size = os.fstat(raw.fileno()).st_size or 1
+
+        def report():
+            if progress:
+                progress(min(raw.tell(), size), size)
+
+        def updates():
+            for number, record in read_records(raw, fmt):
+                if stop_event is not None and stop_event.is_set():
+                    return
+                summary["rows"] += 1
+                if summary["rows"] % PROGRESS_ROWS == 0:
+                    report()
+                try:
+                    locker_id, fields = parse_row(record)
+                except ValueError as e:
+                    summary["errors"].append((number, record.get("lockerId", "") if isinstance(record, dict) else "", str(e)))
+                    continue
+                if locker_id in seen:
+                    summary["errors"].append((number, locker_id, "Duplicate lockerId, row ignored"))
+                    continue
+                seen.add(locker_id)
+                locker = current.get(locker_id)
+                if locker is None:
+                    summary["errors"].append((number, locker_id, "Locker not found"))
+                    continue
+                changes = changed_fields(locker, fields)
+                if not changes:
+                    summary["unchanged"] += 1
+                    continue
+                yield number, locker_id, changes
+
+        put = lambda update: client.update_locker(update[1], update[2])
+        for (number, locker_id, changes), result, error in run_concurrently(put, updates(), max_workers, stop_event=stop_event):
+            if error is not None:
+                summary["errors"].append((number, locker_id, str(error)))
+                continue
+            locker = result.get("locker") if isinstance(result, dict) else None
+            summary["updated"].append({**changes, **locker} if isinstance(locker, dict) else {"lockerId": locker_id, **changes})
+        report()
+    summary["cancelled"] = stop_event is not None and stop_event.is_set()
+    if summary["errors"]:
+        summary["errors_path"] = error_file_path(path)
+        write_errors(summary["errors_path"], summary["errors"])
+    logger.debug(
+        f"Imported {path}: {summary['rows']} rows, {len(summary['updated'])} updated, "
+        f"{summary['unchanged']} unchanged, {len(summary['errors'])} errors"
+    )
+    return summary
@@ -0,0 +1,114 @@
+import re
+import json
+import codecs
+
+# Bytes read from a file per step when streaming
+READ_SIZE = 1 << 16
+
+WHITESPACE = " \t\r\n"
+# Characters a number may go on with, e.g. "-1." or "2e" cut off at the end of a chunk
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_decoder = json.JSONDecoder()
+
+
+def read_chunks(stream, size=READ_SIZE):
+    return iter(lambda: stream.read(size), b"")
+
+
+class JsonArrayReader:
+    # Yields the items of a JSON array one at a time while the document arrives in chunks
+    # (bytes or str), so a large array is never held as text and objects at once. The array
+    # is either the whole document or, for an object document, the member named `key`, e.g.
+    # "lockers" in {"success": true, "lockers": [...]}; the other members end up in `members`.
+    def __init__(self, chunks, key=None):
+        self.key = key
+        self.members = {}
+        # Whether the array was there at all, so an empty one can be told from a missing one
+        self.found = False
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._pos = 0
+        self._done = False
+
+    def _fill(self):
+        # Appends the next chunk, dropping what was consumed; False at the end of the input
+        if self._done:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._done = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def _take(self, expected):
+        char = self._peek()
+        if char not in expected:
+            raise ValueError(f"Expected {' or '.join(repr(c) for c in expected)} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        # One complete value, reading more input while it is cut off at the end of the buffer
+        while True:
+            self._peek()
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number (or true/false/null) reaching the end of the buffer may go on in the next
+            # chunk; a number cut after "." or "e" decodes as its leading part, so check the tail too
+            if (
+                not isinstance(value, (dict, list, str))
+                and NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer)
+                and self._fill()
+            ):
+                continue
+            self._pos = end
+            return value
+
+    def _items(self):
+        self._take("[")
+        self.found = True
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._take(",]") == "]":
+                return
+
+    def __iter__(self):
+        if self._peek() == "[" or self.key is None:
+            yield from self._items()
+            return
+        self._take("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            name = self._value()
+            if not isinstance(name, str):
+                raise ValueError(f"Expected an object key, got {name!r}")
+            self._take(":")
+            if name == self.key and self._peek() == "[":
+                yield from self._items()
+            else:
+                self.members[name] = self._value()
+            if self._take(",}") == "}":
+                return
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# locker-ctl: scripted fleet operations without Qt. Uses the same LockerApiClient as LockerApp
+# and prints one JSON object per line as results arrive, e.g.
+#   python locker_ctl.py list --status unlocked
+#   python locker_ctl.py lock LKR0000001 LKR0000002
+#   grep -v '^#' site-a.txt | python locker_ctl.py unlock -
+#   python locker_ctl.py update --file ids.txt --set lightStatus=off
+#   python locker_ctl.py export fleet.csv.gz
+import os
+import sys
+import json
+import logging
+import argparse
+from api_client import LockerApiClient, DEFAULT_TIMEOUT
+from bulk_ops import run_concurrently, DEFAULT_CONCURRENCY
+from logging_setup import LOG_FORMAT
+
+logger = logging.getLogger("locker_ctl")
+
+# Exit codes: every operation succeeded, at least one failed, bad usage or input
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+# Fields the API assigns itself, so update never sends them
+READ_ONLY_FIELDS = ("_id", "lockerId", "createdAt", "updatedAt")
+
+
+class UsageError(Exception):
+    pass
+
+
+def positive(convert):
+    # argparse type for numbers that must be above zero
+    def parse(value):
+        try:
+            number = convert(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid {convert.__name__} value: '{value}'")
+        if number <= 0:
+            raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+        return number
+    return parse
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def read_ids(args):
+    # lockerIds from the command line, a file (--file) or stdin ("-", or nothing on a pipe).
+    # Blank lines and lines starting with # are skipped; ids are yielded as they are read.
+    sources = []
+    if args.file:
+        try:
+            sources.append(open(args.file, "r", encoding="utf-8"))
+        except OSError as e:
+            raise UsageError(f"Failed to read lockerIds: {str(e)}")
+    if "-" in args.ids or (not args.ids and not args.file and not sys.stdin.isatty()):
+        sources.append(sys.stdin)
+    seen = set()
+    for locker_id in args.ids:
+        if locker_id != "-" and locker_id not in seen:
+            seen.add(locker_id)
+            yield locker_id
+    for source in sources:
+        for line in source:
+            locker_id = line.strip()
+            if locker_id and not locker_id.startswith("#") and locker_id not in seen:
+                seen.add(locker_id)
+                yield locker_id
+        if source is not sys.stdin:
+            source.close()
+
+
+def parse_assignments(assignments, data=None):
+    # --set key=value pairs; values are read as JSON when they parse (numbers, true, null), else as text
+    try:
+        fields = dict(json.loads(data)) if data else {}
+    except ValueError as e:
+        raise UsageError(f"--data is not a JSON object: {str(e)}")
+    for assignment in assignments or []:
+        key, separator, value = assignment.partition("=")
+        if not separator or not key:
+            raise UsageError(f"Expected key=value, got '{assignment}'")
+        try:
+            fields[key] = json.loads(value)
+        except ValueError:
+            fields[key] = value
+    for key in READ_ONLY_FIELDS:
+        fields.pop(key, None)
+    return fields
+
+
+def fetch_lockers(client, args):
+    lockers = client.get_all_lockers(timeout=args.timeout)["lockers"]
+    if getattr(args, "status", None):
+        lockers = [locker for locker in lockers if locker.get("status") == args.status]
+    if getattr(args, "light", None):
+        lockers = [locker for locker in lockers if locker.get("lightStatus") == args.light]
+    return lockers
+
+
+def select_fields(locker, fields):
+    if not fields:
+        return locker
+    return {field: locker.get(field) for field in fields}
+
+
+def run_each(client, args, locker_ids, call):
+    # call(locker_id) on every id, args.concurrency at a time; one line per id in completion order
+    failed = 0
+    for locker_id, result, error in run_concurrently(call, locker_ids, args.concurrency):
+        if error is not None:
+            failed += 1
+            emit({"lockerId": locker_id, "ok": False, "error": str(error)})
+            continue
+        record = {"lockerId": locker_id, "ok": True}
+        if isinstance(result, dict):
+            if isinstance(result.get("locker"), dict):
+                record["locker"] = result["locker"]
+            if result.get("message"):
+                record["message"] = result["message"]
+        emit(record)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def command_list(client, args):
+    for locker in fetch_lockers(client, args):
+        emit(select_fields(locker, args.fields))
+    return EXIT_OK
+
+
+def command_get(client, args):
+    lockers = {locker["lockerId"]: locker for locker in fetch_lockers(client, args)}
+    missing = 0
+    for locker_id in read_ids(args):
+        locker = lockers.get(locker_id)
+        if locker is None:
+            missing += 1
+            emit({"lockerId": locker_id, "ok": False, "error": "Locker not found"})
+        else:
+            emit(select_fields(locker, args.fields))
+    return EXIT_FAILED if missing else EXIT_OK
+
+
+def command_send(client, args):
+    return run_each(client, args, read_ids(args), lambda locker_id: client.send_command(locker_id, args.command, timeout=args.timeout))
+
+
+def command_update(client, args):
+    fields = parse_assignments(args.set, args.data)
+    if not fields:
+        raise UsageError("Nothing to update, pass --set key=value or --data '{...}'")
+    return run_each(client, args, read_ids(args), lambda locker_id: client.update_locker(locker_id, fields, timeout=args.timeout))
+
+
+def command_delete(client, args):
+    return run_each(client, args, read_ids(args), lambda locker_id: client.delete_locker(locker_id, timeout=args.timeout))
+
+
+def command_register(client, args):
+    failed = 0
+    register = lambda number: client.register_locker(timeout=args.timeout)
+    for number, result, error in run_concurrently(register, range(args.count), args.concurrency):
+        if error is not None:
+            failed += 1
+            emit({"ok": False, "error": str(error)})
+        else:
+            locker = result.get("locker") if isinstance(result, dict) else None
+            emit({"lockerId": locker.get("lockerId") if isinstance(locker, dict) else None, "ok": True, "locker": locker})
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def command_export(client, args):
+    # Same writer as the GUI export, so the format follows the extension (.csv, .csv.gz, .parquet, .arrow)
+    from exporter import export_records
+    lockers = fetch_lockers(client, args)
+    result = export_records(lockers, args.path)
+    emit({"ok": True, **result})
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="locker-ctl", description="Scripted locker fleet operations, one JSON line per result")
+    parser.add_argument("--api-url", help="API base URL (default: LOCKER_API_URL or the hosted API)")
+    parser.add_argument("--timeout", type=positive(float), help=f"read timeout per request in seconds (default {DEFAULT_TIMEOUT[1]})")
+    parser.add_argument("--concurrency", type=positive(int), default=DEFAULT_CONCURRENCY, help=f"requests in flight at once (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log requests to stderr")
+    commands = parser.add_subparsers(dest="command_name", required=True)
+
+    def with_ids(subparser):
+        subparser.add_argument("ids", nargs="*", help="lockerIds; '-' or a pipe reads them from stdin")
+        subparser.add_argument("--file", help="read lockerIds from this file, one per line")
+        return subparser
+
+    def with_filters(subparser):
+        subparser.add_argument("--status", help="only lockers with this status")
+        subparser.add_argument("--light", help="only lockers with this lightStatus")
+        return subparser
+
+    listing = with_filters(commands.add_parser("list", help="print every locker"))
+    listing.add_argument("--fields", type=lambda value: value.split(","), help="comma-separated fields to print")
+    listing.set_defaults(handler=command_list)
+
+    get = with_ids(commands.add_parser("get", help="print the given lockers"))
+    get.add_argument("--fields", type=lambda value: value.split(","), help="comma-separated fields to print")
+    get.set_defaults(handler=command_get)
+
+    for name in ("lock", "unlock"):
+        with_ids(commands.add_parser(name, help=f"{name} the given lockers")).set_defaults(handler=command_send, command=name)
+
+    update = with_ids(commands.add_parser("update", help="change fields of the given lockers"))
+    update.add_argument("--set", action="append", metavar="KEY=VALUE", help="field to change, may be repeated")
+    update.add_argument("--data", help="JSON object with the fields to change")
+    update.set_defaults(handler=command_update)
+
+    with_ids(commands.add_parser("delete", help="delete the given lockers")).set_defaults(handler=command_delete)
+
+    register = commands.add_parser("register", help="register new lockers")
+    register.add_argument("--count", type=int, default=1, help="how many lockers to register")
+    register.set_defaults(handler=command_register)
+
+    export = with_filters(commands.add_parser("export", help="export the fleet to a file"))
+    export.add_argument("path", help="output file: .csv, .csv.gz, .parquet or .arrow")
+    export.set_defaults(handler=command_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format=LOG_FORMAT, stream=sys.stderr)
+    if args.timeout:
+        # Only the read timeout is configurable; connecting keeps the client's default
+        args.timeout = (DEFAULT_TIMEOUT[0], args.timeout)
+    client = LockerApiClient(base_url=args.api_url, pool_size=args.concurrency)
+    try:
+        return args.handler(client, args)
+    except UsageError as e:
+        logger.error(str(e))
+        return EXIT_USAGE
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly like other shell tools
+        sys.stdout = open(os.devnull, "w")
+        return EXIT_OK
+    except Exception as e:
+        logger.error(f"Failed to {args.command_name}: {str(e)}")
+        emit({"ok": False, "error": str(e)})
+        return EXIT_FAILED
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from PyQt5.QtCore import Qt, QAbstractProxyModel, QModelIndex
+import logging
+from locker_store import rows_to_bits, bits_to_rows
+from diagnostics import record
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONTAINS = "contains"
+SEARCH_PREFIX = "prefix"
+
+
+class LockerFilter:
+    # Filter criteria; empty text, None and the full 0-100 battery range mean "no filter"
+    def __init__(self, text="", mode=SEARCH_CONTAINS, status=None, light_status=None, battery_min=0, battery_max=100):
+        self.text = text
+        self.mode = mode
+        self.status = status
+        self.light_status = light_status
+        self.battery_min = battery_min
+        self.battery_max = battery_max
+
+    def __eq__(self, other):
+        return isinstance(other, LockerFilter) and vars(self) == vars(other)
+
+    def battery_active(self):
+        return self.battery_min > 0 or self.battery_max < 100
+
+    def is_active(self):
+        return bool(self.text) or self.status is not None or self.light_status is not None or self.battery_active()
+
+
+class LockerFilterProxyModel(QAbstractProxyModel):
+    # Filters a LockerTableModel without calling back into Python once per row.
+    # With no filter it is an identity proxy that forwards source signals one to one.
+    # With a filter, the matching source rows are computed from the store's status, light and
+    # battery indexes plus a sorted id list (prefix search by bisect), and kept in ascending
+    # source order so mapping back from the source is a bisect as well. Source inserts, removals
+    # and data changes are then applied incrementally instead of re-filtering everything.
+    # With a sort key the proxy rows are ordered by key instead and mapped back through a dict;
+    # source inserts then rebuild the order, and removals drop their rows from it.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter = LockerFilter()
+        self.sort_key = None
+        self._rows = None
+        self._proxy_of = None
+        self._sorted_ids = None
+
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        self.store = model.store
+        self._sorted_ids = None
+        self._rows = self._compute_rows()
+        model.rowsAboutToBeInserted.connect(self.on_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self.on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self.on_rows_removed)
+        model.dataChanged.connect(self.on_data_changed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.on_model_reset)
+        model.layoutAboutToBeChanged.connect(self.beginResetModel)
+        model.layoutChanged.connect(self.on_model_reset)
+        self.endResetModel()
+
+    def set_filter(self, locker_filter):
+        if locker_filter == self.filter:
+            return
+        started = time.perf_counter()
+        self.beginResetModel()
+        self.filter = locker_filter
+        self._rows = self._compute_rows()
+        self.endResetModel()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        record("table filter", elapsed_ms)
+        logger.debug(f"Filter matched {self.rowCount()} of {len(self.store)} lockers in {elapsed_ms:.1f} ms")
+
+    def set_sort_key(self, sort_key):
+        # sort_key(store) returns one key per source row (no NaN); None restores source order
+        self.beginResetModel()
+        self.sort_key = sort_key
+        self._rows = self._compute_rows()
+        self.endResetModel()
+
+    def resort(self):
+        # Re-read the sort keys, keeping selection and current index on the same lockers
+        if self.sort_key is None:
+            return
+        started = time.perf_counter()
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        source_rows = [self._rows[index.row()] for index in persistent]
+        self._sort_rows(self._rows)
+        self.changePersistentIndexList(
+            persistent, [self.index(self._proxy_of[row], index.column()) for row, index in zip(source_rows, persistent)]
+        )
+        self.layoutChanged.emit()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        record("table sort", elapsed_ms)
+        logger.debug(f"Sorted {len(self._rows)} lockers in {elapsed_ms:.1f} ms")
+
+    def is_filtered(self):
+        return self.filter.is_active()
+
+    def is_sorted(self):
+        return self.sort_key is not None
+
+    def _compute_rows(self):
+        rows = self._filter_rows() if self.filter.is_active() else None
+        if self.sort_key is None:
+            self._proxy_of = None
+            return rows
+        return self._sort_rows(range(len(self.store)) if rows is None else rows)
+
+    def _sort_rows(self, rows):
+        keys = self.sort_key(self.store)
+        # A stable sort keeps source order among equal keys
+        self._rows = sorted(rows, key=keys.__getitem__)
+        self._proxy_of = {row: position for position, row in enumerate(self._rows)}
+        return self._rows
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return self.sourceModel().columnCount(QModelIndex())
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else self._rows[proxy_index.row()]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.proxy_row(source_index.row())
+        return QModelIndex() if row is None else self.createIndex(row, source_index.column())
+
+    def proxy_row(self, source_row):
+        if self._rows is None:
+            return source_row
+        if self._proxy_of is not None:
+            return self._proxy_of.get(source_row)
+        row = bisect_left(self._rows, source_row)
+        if row < len(self._rows) and self._rows[row] == source_row:
+            return row
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Vertical:
+            # Number the visible rows, not the source rows behind them
+            return section + 1 if role == Qt.DisplayRole else None
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def sorted_ids(self):
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self.store.ids)
+        return self._sorted_ids
+
+    def _prefix_ids(self, prefix):
+        ids = self.sorted_ids()
+        # Every id starting with prefix sorts between prefix and prefix + the highest code point
+        return ids[bisect_left(ids, prefix):bisect_right(ids, prefix + "\U0010ffff")]
+
+    def _filter_rows(self):
+        # AND the store's row bitsets for every indexed criterion, then check the remaining
+        # per-row conditions (substring, battery bounds inside the edge buckets) on survivors only
+        f = self.filter
+        store = self.store
+        count = len(store)
+        bits = None
+        if f.status is not None:
+            bits = store.status_bits(f.status)
+        if f.light_status is not None:
+            light_bits = store.light_status_bits(f.light_status)
+            bits = light_bits if bits is None else bits & light_bits
+        if f.text and f.mode == SEARCH_PREFIX:
+            prefix_bits = rows_to_bits((store.row_of(locker_id) for locker_id in self._prefix_ids(f.text)), count)
+            bits = prefix_bits if bits is None else bits & prefix_bits
+        if f.battery_active():
+            # Buckets strictly between the edge buckets are inside the range as a whole
+            low_bucket, high_bucket = f.battery_min // 10, f.battery_max // 10
+            battery_bits = store.battery_bits(low_bucket + 1, high_bucket - 1)
+            edge_bits = store.battery_bits(low_bucket, low_bucket) | store.battery_bits(high_bucket, high_bucket)
+            if bits is not None:
+                edge_bits &= bits
+            battery = store.battery
+            low, high = f.battery_min, f.battery_max
+            edge_rows = [row for row in bits_to_rows(edge_bits) if low <= battery[row] <= high]
+            battery_bits |= rows_to_bits(edge_rows, count)
+            bits = battery_bits if bits is None else bits & battery_bits
+
+        if f.text and f.mode == SEARCH_CONTAINS:
+            text = f.text
+            ids = store.ids
+            if bits is None:
+                return [row for row, locker_id in enumerate(ids) if text in locker_id]
+            return [row for row in bits_to_rows(bits) if text in ids[row]]
+        return bits_to_rows(bits)
+
+    def matches(self, source_row):
+        f = self.filter
+        store = self.store
+        locker_id = store.ids[source_row]
+        if f.text:
+            if f.mode == SEARCH_PREFIX and not locker_id.startswith(f.text):
+                return False
+            if f.mode == SEARCH_CONTAINS and f.text not in locker_id:
+                return False
+        if f.status is not None and store.status[source_row] != f.status:
+            return False
+        if f.light_status is not None and store.light_status[source_row] != f.light_status:
+            return False
+        if f.battery_active() and not f.battery_min <= store.battery[source_row] <= f.battery_max:
+            return False
+        return True
+
+    def on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def on_rows_inserted(self, parent, first, last):
+        for row in range(first, last + 1):
+            if self._sorted_ids is not None:
+                insort(self._sorted_ids, self.store.ids[row])
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        if self._proxy_of is not None:
+            self.beginResetModel()
+            self._rows = self._compute_rows()
+            self.endResetModel()
+            return
+        # The source only appends, so matching new rows go to the end of the proxy as well
+        matched = [row for row in range(first, last + 1) if self.matches(row)]
+        if first < (self._rows[-1] if self._rows else -1):
+            self.beginResetModel()
+            self._rows = self._filter_rows()
+            self.endResetModel()
+        elif matched:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(matched) - 1)
+            self._rows.extend(matched)
+            self.endInsertRows()
+
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        if self._sorted_ids is not None:
+            for row in range(first, last + 1):
+                locker_id = self.store.ids[row]
+                position = bisect_left(self._sorted_ids, locker_id)
+                if position < len(self._sorted_ids) and self._sorted_ids[position] == locker_id:
+                    del self._sorted_ids[position]
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        if self._proxy_of is not None:
+            self.beginResetModel()
+            return
+        # Proxy rows are in source order, so the removed source range is one contiguous proxy range
+        self._pending_removal = (bisect_left(self._rows, first), bisect_right(self._rows, last))
+        start, end = self._pending_removal
+        if start < end:
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+
+    def on_rows_removed(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        shift = last - first + 1
+        if self._proxy_of is not None:
+            # The store reindexes row_of only after the last removed range, so keep the current
+            # order minus the removed rows instead of filtering again; no other key changed
+            self._rows = [row if row < first else row - shift for row in self._rows if not first <= row <= last]
+            self._proxy_of = {row: position for position, row in enumerate(self._rows)}
+            self.endResetModel()
+            return
+        start, end = self._pending_removal
+        self._rows[start:] = [row - shift for row in self._rows[end:]]
+        if start < end:
+            self.endRemoveRows()
+
+    def on_data_changed(self, top_left, bottom_right, roles=()):
+        first, last = top_left.row(), bottom_right.row()
+        last_column = self.columnCount() - 1
+        if self._rows is None:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, last_column), roles)
+            return
+        if last - first > 64:
+            # Large spans come from bulk refreshes; re-filtering from the indexes is cheaper
+            self.beginResetModel()
+            self._rows = self._compute_rows()
+            self.endResetModel()
+            return
+        for source_row in range(first, last + 1):
+            row = self.proxy_row(source_row)
+            visible = self.matches(source_row)
+            if row is None and not visible:
+                # Hidden before and after; nothing to show or reorder
+                continue
+            if row is not None and visible:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column), roles)
+            elif self._proxy_of is not None:
+                # Sorted rows have no cheap insert position, so rebuild the order
+                self.beginResetModel()
+                self._rows = self._compute_rows()
+                self.endResetModel()
+                return
+            elif row is not None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+            else:
+                row = bisect_left(self._rows, source_row)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._rows.insert(row, source_row)
+                self.endInsertRows()
+
+    def on_model_reset(self):
+        self._sorted_ids = None
+        self._rows = self._compute_rows()
+        self.endResetModel()
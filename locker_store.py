@@ -0,0 +1,323 @@
+import sys
+from array import array
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields kept in typed columns; everything else a locker carries goes to a per-row extras dict
+STRING_FIELDS = ("status", "lightStatus")
+FLOAT_FIELDS = ("batteryPercentage", "latitude", "longitude")
+CORE_FIELDS = ("lockerId",) + STRING_FIELDS + FLOAT_FIELDS
+
+NAN = float("nan")
+
+
+def battery_bucket(battery):
+    # 0-9% -> 0, 10-19% -> 1, ..., 100% -> 10; unknown battery -> None
+    if battery != battery:
+        return None
+    return max(0, min(10, int(battery // 10)))
+
+
+# Row offsets of the set bits in every byte value, for turning bitsets back into rows
+BYTE_ROWS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def rows_to_bits(rows, count):
+    # Bitset with bit n set for every row n, built through a bytearray instead of big-int shifts
+    mask = bytearray((count + 7) // 8)
+    for row in rows:
+        mask[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(mask, "little")
+
+
+def bits_to_rows(bits):
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    return [offset * 8 + bit for offset, byte in enumerate(data) if byte for bit in BYTE_ROWS[byte]]
+
+
+def intern_value(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def float_or_none(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+class LockerSnapshot:
+    # Frozen, column-backed copy of the store for background readers such as export.
+    # Records are rebuilt as dicts only for the slice being read. A store nobody writes to
+    # anymore, like one a refresh was decoded into, is wrapped as it is with copy=False.
+    def __init__(self, store, copy=True):
+        if copy:
+            self._store = LockerStore()
+            self._store._copy_columns_from(store)
+        else:
+            self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._store.record(row) for row in range(*item.indices(len(self._store)))]
+        return self._store.record(item)
+
+    def __iter__(self):
+        return self._store.records()
+
+    def get(self, locker_id):
+        # The lockerId index is only built once a reader looks records up by id
+        if not self._store._row_of and len(self._store):
+            self._store.reindex_from(0)
+        return self._store.get(locker_id)
+
+
+class LockerStore:
+    # Column-oriented locker records with O(1) lookup by lockerId and secondary indexes
+    # on status, lightStatus and battery bucket. The indexes are row bitsets (Python ints),
+    # so filters combine with & and | in C. They are built on first use, patched in place for
+    # changed and removed rows, and rebuilt lazily after rows are appended.
+    def __init__(self):
+        self.ids = []
+        self.status = []
+        self.light_status = []
+        self.battery = array("d")
+        self.latitude = array("d")
+        self.longitude = array("d")
+        self.extras = []
+        self._row_of = {}
+        self._status_count = {}
+        self._light_count = {}
+        # {("status" | "light" | "battery", value): bitset}, or None until the next query.
+        # Rows appended since the last query are merged into the bitsets on the next one.
+        self._bitsets = None
+        self._appended = []
+        # Bumped whenever coordinates change or rows are added or removed, so spatial
+        # indexes built from the coordinate columns know when they are stale
+        self.coords_version = 0
+        # lockerIds added or changed since the last take_changed(), for incremental consumers
+        self._changed = set()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, locker_id):
+        return locker_id in self._row_of
+
+    def row_of(self, locker_id):
+        return self._row_of.get(locker_id)
+
+    def take_changed(self):
+        changed = self._changed
+        self._changed = set()
+        return changed
+
+    def record(self, row):
+        locker = {"lockerId": self.ids[row]}
+        if self.status[row] is not None:
+            locker["status"] = self.status[row]
+        if self.light_status[row] is not None:
+            locker["lightStatus"] = self.light_status[row]
+        battery = self.battery[row]
+        if battery == battery:
+            # The API reports whole percentages; keep them ints like the original payload
+            locker["batteryPercentage"] = int(battery) if battery.is_integer() else battery
+        for field, column in (("latitude", self.latitude), ("longitude", self.longitude)):
+            value = column[row]
+            if value == value:
+                locker[field] = value
+        extras = self.extras[row]
+        if extras:
+            locker.update(extras)
+        return locker
+
+    def get(self, locker_id):
+        row = self._row_of.get(locker_id)
+        return None if row is None else self.record(row)
+
+    def records(self):
+        for row in range(len(self.ids)):
+            yield self.record(row)
+
+    def snapshot(self):
+        return LockerSnapshot(self)
+
+    def _index_keys(self, row):
+        return (
+            ("status", self.status[row]),
+            ("light", self.light_status[row]),
+            ("battery", battery_bucket(self.battery[row])),
+        )
+
+    def bitsets(self):
+        if self._bitsets is None:
+            self._bitsets = self._build_bitsets(range(len(self.ids)))
+        elif self._appended:
+            for key, bits in self._build_bitsets(self._appended).items():
+                self._bitsets[key] = self._bitsets.get(key, 0) | bits
+        self._appended = []
+        return self._bitsets
+
+    def _build_bitsets(self, rows):
+        count = len(self.ids)
+        bitsets = {}
+        for kind, column in (("status", self.status), ("light", self.light_status), ("battery", self.battery)):
+            groups = {}
+            for row in rows:
+                value = column[row]
+                group = groups.get(value)
+                if group is None:
+                    groups[value] = group = []
+                group.append(row)
+            if kind == "battery":
+                # Grouped by raw percentage first, so the bucket is worked out once per distinct value
+                buckets = {}
+                for value, group in groups.items():
+                    buckets.setdefault(battery_bucket(value), []).extend(group)
+                groups = buckets
+            for value, group in groups.items():
+                bitsets[(kind, value)] = rows_to_bits(group, count)
+        return bitsets
+
+    def status_bits(self, status):
+        return self.bitsets().get(("status", status), 0)
+
+    def light_status_bits(self, light_status):
+        return self.bitsets().get(("light", light_status), 0)
+
+    def battery_bits(self, low_bucket, high_bucket):
+        bitsets = self.bitsets()
+        bits = 0
+        for bucket in range(low_bucket, high_bucket + 1):
+            bits |= bitsets.get(("battery", bucket), 0)
+        return bits
+
+    def status_values(self):
+        return sorted(value for value, count in self._status_count.items() if count and value is not None)
+
+    def light_status_values(self):
+        return sorted(value for value, count in self._light_count.items() if count and value is not None)
+
+    def _split(self, locker):
+        # Values that don't fit their typed column are kept verbatim in extras
+        extras = {key: value for key, value in locker.items() if key not in CORE_FIELDS}
+        status = locker.get("status")
+        light_status = locker.get("lightStatus")
+        if status is not None and not isinstance(status, str):
+            extras["status"] = status
+            status = None
+        if light_status is not None and not isinstance(light_status, str):
+            extras["lightStatus"] = light_status
+            light_status = None
+        floats = []
+        for field in FLOAT_FIELDS:
+            value = locker.get(field)
+            number = float_or_none(value)
+            if number is None:
+                if value is not None:
+                    extras[field] = value
+                number = NAN
+            floats.append(number)
+        return intern_value(status), intern_value(light_status), floats, extras or None
+
+    def _count(self, row, delta):
+        status = self.status[row]
+        light_status = self.light_status[row]
+        self._status_count[status] = self._status_count.get(status, 0) + delta
+        self._light_count[light_status] = self._light_count.get(light_status, 0) + delta
+
+    def _same(self, row, status, light_status, floats, extras):
+        if self.status[row] != status or self.light_status[row] != light_status or self.extras[row] != extras:
+            return False
+        for column, value in zip((self.battery, self.latitude, self.longitude), floats):
+            if not self._same_float(column[row], value):
+                return False
+        return True
+
+    @staticmethod
+    def _same_float(current, value):
+        # NaN marks a missing value, so two NaNs count as equal here
+        return current == value or (current != current and value != value)
+
+    def upsert(self, locker):
+        # Returns (row, previous record or None, changed)
+        locker_id = intern_value(locker["lockerId"])
+        status, light_status, floats, extras = self._split(locker)
+        row = self._row_of.get(locker_id)
+        if row is None:
+            row = len(self.ids)
+            self.ids.append(locker_id)
+            self.status.append(status)
+            self.light_status.append(light_status)
+            self.battery.append(floats[0])
+            self.latitude.append(floats[1])
+            self.longitude.append(floats[2])
+            self.extras.append(extras)
+            self._row_of[locker_id] = row
+            self._count(row, 1)
+            self.coords_version += 1
+            self._changed.add(locker_id)
+            if self._bitsets is not None:
+                self._appended.append(row)
+            return row, None, True
+        if self._same(row, status, light_status, floats, extras):
+            return row, None, False
+        previous = self.record(row)
+        if not self._same_float(self.latitude[row], floats[1]) or not self._same_float(self.longitude[row], floats[2]):
+            self.coords_version += 1
+        old_keys = self._index_keys(row)
+        self._count(row, -1)
+        self.status[row] = status
+        self.light_status[row] = light_status
+        self.battery[row], self.latitude[row], self.longitude[row] = floats
+        self.extras[row] = extras
+        self._count(row, 1)
+        self._changed.add(locker_id)
+        if self._bitsets is not None:
+            bit = 1 << row
+            for old_key, new_key in zip(old_keys, self._index_keys(row)):
+                if old_key != new_key:
+                    self._bitsets[old_key] = self._bitsets.get(old_key, 0) & ~bit
+                    self._bitsets[new_key] = self._bitsets.get(new_key, 0) | bit
+        return row, previous, True
+
+    def remove_range(self, start, end, reindex=True):
+        # Remove rows start..end inclusive. When removing several ranges bottom-up,
+        # pass reindex=False and call reindex_from once with the lowest start.
+        self.coords_version += 1
+        for row in range(start, end + 1):
+            self._count(row, -1)
+            del self._row_of[self.ids[row]]
+            self._changed.discard(self.ids[row])
+        if self._bitsets is not None:
+            self.bitsets()
+            # Drop bits start..end and shift the higher rows down to close the gap
+            low_mask = (1 << start) - 1
+            for key, bits in self._bitsets.items():
+                self._bitsets[key] = (bits & low_mask) | ((bits >> (end + 1)) << start)
+        for column in (self.ids, self.status, self.light_status, self.battery, self.latitude, self.longitude, self.extras):
+            del column[start:end + 1]
+        if reindex:
+            self.reindex_from(start)
+
+    def reindex_from(self, first):
+        for row in range(first, len(self.ids)):
+            self._row_of[self.ids[row]] = row
+
+    def clear(self):
+        coords_version = self.coords_version
+        self.__init__()
+        self.coords_version = coords_version + 1
+
+    def _copy_columns_from(self, other):
+        self.ids = list(other.ids)
+        self.status = list(other.status)
+        self.light_status = list(other.light_status)
+        self.battery = array("d", other.battery)
+        self.latitude = array("d", other.latitude)
+        self.longitude = array("d", other.longitude)
+        # Extras dicts are replaced, never mutated, so sharing them is safe
+        self.extras = list(other.extras)
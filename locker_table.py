@@ -0,0 +1,297 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QToolTip
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPainterPath
+import logging
+from locker_store import LockerStore
+
+logger = logging.getLogger(__name__)
+
+# Custom role so any index in a row can resolve its lockerId
+LockerIdRole = Qt.UserRole + 1
+
+# Action buttons: (action name, label, tooltip, normal, hover, pressed colors)
+# Colors mirror styles.qss (QPushButton, #lock_button, #unlock_button, #map_button)
+ACTION_BUTTONS = [
+    ("detail", "Detail", "View and edit locker details", "#FF751A", "#E56717", "#CC5C14"),
+    ("lock", "Lock", "Lock the locker", "#28A745", "#218838", "#1E7E34"),
+    ("unlock", "Unlock", "Unlock the locker", "#DC3545", "#C82333", "#BD2130"),
+    ("map", "View Map", "View locker location on map", "#007BFF", "#0056b3", "#004085"),
+]
+
+
+class LockerTableModel(QAbstractTableModel):
+    COLUMN_ID = 0
+    COLUMN_ACTION = 1
+    HEADERS = ["Locker ID", "Action"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Rows are the store's rows; the model only translates store changes into Qt signals
+        self.store = LockerStore()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == LockerIdRole:
+            return self.store.ids[index.row()]
+        if role == Qt.DisplayRole and index.column() == self.COLUMN_ID:
+            return self.store.ids[index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def set_lockers(self, lockers):
+        self.beginResetModel()
+        self.store.clear()
+        for locker in lockers:
+            self.store.upsert(locker)
+        self.endResetModel()
+
+    def row_of(self, locker_id):
+        return self.store.row_of(locker_id)
+
+    def get_locker(self, locker_id):
+        return self.store.get(locker_id)
+
+    def upsert_locker(self, locker):
+        # Merge a single locker record into its row, or append it if it is new.
+        # Returns the previous record so callers can roll back an optimistic change.
+        row = self.store.row_of(locker["lockerId"])
+        if row is None:
+            row = len(self.store)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.store.upsert(locker)
+            self.endInsertRows()
+            return None
+        previous = self.store.record(row)
+        _, _, changed = self.store.upsert(locker)
+        if changed:
+            self._emit_rows_changed([row])
+        return previous
+
+    def remove_locker(self, locker_id):
+        row = self.store.row_of(locker_id)
+        if row is None:
+            return None
+        previous = self.store.record(row)
+        self._remove_rows([row])
+        return previous
+
+    def add_lockers(self, lockers):
+        # Append the lockers not in the table yet as one insert; returns how many were added
+        new = {}
+        for locker in lockers:
+            if locker["lockerId"] not in self.store:
+                new[locker["lockerId"]] = locker
+        if new:
+            first = len(self.store)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            for locker in new.values():
+                self.store.upsert(locker)
+            self.endInsertRows()
+        return len(new)
+
+    def apply_lockers(self, lockers):
+        # Diff the new payload against the current rows by lockerId and only touch what changed,
+        # so views keep their scroll position and selection across refreshes
+        new_ids = {locker["lockerId"] for locker in lockers}
+        removed_rows = [row for row, locker_id in enumerate(self.store.ids) if locker_id not in new_ids]
+        self._remove_rows(removed_rows)
+
+        changed_rows = []
+        # Keyed by lockerId so a payload listing a locker twice still inserts one row
+        inserted = {}
+        for locker in lockers:
+            if locker["lockerId"] not in self.store:
+                inserted[locker["lockerId"]] = locker
+                continue
+            row, _, changed = self.store.upsert(locker)
+            if changed:
+                changed_rows.append(row)
+        changed_rows.sort()
+        self._emit_rows_changed(changed_rows)
+
+        if inserted:
+            first = len(self.store)
+            self.beginInsertRows(QModelIndex(), first, first + len(inserted) - 1)
+            for locker in inserted.values():
+                self.store.upsert(locker)
+            self.endInsertRows()
+
+        logger.debug(f"Applied refresh: {len(inserted)} inserted, {len(removed_rows)} removed, {len(changed_rows)} changed")
+        return len(inserted), len(removed_rows), len(changed_rows)
+
+    def _remove_rows(self, rows):
+        if not rows:
+            return
+        # Remove contiguous runs from the bottom up so earlier row numbers stay valid
+        rows = sorted(rows, reverse=True)
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            self.store.remove_range(start, end, reindex=False)
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+        self.store.reindex_from(rows[-1])
+
+    def _emit_rows_changed(self, rows):
+        if not rows:
+            return
+        last_column = self.columnCount() - 1
+        # Many scattered changes are cheaper to announce as one span than row by row
+        if len(rows) > 64:
+            self.dataChanged.emit(self.index(rows[0], 0), self.index(rows[-1], last_column))
+            return
+        for row in rows:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+
+class LockerActionDelegate(QStyledItemDelegate):
+    # Emitted with (action name, lockerId) when a painted button is clicked
+    actionTriggered = pyqtSignal(str, str)
+
+    BUTTON_WIDTH = 70
+    BUTTON_HEIGHT = 30
+    BUTTON_SPACING = 2
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.font = QFont("Segoe UI", 12)
+        self.font.setWeight(QFont.DemiBold)
+        self._colors = {
+            name: (QColor(normal), QColor(hover), QColor(pressed))
+            for name, _, _, normal, hover, pressed in ACTION_BUTTONS
+        }
+        # Only one button can be hovered/pressed at a time, so keep just its position
+        self._hover = None
+        self._pressed = None
+        # Hover needs mouse move events even when no button is held
+        self.view.setMouseTracking(True)
+        self.view.viewport().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Leave and (self._hover or self._pressed):
+            self.clear_hover()
+            self.view.viewport().update()
+        return False
+
+    def button_rects(self, cell_rect):
+        # Buttons are laid out top-aligned in one row, like the old cell widgets
+        rects = []
+        x = cell_rect.left() + self.BUTTON_SPACING
+        y = cell_rect.top() + self.BUTTON_SPACING
+        for name, *_ in ACTION_BUTTONS:
+            rects.append((name, QRect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)))
+            x += self.BUTTON_WIDTH + self.BUTTON_SPACING
+        return rects
+
+    def button_at(self, cell_rect, pos):
+        for name, rect in self.button_rects(cell_rect):
+            if rect.contains(pos):
+                return name
+        return None
+
+    def paint(self, painter, option, index):
+        if index.column() != LockerTableModel.COLUMN_ACTION:
+            super().paint(painter, option, index)
+            return
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self.font)
+        labels = {name: label for name, label, *_ in ACTION_BUTTONS}
+        for name, rect in self.button_rects(option.rect):
+            normal, hover, pressed = self._colors[name]
+            key = (index.row(), name)
+            if key == self._pressed:
+                color = pressed
+            elif key == self._hover:
+                color = hover
+            else:
+                color = normal
+            path = QPainterPath()
+            path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 8, 8)
+            painter.fillPath(path, color)
+            painter.setPen(Qt.white)
+            painter.drawText(rect, Qt.AlignCenter, labels[name])
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        if index.column() == LockerTableModel.COLUMN_ACTION:
+            width = len(ACTION_BUTTONS) * (self.BUTTON_WIDTH + self.BUTTON_SPACING) + self.BUTTON_SPACING
+            size.setWidth(width)
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if index.column() != LockerTableModel.COLUMN_ACTION:
+            return super().editorEvent(event, model, option, index)
+
+        event_type = event.type()
+        if event_type == QEvent.MouseMove:
+            name = self.button_at(option.rect, event.pos())
+            hover = (index.row(), name) if name else None
+            if hover != self._hover:
+                self._hover = hover
+                self.view.viewport().update()
+            return False
+        if event_type == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            name = self.button_at(option.rect, event.pos())
+            if name:
+                self._pressed = (index.row(), name)
+                self.view.viewport().update(option.rect)
+                return True
+            return False
+        if event_type == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            pressed = self._pressed
+            self._pressed = None
+            self.view.viewport().update(option.rect)
+            name = self.button_at(option.rect, event.pos())
+            if name and pressed == (index.row(), name):
+                locker_id = index.data(LockerIdRole)
+                logger.debug(f"Action '{name}' clicked for locker {locker_id}")
+                self.actionTriggered.emit(name, locker_id)
+                return True
+            return pressed is not None
+        if event_type == QEvent.MouseButtonDblClick:
+            # Swallow double clicks on buttons so they don't trigger twice
+            return self.button_at(option.rect, event.pos()) is not None
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if index.column() == LockerTableModel.COLUMN_ACTION and event.type() == QEvent.ToolTip:
+            name = self.button_at(option.rect, event.pos())
+            tooltips = {name: tooltip for name, _, tooltip, *_ in ACTION_BUTTONS}
+            if name:
+                QToolTip.showText(event.globalPos(), tooltips[name], view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+    def clear_hover(self):
+        self._hover = None
+        self._pressed = None
@@ -30,7 +30,7 @@ class Ui_MainWindow(object):
         self.btn_refresh.setObjectName("btn_refresh")
         self.top_buttons_layout.addWidget(self.btn_refresh)
         self.central_layout.addLayout(self.top_buttons_layout)
-        self.table_lockers = QtWidgets.QTableWidget(self.centralwidget)
+        self.table_lockers = QtWidgets.QTableView(self.centralwidget)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -38,8 +38,6 @@ class Ui_MainWindow(object):
         self.table_lockers.setSizePolicy(sizePolicy)
         self.table_lockers.setMinimumSize(QtCore.QSize(0, 200))
         self.table_lockers.setObjectName("table_lockers")
-        self.table_lockers.setColumnCount(0)
-        self.table_lockers.setRowCount(0)
         self.central_layout.addWidget(self.table_lockers)
         self.bottom_buttons_layout = QtWidgets.QHBoxLayout()
         self.bottom_buttons_layout.setObjectName("bottom_buttons_layout")
@@ -0,0 +1,52 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_PATH = "app.log"
+# The log file rolls over at this size, keeping LOG_BACKUPS older files
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_listener = None
+
+
+def setup_logging(level=None, path=None):
+    # Loggers only put records on a queue; a listener thread formats them and does the file and
+    # console I/O, so logging never blocks the GUI thread. The level comes from LOCKER_LOG_LEVEL
+    # (default INFO); DEBUG turns on the per-request and per-refresh messages.
+    global _listener
+    if _listener is not None:
+        return _listener
+    level = level or os.environ.get("LOCKER_LOG_LEVEL", "INFO")
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    try:
+        handlers.append(RotatingFileHandler(
+            path or os.environ.get("LOCKER_LOG_PATH", LOG_PATH),
+            maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        ))
+    except OSError as e:
+        print(f"Failed to open log file, logging to the console only: {str(e)}", file=sys.stderr)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the app exits
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,40 +1,75 @@
 import sys
-import requests
+import math
+import time
+# Taken before the Qt imports so the reported time-to-first-paint covers the whole startup
+APP_START = time.perf_counter()
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QDockWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QDialog, QVBoxLayout, QLabel, QPushButton, QAction, QLineEdit, QHBoxLayout, QFileDialog, QWidget, QSizePolicy
+    QApplication, QMainWindow, QDockWidget, QAbstractItemView, QProgressBar,
+    QHeaderView, QMessageBox, QDialog, QVBoxLayout, QLabel, QPushButton, QAction, QLineEdit, QFileDialog,
+    QProgressDialog, QHBoxLayout, QComboBox, QSpinBox
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont
-from PyQt5.uic import loadUi
+from PyQt5.QtCore import Qt, QTimer, QCoreApplication, pyqtSignal
 import logging
-import os
 import warnings
 from datetime import datetime
-import csv
+import threading
+from locker_table import LockerTableModel, LockerActionDelegate, LockerIdRole
+from locker_store import LockerStore, LockerSnapshot
+from locker_filter import LockerFilterProxyModel, LockerFilter, SEARCH_CONTAINS, SEARCH_PREFIX
+from api_worker import ApiTaskRunner
+from api_client import LockerApiClient
+from fleet_cache import FleetCache
+from command_outbox import CommandOutbox, flush_outbox, expected_fields, KIND_COMMAND, KIND_UPDATE
+from sync_scheduler import SyncScheduler
+from push_transport import push_transport_from_env
+from exporter import export_records, export_format, ExportCancelled, EXPORT_FORMATS
+from importer import import_records, changed_fields, IMPORT_FORMATS
+from sparkline import Sparkline
+from alert_dock import AlertDock
+from outbox_dock import OutboxDock, outbox_summary, MAX_OUTBOX_ROWS
+from diagnostics import timed
+from diagnostics_dock import DiagnosticsDock
+from logging_setup import setup_logging
+from locker_ui import Ui_MainWindow
 
-# Setup logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('app.log'), logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
-# Try importing MapDialog
-try:
-    from map_dialog import MapDialog
-    logger.debug("Successfully imported MapDialog")
-except ImportError as e:
-    logger.error(f"Failed to import MapDialog: {str(e)}")
-    QMessageBox.critical(None, "Error", f"Failed to import MapDialog: {str(e)}\nEnsure 'map_dialog.py' is in the correct directory and 'folium' is installed.")
-    sys.exit(1)
-
 # Suppress deprecation warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+# Keystrokes in the filter bar are applied once typing pauses for this long
+FILTER_DEBOUNCE_MS = 150
+# Delay after first paint before the map stack is loaded in the idle time
+MAP_PREWARM_DELAY_MS = 1500
+# Table orders offered in the filter bar
+SORT_TABLE = "table"
+SORT_DRAIN = "drain"
+# Battery forecasts are re-sorted at most this often while "Dies soonest" is shown
+RESORT_DELAY_MS = 1000
+# Alert transitions logged one by one per run; the rest are summarized in one line
+MAX_LOGGED_ALERTS = 50
+# Commands queued within this window go out in one outbox flush, so quick repeat clicks coalesce
+OUTBOX_FLUSH_DELAY_MS = 250
+
+def load_map_module():
+    # map_dialog pulls in QtWebEngine, so it is only imported when a map is first needed
+    import map_dialog
+    return map_dialog
+
+def forecast_text(hours):
+    if hours is None or hours != hours:
+        return "Battery forecast: not enough history yet"
+    if hours == float("inf"):
+        return "Battery forecast: not draining"
+    if hours >= 48:
+        return f"Battery forecast: empty in about {hours / 24:.1f} days"
+    return f"Battery forecast: empty in about {hours:.1f} hours"
+
 class LockerDetailDialog(QDialog):
-    def __init__(self, locker_data, parent=None):
+    # Emitted with the edited fields; the app queues the update in the outbox
+    updateRequested = pyqtSignal(dict)
+
+    def __init__(self, locker_data, history=None, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"Details for {locker_data['lockerId']}")
         self.locker_data = locker_data
@@ -47,11 +82,20 @@ class LockerDetailDialog(QDialog):
                 self.fields[key] = input_field
                 layout.addWidget(label)
                 layout.addWidget(input_field)
+
+        # Battery, status and light history recorded since the app started
+        if history is not None:
+            times, battery, status, light_status = history.series(locker_data["lockerId"])
+            self.sparkline = Sparkline()
+            self.sparkline.set_series(times, battery, status, light_status)
+            layout.addWidget(QLabel("History (battery, status, light):"))
+            layout.addWidget(self.sparkline)
+            layout.addWidget(QLabel(forecast_text(history.hours_left(locker_data["lockerId"], locker_data.get("batteryPercentage")))))
         
         # Edit button
-        edit_button = QPushButton("Edit")
-        edit_button.clicked.connect(self.edit_locker)
-        layout.addWidget(edit_button)
+        self.edit_button = QPushButton("Edit")
+        self.edit_button.clicked.connect(self.edit_locker)
+        layout.addWidget(self.edit_button)
 
         self.setLayout(layout)
         self.setMinimumSize(400, 350)
@@ -59,50 +103,40 @@ class LockerDetailDialog(QDialog):
     def edit_locker(self):
         try:
             data = {
-                "lockerId": self.locker_data["lockerId"],
                 "status": self.fields["status"].text() if self.fields["status"].text() else self.locker_data["status"],
                 "lightStatus": self.fields["lightStatus"].text() if self.fields["lightStatus"].text() else self.locker_data["lightStatus"],
                 "batteryPercentage": float(self.fields["batteryPercentage"].text()) if self.fields["batteryPercentage"].text() else self.locker_data["batteryPercentage"],
                 "latitude": float(self.fields["latitude"].text()) if self.fields["latitude"].text() else self.locker_data["latitude"],
                 "longitude": float(self.fields["longitude"].text()) if self.fields["longitude"].text() else self.locker_data["longitude"]
             }
-            response = requests.put(f"https://locker-api.vercel.app/locker/update/{self.locker_data['lockerId']}", json=data)
-            response.raise_for_status()
-            result = response.json()
-            if result["success"]:
-                QMessageBox.information(self, "Success", "Locker updated successfully")
-                self.accept()
-            else:
-                raise Exception(result["message"])
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to update locker: {str(e)}")
+            return
+        # Only the fields that were actually edited are sent
+        changes = changed_fields(self.locker_data, data)
+        if not changes:
+            QMessageBox.information(self, "Info", "No changes to save")
+            return
+        self.updateRequested.emit(changes)
+        self.accept()
 
-class LockerApp(QMainWindow):
+class LockerApp(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
         logger.debug("Initializing LockerApp")
-        self.table_lockers_data = []
         self.selected_locker_id = None
+        # Rows shown progressively while the current refresh streams in
+        self.streamed_lockers = 0
+        # Who asked for the refresh in flight: "foreground" (a click) and/or "background" (a poll)
+        self.refresh_callers = set()
+        self.telemetry = None
+        self.telemetry_unavailable = False
+        self.alert_engine = None
+        self.alerts_unavailable = False
 
-        # Load UI file
-        ui_file = "locker.ui"
-        current_dir = os.getcwd()
-        ui_path = os.path.join(current_dir, ui_file)
-        logger.debug(f"Looking for UI file at: {ui_path}")
-        if not os.path.exists(ui_path):
-            logger.error(f"UI file '{ui_file}' not found at {ui_path}")
-            QMessageBox.critical(None, "Error", f"UI file '{ui_file}' not found")
-            sys.exit(1)
-        try:
-            with open(ui_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                logger.debug(f"Total lines in UI file: {len(lines)}")
-                logger.debug(f"First 100 chars: {''.join(lines)[:100]}...")
-            loadUi(ui_file, self)
-        except Exception as e:
-            logger.error(f"Failed to load UI file: {str(e)}")
-            QMessageBox.critical(None, "Error", f"Failed to load UI file: {str(e)}\nCheck 'locker.ui' for XML syntax errors.")
-            sys.exit(1)
+        # Build UI from the precompiled locker_ui module instead of parsing locker.ui at runtime
+        self.setupUi(self)
+        self.first_paint_reported = False
         self.setWindowTitle("Locker Management System")
 
         self.resize(1000, 600) 
@@ -117,6 +151,21 @@ class LockerApp(QMainWindow):
         self.timer.start(1000)
         self.update_status_time()
 
+        # Setup API client and background runner with a busy indicator and cancel button in the status bar
+        self.api_client = LockerApiClient()
+        self.api_runner = ApiTaskRunner(self)
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumWidth(120)
+        self.busy_bar.setTextVisible(False)
+        self.btn_cancel_requests = QPushButton("Cancel")
+        self.btn_cancel_requests.setToolTip("Cancel pending requests")
+        self.btn_cancel_requests.clicked.connect(self.cancel_requests)
+        self.statusBar().addPermanentWidget(self.busy_bar)
+        self.statusBar().addPermanentWidget(self.btn_cancel_requests)
+        self.api_runner.busyChanged.connect(self.update_busy_indicator)
+        self.update_busy_indicator(False)
+
         # Setup Menu Bar
         menu_bar = self.menuBar()
         view_menu = menu_bar.addMenu("View")
@@ -125,6 +174,26 @@ class LockerApp(QMainWindow):
         self.toggle_dock_action.setChecked(True)
         self.toggle_dock_action.triggered.connect(self.toggle_help_dock)
         view_menu.addAction(self.toggle_dock_action)
+        self.toggle_alerts_action = QAction("Show Alerts", self)
+        self.toggle_alerts_action.setCheckable(True)
+        self.toggle_alerts_action.setChecked(True)
+        self.toggle_alerts_action.triggered.connect(self.toggle_alert_dock)
+        view_menu.addAction(self.toggle_alerts_action)
+        self.toggle_diagnostics_action = QAction("Show Diagnostics", self)
+        self.toggle_diagnostics_action.setCheckable(True)
+        self.toggle_diagnostics_action.triggered.connect(self.toggle_diagnostics_dock)
+        view_menu.addAction(self.toggle_diagnostics_action)
+        self.toggle_outbox_action = QAction("Show Outbox", self)
+        self.toggle_outbox_action.setCheckable(True)
+        self.toggle_outbox_action.triggered.connect(self.toggle_outbox_dock)
+        view_menu.addAction(self.toggle_outbox_action)
+        self.fleet_map = None
+        self.fleet_map_action = QAction("Fleet Map", self)
+        self.fleet_map_action.triggered.connect(self.show_fleet_map)
+        view_menu.addAction(self.fleet_map_action)
+        self.nearby_action = QAction("Nearby Lockers...", self)
+        self.nearby_action.triggered.connect(self.show_nearby_lockers)
+        view_menu.addAction(self.nearby_action)
 
         # Setup QDockWidget
         self.help_dock.setFloating(False)
@@ -134,56 +203,425 @@ class LockerApp(QMainWindow):
             "- Single-click to select a locker for copying.\n"
             "- Click 'Detail' to view/edit details.\n"
             "- Click 'Lock' or 'Unlock' to control locker state.\n"
+            "- Ctrl/Shift-click rows, then 'Lock Selected' or 'Unlock Selected' for many lockers.\n"
             "- Click 'View Map' to see locker location.\n"
+            "- Use View > Fleet Map to see every locker on one map.\n"
+            "- Use View > Nearby Lockers to find the lockers closest to a point or within a radius.\n"
+            "- Type in the search box or pick a status, light or battery range to filter the table.\n"
+            "- Pick 'Dies soonest' to list the lockers whose battery is forecast to run out first.\n"
+            "- 'Detail' shows battery, status and light history as sparklines.\n"
+            "- Use View > Show Diagnostics for API, table and map latency percentiles.\n"
+            "- Lock, unlock and edits are queued in the outbox and retried until the API takes them; see View > Show Outbox.\n"
+            "- The Alerts dock lists low batteries, lockers left unlocked and lockers that stopped reporting; double-click one for details.\n"
             "- Use 'Copy to Clipboard' and 'Paste from Clipboard' for locker ID.\n"
-            "- Use 'Export to CSV' to save locker data."
+            "- Use 'Import' to update many lockers from a CSV or JSON file with lockerId plus the fields to change.\n"
+            "- Use 'Export to CSV' to save locker data as CSV, gzip CSV, Parquet or Arrow."
         )
         self.help_dock.visibilityChanged.connect(self.update_dock_action_state)
 
+        # Alerts dock below the help dock, fed by the alert rules after every refresh
+        self.alert_dock = AlertDock(self)
+        self.alert_dock.setFeatures(QDockWidget.DockWidgetClosable | QDockWidget.DockWidgetMovable)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.alert_dock)
+        self.alert_dock.lockerActivated.connect(self.show_locker_details)
+        self.alert_dock.visibilityChanged.connect(self.toggle_alerts_action.setChecked)
+
+        # Diagnostics dock as a tab next to the help dock, hidden until asked for
+        self.diagnostics_dock = DiagnosticsDock(self)
+        self.diagnostics_dock.setFeatures(QDockWidget.DockWidgetClosable | QDockWidget.DockWidgetMovable)
+        self.tabifyDockWidget(self.help_dock, self.diagnostics_dock)
+        self.help_dock.raise_()
+        self.diagnostics_dock.hide()
+        self.diagnostics_dock.visibilityChanged.connect(self.toggle_diagnostics_action.setChecked)
+
+        # Outbox dock as a tab next to the alerts, hidden until asked for; the queue depth is in the status bar
+        self.outbox_dock = OutboxDock(self)
+        self.outbox_dock.setFeatures(QDockWidget.DockWidgetClosable | QDockWidget.DockWidgetMovable)
+        self.tabifyDockWidget(self.alert_dock, self.outbox_dock)
+        self.alert_dock.raise_()
+        self.outbox_dock.hide()
+        self.outbox_dock.visibilityChanged.connect(self.on_outbox_dock_visibility)
+        self.outbox_dock.retryFailed.connect(self.retry_failed_commands)
+        self.outbox_dock.discardFailed.connect(self.discard_failed_commands)
+        self.outbox_label = QLabel()
+        self.statusBar().addPermanentWidget(self.outbox_label)
+
         # Setup Clipboard and Buttons
         self.clipboard = QApplication.clipboard()
         self.btn_copy_clipboard.clicked.connect(self.copy_to_clipboard)
         self.btn_paste_clipboard.clicked.connect(self.paste_from_clipboard)
         self.btn_tambah_locker.clicked.connect(self.tambah_locker)
         self.btn_hapus_locker.clicked.connect(self.hapus_locker)
-        self.btn_refresh.clicked.connect(self.get_all_lockers)
+        self.btn_refresh.clicked.connect(lambda: self.get_all_lockers())
+
+        # Add bulk Lock/Unlock Selected buttons to top_buttons_layout
+        self.export_stop = None
+        self.import_stop = None
+        self.btn_lock_selected = QPushButton("Lock Selected")
+        self.btn_lock_selected.setObjectName("lock_button")
+        self.btn_lock_selected.setToolTip("Lock every selected locker")
+        self.btn_lock_selected.clicked.connect(lambda: self.bulk_send_command("lock"))
+        self.top_buttons_layout.addWidget(self.btn_lock_selected)
+        self.btn_unlock_selected = QPushButton("Unlock Selected")
+        self.btn_unlock_selected.setObjectName("unlock_button")
+        self.btn_unlock_selected.setToolTip("Unlock every selected locker")
+        self.btn_unlock_selected.clicked.connect(lambda: self.bulk_send_command("unlock"))
+        self.top_buttons_layout.addWidget(self.btn_unlock_selected)
 
-        # Add Export to CSV button to bottom_buttons_layout
+        # Add Import and Export to CSV buttons to bottom_buttons_layout
+        self.btn_import = QPushButton("Import")
+        self.btn_import.setToolTip("Update lockers from a CSV or JSON file; only changed fields are sent")
+        self.bottom_buttons_layout.addWidget(self.btn_import)
+        self.btn_import.clicked.connect(self.import_lockers)
         self.btn_export_csv = QPushButton("Export to CSV")
         self.bottom_buttons_layout.addWidget(self.btn_export_csv)
         self.btn_export_csv.clicked.connect(self.export_to_csv)
 
-        # Setup QTableWidget with Detail, Lock, Unlock, and View Map Buttons
-        self.table_lockers.setColumnCount(2)
-        self.table_lockers.setHorizontalHeaderLabels(["Locker ID", "Action"])
+        # Setup QTableView; Detail, Lock, Unlock, and View Map buttons are painted by the delegate.
+        # The view shows the model through a filter proxy that passes everything through until a filter is set.
+        self.locker_model = LockerTableModel(self)
+        self.locker_store = self.locker_model.store
+        self.locker_proxy = LockerFilterProxyModel(self)
+        self.locker_proxy.setSourceModel(self.locker_model)
+        self.table_lockers.setModel(self.locker_proxy)
+        self.setup_filter_bar()
+        self.action_delegate = LockerActionDelegate(self.table_lockers)
+        self.action_delegate.actionTriggered.connect(self.handle_locker_action)
+        self.table_lockers.setItemDelegateForColumn(LockerTableModel.COLUMN_ACTION, self.action_delegate)
+        self.table_lockers.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_lockers.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table_lockers.setEditTriggers(QAbstractItemView.NoEditTriggers)
         header = self.table_lockers.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
         header.setSectionResizeMode(1, QHeaderView.Fixed)
         self.table_lockers.setColumnWidth(0, 400)  
         self.table_lockers.setColumnWidth(1, 400) 
-        self.table_lockers.itemClicked.connect(self.select_locker)
+        # Fixed row heights let the view skip measuring rows, so only visible rows cost anything
+        vertical_header = self.table_lockers.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(50)
+        self.table_lockers.clicked.connect(self.select_locker)
         self.table_lockers.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.table_lockers.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
 
-        # Load initial data
+        # Background sync: adaptive polling, plus push deltas when LOCKER_PUSH_URL is set
+        self.sync_scheduler = SyncScheduler(lambda: self.get_all_lockers(background=True), self)
+        self.push_transport = push_transport_from_env(self)
+        if self.push_transport is not None:
+            self.push_transport.deltaReceived.connect(self.on_push_delta)
+            self.push_transport.connectedChanged.connect(self.on_push_connected)
+
+        # Show the last-known fleet from the local cache right away, then revalidate in the background
+        try:
+            self.fleet_cache = FleetCache()
+        except Exception as e:
+            logger.error(f"Failed to open fleet cache, falling back to memory: {str(e)}")
+            self.fleet_cache = FleetCache(":memory:")
+        cached_lockers = self.fleet_cache.load()
+
+        # Commands and edits go through an on-disk outbox, so ones queued before a crash or while offline are still sent
+        try:
+            self.outbox = CommandOutbox()
+        except Exception as e:
+            logger.error(f"Failed to open command outbox, falling back to memory: {str(e)}")
+            self.outbox = CommandOutbox(":memory:")
+        # Server values of the fields queued entries change, per locker, to roll back to if the API rejects them
+        self.outbox_previous = {}
+        self.outbox_stop = None
+        self.outbox_timer = QTimer(self)
+        self.outbox_timer.setSingleShot(True)
+        self.outbox_timer.timeout.connect(self.flush_commands)
+        if cached_lockers:
+            self.locker_model.set_lockers(cached_lockers)
+            self.overlay_outbox()
+            self.statusBar().showMessage(f"Showing {len(cached_lockers)} cached lockers, refreshing...", 5000)
+            logger.debug(f"Loaded {len(cached_lockers)} lockers from cache")
+
+        # Load initial data, then let the scheduler keep it fresh
         self.get_all_lockers()
+        self.update_outbox_view()
+        self.schedule_outbox_flush()
+        self.sync_scheduler.start()
+        if self.push_transport is not None:
+            self.push_transport.start()
+
+    def setup_filter_bar(self):
+        # Filter bar between the top buttons and the table
+        self.filter_layout = QHBoxLayout()
+        self.input_search = QLineEdit()
+        self.input_search.setPlaceholderText("Search locker ID...")
+        self.input_search.setClearButtonEnabled(True)
+        self.combo_search_mode = QComboBox()
+        self.combo_search_mode.addItem("Contains", SEARCH_CONTAINS)
+        self.combo_search_mode.addItem("Starts with", SEARCH_PREFIX)
+        self.combo_status = QComboBox()
+        self.combo_status.setToolTip("Filter by status")
+        self.combo_light_status = QComboBox()
+        self.combo_light_status.setToolTip("Filter by light status")
+        self.spin_battery_min = QSpinBox()
+        self.spin_battery_max = QSpinBox()
+        for spin in (self.spin_battery_min, self.spin_battery_max):
+            spin.setRange(0, 100)
+            spin.setSuffix("%")
+        self.spin_battery_max.setValue(100)
+        self.spin_battery_min.setToolTip("Minimum battery")
+        self.spin_battery_max.setToolTip("Maximum battery")
+        self.combo_sort = QComboBox()
+        self.combo_sort.addItem("Table order", SORT_TABLE)
+        self.combo_sort.addItem("Dies soonest", SORT_DRAIN)
+        self.combo_sort.setToolTip("Order lockers by forecast hours until the battery is empty")
+        self.btn_clear_filter = QPushButton("Clear")
+        self.btn_clear_filter.setToolTip("Show all lockers")
+        self.filter_count_label = QLabel()
+        self.filter_layout.addWidget(self.input_search, 1)
+        self.filter_layout.addWidget(self.combo_search_mode)
+        self.filter_layout.addWidget(self.combo_status)
+        self.filter_layout.addWidget(self.combo_light_status)
+        self.filter_layout.addWidget(QLabel("Battery"))
+        self.filter_layout.addWidget(self.spin_battery_min)
+        self.filter_layout.addWidget(QLabel("to"))
+        self.filter_layout.addWidget(self.spin_battery_max)
+        self.filter_layout.addWidget(self.combo_sort)
+        self.filter_layout.addWidget(self.btn_clear_filter)
+        self.filter_layout.addWidget(self.filter_count_label)
+        self.central_layout.insertLayout(self.central_layout.indexOf(self.table_lockers), self.filter_layout)
+        self.refresh_filter_choices()
+
+        # Debounce: every edit restarts the timer and the filter runs once input settles
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.input_search.textChanged.connect(self.filter_timer.start)
+        self.combo_search_mode.currentIndexChanged.connect(self.filter_timer.start)
+        self.combo_status.currentIndexChanged.connect(self.filter_timer.start)
+        self.combo_light_status.currentIndexChanged.connect(self.filter_timer.start)
+        self.spin_battery_min.valueChanged.connect(self.filter_timer.start)
+        self.spin_battery_max.valueChanged.connect(self.filter_timer.start)
+        self.btn_clear_filter.clicked.connect(self.clear_filter)
+        self.combo_sort.currentIndexChanged.connect(self.apply_sort)
+        self.sort_timer = QTimer(self)
+        self.sort_timer.setSingleShot(True)
+        self.sort_timer.setInterval(RESORT_DELAY_MS)
+        self.sort_timer.timeout.connect(self.locker_proxy.resort)
+
+        self.locker_model.modelReset.connect(self.refresh_filter_choices)
+        self.locker_model.rowsInserted.connect(self.refresh_filter_choices)
+        self.locker_model.dataChanged.connect(self.refresh_filter_choices)
+        self.locker_proxy.modelReset.connect(self.update_filter_count)
+        self.locker_proxy.rowsInserted.connect(self.update_filter_count)
+        self.locker_proxy.rowsRemoved.connect(self.update_filter_count)
+        self.update_filter_count()
+
+    def refresh_filter_choices(self):
+        # Offer the status values currently present in the fleet, keeping the current choice
+        for combo, label, values in (
+            (self.combo_status, "All statuses", self.locker_store.status_values()),
+            (self.combo_light_status, "All lights", self.locker_store.light_status_values()),
+        ):
+            current = combo.currentData()
+            if current is not None and current not in values:
+                values.append(current)
+            if [combo.itemData(i) for i in range(1, combo.count())] == values:
+                continue
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(label, None)
+            for value in values:
+                combo.addItem(value, value)
+            combo.setCurrentIndex(max(0, combo.findData(current)) if current is not None else 0)
+            combo.blockSignals(False)
+
+    def apply_filter(self):
+        self.locker_proxy.set_filter(LockerFilter(
+            text=self.input_search.text().strip(),
+            mode=self.combo_search_mode.currentData(),
+            status=self.combo_status.currentData(),
+            light_status=self.combo_light_status.currentData(),
+            battery_min=self.spin_battery_min.value(),
+            battery_max=self.spin_battery_max.value()
+        ))
+        self.update_filter_count()
+
+    def clear_filter(self):
+        self.input_search.clear()
+        self.combo_status.setCurrentIndex(0)
+        self.combo_light_status.setCurrentIndex(0)
+        self.spin_battery_min.setValue(0)
+        self.spin_battery_max.setValue(100)
+        self.filter_timer.stop()
+        self.apply_filter()
+
+    def apply_sort(self):
+        if self.combo_sort.currentData() != SORT_DRAIN:
+            self.locker_proxy.set_sort_key(None)
+            return
+        if self.load_telemetry() is None:
+            QMessageBox.critical(self, "Error", "Battery forecasts need the 'numpy' module. Please install it using 'pip install numpy'.")
+            self.combo_sort.setCurrentIndex(0)
+            return
+        self.locker_proxy.set_sort_key(self.drain_sort_keys)
+
+    def drain_sort_keys(self, store):
+        # Soonest empty first; lockers that are not draining or have too little history go last.
+        # Called while the proxy resets, so a failure keeps source order instead of raising.
+        try:
+            return [hours if hours == hours else math.inf for hours in self.telemetry.hours_to_empty(store).tolist()]
+        except Exception as e:
+            logger.error(f"Failed to forecast battery life: {str(e)}")
+            return [math.inf] * len(store)
+
+    def load_telemetry(self):
+        # Telemetry history needs NumPy, so it is imported on first use and stays off without it
+        if self.telemetry is None and not self.telemetry_unavailable:
+            try:
+                from telemetry import TelemetryHistory
+                self.telemetry = TelemetryHistory()
+            except ImportError as e:
+                self.telemetry_unavailable = True
+                logger.warning(f"Telemetry history disabled: {str(e)}")
+        return self.telemetry
+
+    def record_telemetry(self, locker_ids=None):
+        # Sample the whole fleet, or only the given lockers after a merge
+        if self.load_telemetry() is None:
+            return
+        rows = None
+        if locker_ids is not None:
+            rows = [row for row in map(self.locker_store.row_of, locker_ids) if row is not None]
+            if not rows:
+                return
+        try:
+            with timed("telemetry record"):
+                self.telemetry.record_store(self.locker_store, rows=rows)
+        except Exception as e:
+            logger.error(f"Failed to record telemetry: {str(e)}")
+            return
+        if self.locker_proxy.is_sorted():
+            self.sort_timer.start()
+
+    def load_alert_engine(self):
+        # The alert rules run on NumPy, so the engine is imported on first use and stays off without it
+        if self.alert_engine is None and not self.alerts_unavailable:
+            try:
+                from alerts import AlertEngine
+                self.alert_engine = AlertEngine()
+            except ImportError as e:
+                self.alerts_unavailable = True
+                logger.warning(f"Alerts disabled: {str(e)}")
+            except Exception as e:
+                self.alerts_unavailable = True
+                logger.error(f"Failed to load alert rules: {str(e)}")
+                QMessageBox.critical(self, "Error", f"Failed to load alert rules: {str(e)}")
+        return self.alert_engine
+
+    def run_alerts(self, removed=False):
+        # Checks the lockers changed since the last run, plus the time-based rules on every locker
+        if self.load_alert_engine() is None:
+            return
+        if removed:
+            self.alert_engine.prune(self.locker_store)
+            self.alert_dock.forget([locker_id for locker_id, _ in self.alert_dock.active if locker_id not in self.locker_store])
+        try:
+            with timed("alert rules"):
+                events = self.alert_engine.process(self.locker_store)
+        except Exception as e:
+            logger.error(f"Failed to check alerts: {str(e)}")
+            return
+        for event in events[:MAX_LOGGED_ALERTS]:
+            if event["raised"]:
+                logger.warning(f"Alert {event['rule']} ({event['severity']}) on locker {event['lockerId']}: {event['message']}")
+            else:
+                logger.info(f"Alert {event['rule']} cleared on locker {event['lockerId']}")
+        if len(events) > MAX_LOGGED_ALERTS:
+            raised = sum(1 for event in events if event["raised"])
+            logger.warning(f"{len(events)} alert changes in total: {raised} raised, {len(events) - raised} cleared")
+        self.alert_dock.add_events(events)
+
+    def update_filter_count(self):
+        total = self.locker_model.rowCount()
+        if self.locker_proxy.is_filtered():
+            self.filter_count_label.setText(f"{self.locker_proxy.rowCount()} of {total} lockers")
+        else:
+            self.filter_count_label.setText(f"{total} lockers")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_reported:
+            self.first_paint_reported = True
+            elapsed_ms = (time.perf_counter() - APP_START) * 1000
+            logger.info(f"Time to first paint: {elapsed_ms:.0f} ms")
+            self.statusBar().showMessage(f"Ready in {elapsed_ms:.0f} ms", 5000)
+            QTimer.singleShot(MAP_PREWARM_DELAY_MS, self.prewarm_map)
+
+    def prewarm_map(self):
+        # Load QtWebEngine and the map page while the user is still looking at the table
+        try:
+            start = time.perf_counter()
+            load_map_module().MapEngine.instance()
+            logger.debug(f"Map engine prewarmed in {(time.perf_counter() - start) * 1000:.0f} ms")
+        except Exception as e:
+            logger.warning(f"Failed to prewarm map: {str(e)}")
 
     def update_status_time(self):
         current_time = datetime.now().strftime("%H:%M:%S %p WITA")
         self.statusBar().showMessage(f"Time: {current_time}", 1000)
 
+    def update_busy_indicator(self, busy):
+        self.busy_bar.setVisible(busy)
+        self.btn_cancel_requests.setVisible(busy)
+
+    def cancel_requests(self):
+        if self.export_stop is not None:
+            self.export_stop.set()
+            self.finish_export()
+        if self.import_stop is not None:
+            self.import_stop.set()
+            self.finish_import()
+        if self.outbox_stop is not None:
+            self.outbox_stop.set()
+            self.outbox_stop = None
+        self.api_runner.cancel_all()
+        self.sync_scheduler.report_cancelled()
+        self.update_outbox_view()
+        self.btn_tambah_locker.setEnabled(True)
+        self.btn_hapus_locker.setEnabled(True)
+        self.statusBar().showMessage("Pending requests cancelled", 5000)
+        logger.debug("Pending requests cancelled by user")
+
     def toggle_help_dock(self):
         if self.help_dock.isVisible():
             self.help_dock.hide()
         else:
             self.help_dock.show()
 
+    def toggle_diagnostics_dock(self):
+        if self.diagnostics_dock.isVisible():
+            self.diagnostics_dock.hide()
+        else:
+            self.diagnostics_dock.show()
+            self.diagnostics_dock.raise_()
+
+    def toggle_outbox_dock(self):
+        if self.outbox_dock.isVisible():
+            self.outbox_dock.hide()
+        else:
+            self.outbox_dock.show()
+            self.outbox_dock.raise_()
+
+    def on_outbox_dock_visibility(self, visible):
+        self.toggle_outbox_action.setChecked(visible)
+        if visible:
+            self.update_outbox_view()
+
+    def toggle_alert_dock(self):
+        self.alert_dock.setVisible(not self.alert_dock.isVisible())
+
     def update_dock_action_state(self, visible):
         self.toggle_dock_action.setChecked(visible)
 
-    def select_locker(self, item):
-        row = item.row()
-        self.selected_locker_id = self.table_lockers.item(row, 0).text()
+    def select_locker(self, index):
+        self.selected_locker_id = index.data(LockerIdRole)
         self.statusBar().showMessage(f"Selected {self.selected_locker_id} for copying", 5000)
         logger.debug(f"Selected locker ID {self.selected_locker_id} for copying")
 
@@ -206,189 +644,576 @@ class LockerApp(QMainWindow):
             self.statusBar().showMessage("Clipboard is empty", 5000)
             logger.warning("Clipboard is empty")
 
-    def show_locker_details(self, row):
-        locker_id = self.table_lockers.item(row, 0).text()
-        for locker in self.table_lockers_data:
-            if locker["lockerId"] == locker_id:
-                dialog = LockerDetailDialog(locker, self)
-                dialog.exec_()
-                self.get_all_lockers()
-                break
+    def handle_locker_action(self, action, locker_id):
+        if action == "detail":
+            self.show_locker_details(locker_id)
+        elif action == "lock":
+            self.lock_locker(locker_id)
+        elif action == "unlock":
+            self.unlock_locker(locker_id)
+        elif action == "map":
+            self.show_locker_map(locker_id)
+
+    def show_locker_details(self, locker_id):
+        locker = self.locker_store.get(locker_id)
+        if locker is None:
+            return
+        dialog = LockerDetailDialog(locker, self.load_telemetry(), self)
+        dialog.updateRequested.connect(lambda data: self.update_locker(locker_id, data))
+        dialog.exec_()
 
     def show_locker_map(self, locker_id):
-        for locker in self.table_lockers_data:
-            if locker["lockerId"] == locker_id:
-                try:
-                    dialog = MapDialog([locker], self)
-                    dialog.exec_()
-                except Exception as e:
-                    logger.error(f"Failed to show map for locker {locker_id}: {str(e)}")
-                    QMessageBox.critical(self, "Error", f"Failed to show map: {str(e)}")
-                break
+        locker = self.locker_store.get(locker_id)
+        if locker is None:
+            return
+        try:
+            map_dialog = load_map_module()
+            # With the fleet map open, focus the locker there instead of taking its view away
+            if self.fleet_map is not None and self.fleet_map.isVisible():
+                self.fleet_map.focus_locker(locker_id)
+                self.fleet_map.raise_()
+                self.fleet_map.activateWindow()
+                return
+            dialog = map_dialog.MapDialog([locker], self)
+            dialog.exec_()
+        except Exception as e:
+            logger.error(f"Failed to show map for locker {locker_id}: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to show map: {str(e)}")
 
-    def lock_locker(self, locker_id):
+    def show_nearby_lockers(self):
         try:
-            payload = {
-                "id": locker_id,
-                "command": "lock"
-            }
-            response = requests.post("https://locker-api.vercel.app/locker/command", json=payload)
-            response.raise_for_status()
-            result = response.json()
-            if result["success"]:
-                execution_status = "The command will be executed." if result["locker"]["isRunCommand"] else "The command will not be executed."
-                QMessageBox.information(self, "Success", f"{result['message']}\n{execution_status}")
-                self.statusBar().showMessage(f"Command 'lock' sent for locker {locker_id}", 5000)
-                logger.debug(f"Command 'lock' sent for locker {locker_id}")
-                self.get_all_lockers()
-            else:
-                raise Exception(result["message"])
+            # The spatial index needs NumPy, so it is only imported when first used
+            from nearby_dialog import NearbyDialog
+        except ImportError as e:
+            logger.error(f"Failed to load nearby search: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Nearby search needs the 'numpy' module. Please install it using 'pip install numpy'.")
+            return
+        dialog = NearbyDialog(self.locker_store, self.selected_locker_id, self)
+        dialog.actionTriggered.connect(self.handle_locker_action)
+        dialog.exec_()
+
+    def show_fleet_map(self):
+        # The fleet map stays open alongside the table and follows model updates in place
+        try:
+            if self.fleet_map is None:
+                self.fleet_map = load_map_module().FleetMapDialog(self.locker_model, self)
+            self.fleet_map.show()
+            self.fleet_map.raise_()
+            self.fleet_map.activateWindow()
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to lock locker {locker_id}: {str(e)}")
-            logger.error(f"Failed to send lock command: {str(e)}")
+            logger.error(f"Failed to show fleet map: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to show fleet map: {str(e)}")
+
+    def lock_locker(self, locker_id):
+        self.send_command(locker_id, "lock")
 
     def unlock_locker(self, locker_id):
+        self.send_command(locker_id, "unlock")
+
+    def send_command(self, locker_id, command):
+        self.statusBar().showMessage(f"Sending '{command}' to locker {locker_id}...", 5000)
+        self.queue_command(locker_id, KIND_COMMAND, {"command": command})
+
+    def update_locker(self, locker_id, data):
+        self.statusBar().showMessage(f"Saving changes to locker {locker_id}...", 5000)
+        self.queue_command(locker_id, KIND_UPDATE, data)
+
+    def queue_command(self, locker_id, kind, payload):
+        expected = expected_fields(kind, payload)
+        self.show_expected(locker_id, expected)
         try:
-            payload = {
-                "id": locker_id,
-                "command": "unlock"
-            }
-            response = requests.post("https://locker-api.vercel.app/locker/command", json=payload)
-            response.raise_for_status()
-            result = response.json()
-            if result["success"]:
-                execution_status = "The command will be executed." if result["locker"]["isRunCommand"] else "The command will not be executed."
-                QMessageBox.information(self, "Success", f"{result['message']}\n{execution_status}")
-                self.statusBar().showMessage(f"Command 'unlock' sent for locker {locker_id}", 5000)
-                logger.debug(f"Command 'unlock' sent for locker {locker_id}")
-                self.get_all_lockers()
-            else:
-                raise Exception(result["message"])
+            self.outbox.enqueue(locker_id, kind, payload)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to unlock locker {locker_id}: {str(e)}")
-            logger.error(f"Failed to send unlock command: {str(e)}")
+            logger.error(f"Failed to queue {kind} for locker {locker_id}: {str(e)}")
+            self.restore_optimistic(locker_id, expected)
+            QMessageBox.critical(self, "Error", f"Failed to queue command for locker {locker_id}: {str(e)}")
+            return
+        self.update_outbox_view()
+        self.schedule_outbox_flush(OUTBOX_FLUSH_DELAY_MS)
+
+    def show_expected(self, locker_id, expected):
+        # Show the expected state right away and keep the server value of each changed field to roll back to
+        current = self.locker_model.get_locker(locker_id)
+        if current is not None:
+            previous = self.outbox_previous.setdefault(locker_id, {})
+            for field in expected:
+                previous.setdefault(field, current.get(field))
+            self.locker_model.upsert_locker({**current, **expected})
+
+    def restore_optimistic(self, locker_id, fields):
+        # Roll the given fields back to their server values, except those a queued entry still changes
+        previous = self.outbox_previous.get(locker_id)
+        if not previous:
+            return
+        still_expected = self.outbox.expected(locker_id).get(locker_id, {})
+        restored = {field: previous.pop(field) for field in fields if field in previous and field not in still_expected}
+        if not previous:
+            del self.outbox_previous[locker_id]
+        current = self.locker_model.get_locker(locker_id)
+        if restored and current is not None:
+            self.locker_model.upsert_locker({**current, **restored})
+
+    def overlay_outbox(self, refreshed=None):
+        # Refreshes and pushes carry the server state, which does not include entries still in the
+        # outbox; put their expected fields back on top. `refreshed` maps lockerId to the record just
+        # read from the server (None: the whole table is fresh); those values become the ones to
+        # roll back to.
+        for locker_id, expected in self.outbox.expected().items():
+            current = self.locker_model.get_locker(locker_id)
+            if current is None:
+                continue
+            previous = self.outbox_previous.setdefault(locker_id, {})
+            server = current if refreshed is None else refreshed.get(locker_id, {})
+            for field in expected:
+                if field in server:
+                    previous[field] = server[field]
+                else:
+                    previous.setdefault(field, current.get(field))
+            if any(current.get(field) != value for field, value in expected.items()):
+                self.locker_model.upsert_locker({**current, **expected})
+
+    def schedule_outbox_flush(self, delay_ms=None):
+        # Flush after delay_ms, or when the next queued entry is due; never later than already planned
+        if delay_ms is None:
+            due = self.outbox.next_due()
+            if due is None:
+                return
+            delay_ms = int(due * 1000)
+        if not self.outbox_timer.isActive() or self.outbox_timer.remainingTime() > delay_ms:
+            self.outbox_timer.start(delay_ms)
+
+    def flush_commands(self):
+        # One flush at a time; the running one schedules the next when it returns
+        if self.api_runner.is_running("outbox"):
+            return
+        due = self.outbox.next_due()
+        if due is None:
+            return
+        if due > 0:
+            self.schedule_outbox_flush(int(due * 1000))
+            return
+        self.outbox_stop = threading.Event()
+        self.sync_scheduler.command_started()
+        self.api_runner.submit(
+            flush_outbox, self.outbox, self.api_client, stop_event=self.outbox_stop, key="outbox",
+            on_result=self.on_commands_flushed, on_error=self.on_commands_flush_error
+        )
+        self.update_outbox_view()
+
+    def on_commands_flushed(self, summary):
+        self.outbox_stop = None
+        self.sync_scheduler.command_finished()
+        for entry, result in summary["sent"]:
+            if not self.outbox.has_active(entry["lockerId"]):
+                self.outbox_previous.pop(entry["lockerId"], None)
+            elif entry["lockerId"] in self.outbox_previous:
+                # The API took these values, so a later entry that fails rolls back to them
+                self.outbox_previous[entry["lockerId"]].update(expected_fields(entry["kind"], entry["payload"]))
+        self.merge_lockers([result["locker"] for entry, result in summary["sent"] if isinstance(result.get("locker"), dict)])
+        if len(summary["sent"]) == 1 and summary["sent"][0][0]["kind"] == KIND_COMMAND:
+            entry, result = summary["sent"][0]
+            locker = result.get("locker") or {}
+            execution_status = "The command will be executed." if locker.get("isRunCommand") else "The command will not be executed."
+            self.statusBar().showMessage(f"Command '{entry['payload']['command']}' sent for locker {entry['lockerId']}. {execution_status}", 5000)
+        elif summary["sent"]:
+            will_run = sum(1 for entry, result in summary["sent"] if (result.get("locker") or {}).get("isRunCommand"))
+            self.statusBar().showMessage(f"Sent {len(summary['sent'])} queued commands, {will_run} will be executed", 5000)
+        if summary["retrying"]:
+            logger.warning(f"{len(summary['retrying'])} commands could not be sent and will be retried: {summary['retrying'][0][1]}")
+            self.statusBar().showMessage(f"API unreachable, {len(summary['retrying'])} commands will be retried", 5000)
+        if summary["failed"]:
+            for entry, message in summary["failed"]:
+                logger.error(f"Failed to send {entry['kind']} for locker {entry['lockerId']}: {message}")
+                self.restore_optimistic(entry["lockerId"], expected_fields(entry["kind"], entry["payload"]))
+            lines = [f"{entry['lockerId']}: {message}" for entry, message in summary["failed"][:10]]
+            if len(summary["failed"]) > 10:
+                lines.append(f"...and {len(summary['failed']) - 10} more")
+            QMessageBox.critical(self, "Error", f"Failed to send {len(summary['failed'])} commands:\n" + "\n".join(lines))
+        self.update_outbox_view()
+        self.schedule_outbox_flush()
+
+    def on_commands_flush_error(self, message):
+        self.outbox_stop = None
+        self.sync_scheduler.command_finished()
+        logger.error(f"Failed to flush command outbox: {message}")
+        self.update_outbox_view()
+        self.schedule_outbox_flush()
+
+    def resume_outbox(self):
+        # The API answered, so anything backing off in the outbox is retried now
+        if self.outbox.wake():
+            self.schedule_outbox_flush(0)
 
-    def get_all_lockers(self):
+    def retry_failed_commands(self):
+        if self.outbox.retry_failed():
+            self.update_outbox_view()
+            self.schedule_outbox_flush(0)
+
+    def discard_failed_commands(self):
+        self.outbox.discard_failed()
+        self.update_outbox_view()
+
+    def update_outbox_view(self):
+        counts = self.outbox.counts()
+        self.outbox_label.setText(outbox_summary(counts))
+        self.outbox_label.setVisible(any(counts.values()))
+        if self.outbox_dock.isVisible():
+            self.outbox_dock.refresh(self.outbox.entries(MAX_OUTBOX_ROWS), counts)
+
+    def selected_locker_ids(self):
+        rows = self.table_lockers.selectionModel().selectedRows()
+        return [index.data(LockerIdRole) for index in rows]
+
+    def bulk_send_command(self, command):
+        # Every selected locker gets its own outbox entry, queued in one transaction, so bulk
+        # commands coalesce, retry and keep their order with other commands like single clicks
+        locker_ids = self.selected_locker_ids()
+        if not locker_ids:
+            QMessageBox.warning(self, "Error", "Please select one or more lockers")
+            return
+        payload = {"command": command}
+        expected = expected_fields(KIND_COMMAND, payload)
+        for locker_id in locker_ids:
+            self.show_expected(locker_id, expected)
         try:
-            response = requests.get("https://locker-api.vercel.app/locker/all")
-            response.raise_for_status()
-            data = response.json()
-            if data["success"]:
-                self.table_lockers.setRowCount(0)
-                self.table_lockers_data = data["lockers"]
-                for locker in self.table_lockers_data:
-                    row = self.table_lockers.rowCount()
-                    self.table_lockers.insertRow(row)
-                    self.table_lockers.setItem(row, 0, QTableWidgetItem(locker["lockerId"]))
-                    # Create a main vertical layout to align buttons to the top
-                    main_layout = QVBoxLayout()
-                    main_layout.setContentsMargins(0, 0, 0, 0)
-                    main_layout.setSpacing(0)
-                    action_layout = QHBoxLayout()
-                    action_layout.setSpacing(2)
-                    action_widget = QWidget()
-                    action_widget.setLayout(main_layout)
-
-                    # Detail button
-                    detail_button = QPushButton("Detail")
-                    detail_button.setMinimumHeight(30) 
-                    detail_button.setMaximumWidth(70)   
-                    detail_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-                    detail_button.setToolTip("View and edit locker details")
-                    font = QFont("Segoe UI", 12)  
-                    detail_button.setFont(font)
-                    detail_button.clicked.connect(lambda _, r=row: self.show_locker_details(r))
-                    action_layout.addWidget(detail_button)
-
-                    # Lock button
-                    lock_button = QPushButton("Lock")
-                    lock_button.setMinimumHeight(30) 
-                    lock_button.setMaximumWidth(70)   
-                    lock_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-                    lock_button.setObjectName("lock_button")
-                    lock_button.setToolTip("Lock the locker")
-                    lock_button.setFont(font)
-                    lock_button.clicked.connect(lambda _, lid=locker["lockerId"]: self.lock_locker(lid))
-                    action_layout.addWidget(lock_button)
-
-                    # Unlock button
-                    unlock_button = QPushButton("Unlock")
-                    unlock_button.setMinimumHeight(30)  
-                    unlock_button.setMaximumWidth(70)  
-                    unlock_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-                    unlock_button.setToolTip("Unlock the locker")
-                    unlock_button.setObjectName("unlock_button")
-                    unlock_button.setFont(font)
-                    unlock_button.clicked.connect(lambda _, lid=locker["lockerId"]: self.unlock_locker(lid))
-                    action_layout.addWidget(unlock_button)
-
-                    # View Map button
-                    map_button = QPushButton("View Map")
-                    map_button.setMinimumHeight(30)  
-                    map_button.setMaximumWidth(70)   
-                    map_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-                    map_button.setToolTip("View locker location on map")
-                    map_button.setObjectName("map_button")
-                    map_button.setFont(font)
-                    map_button.clicked.connect(lambda _, lid=locker["lockerId"]: self.show_locker_map(lid))
-                    action_layout.addWidget(map_button)
-
-                    main_layout.addLayout(action_layout)
-                    main_layout.addStretch()
-                    self.table_lockers.setCellWidget(row, 1, action_widget)
-                    self.table_lockers.setRowHeight(row, 50) 
-                self.statusBar().showMessage(f"Loaded {len(data['lockers'])} lockers", 5000)
-                logger.debug(f"Loaded {len(data['lockers'])} lockers")
-                self.selected_locker_id = None
+            self.outbox.enqueue_many([(locker_id, KIND_COMMAND, payload) for locker_id in locker_ids])
         except Exception as e:
-            logger.error(f"Failed to fetch lockers: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to fetch lockers: {str(e)}")
+            logger.error(f"Failed to queue bulk '{command}': {str(e)}")
+            for locker_id in locker_ids:
+                self.restore_optimistic(locker_id, expected)
+            QMessageBox.critical(self, "Error", f"Failed to queue bulk command: {str(e)}")
+            return
+        logger.debug(f"Bulk '{command}' queued for {len(locker_ids)} lockers")
+        self.statusBar().showMessage(f"Sending '{command}' to {len(locker_ids)} lockers...", 5000)
+        self.update_outbox_view()
+        self.schedule_outbox_flush(0)
+
+    def merge_locker(self, locker):
+        self.merge_lockers([locker])
+
+    def merge_lockers(self, lockers):
+        # Responses may carry a partial record, so merge it over what we already have
+        merged = []
+        for locker in lockers:
+            current = self.locker_model.get_locker(locker["lockerId"])
+            merged.append({**current, **locker} if current else locker)
+            self.locker_model.upsert_locker(merged[-1])
+        if merged:
+            self.overlay_outbox({locker["lockerId"]: locker for locker in lockers})
+            self.fleet_cache.merge(merged)
+            self.record_telemetry([locker["lockerId"] for locker in merged])
+
+    def get_all_lockers(self, background=False):
+        # Repeated refresh clicks and background polls join the request already in flight, whose
+        # result is applied once. Background polls report to the scheduler instead of popping up errors.
+        self.refresh_callers.add("background" if background else "foreground")
+        self.api_runner.submit(
+            self.sync_lockers, self.locker_model.rowCount() > 0, key="refresh", with_context=True,
+            on_result=self.on_refresh_loaded, on_error=self.on_refresh_error, on_partial=self.on_lockers_streamed
+        )
+
+    def sync_lockers(self, have_data, context):
+        # Runs on the worker thread: revalidate against the cache and persist what changed.
+        # The payload is decoded batch by batch as it downloads, so the fleet is never held as
+        # one big list of dicts. With an empty table there is nothing to diff against: each
+        # batch is shown and cached as soon as it arrives and "lockers" stays None. Otherwise
+        # the batches go into a column store that is diffed against the table at the end.
+        if not have_data:
+            def show(batch):
+                with timed("fleet cache write"):
+                    self.fleet_cache.merge(batch)
+                context.publish(batch)
+
+            data = self.api_client.get_changed_lockers(on_lockers=show)
+            self.fleet_cache.merge([], etag=data["etag"], last_modified=data["last_modified"])
+            return data
+
+        columns = LockerStore()
+
+        def add(batch):
+            for locker in batch:
+                columns.upsert(locker)
+
+        data = self.api_client.get_changed_lockers(**self.fleet_cache.validators(), on_lockers=add)
+        if data is None:
+            return None
+        data["lockers"] = LockerSnapshot(columns, copy=False)
+        with timed("fleet cache write"):
+            if data["partial"]:
+                self.fleet_cache.merge(data["lockers"], data["deletedIds"], data["etag"], data["last_modified"])
+            else:
+                self.fleet_cache.save_snapshot(data["lockers"], data["etag"], data["last_modified"])
+        return data
+
+    def on_refresh_loaded(self, data):
+        callers, self.refresh_callers = self.refresh_callers, set()
+        changed = self.on_lockers_loaded(data, quiet="foreground" not in callers)
+        if "background" in callers:
+            self.sync_scheduler.report_result(changed)
+
+    def on_refresh_error(self, message):
+        callers, self.refresh_callers = self.refresh_callers, set()
+        if "foreground" in callers:
+            self.on_lockers_error(message)
+        else:
+            self.streamed_lockers = 0
+            logger.warning(f"Background sync failed: {message}")
+            self.statusBar().showMessage(f"Background sync failed: {message}", 5000)
+        if "background" in callers:
+            self.sync_scheduler.report_error()
+
+    def on_lockers_streamed(self, lockers):
+        with timed("table update"):
+            self.streamed_lockers += self.locker_model.add_lockers(lockers)
+        self.statusBar().showMessage(f"Loading lockers... {self.locker_model.rowCount()} so far", 5000)
+
+    def on_lockers_loaded(self, data, quiet=False):
+        # Applies a refresh result and returns whether anything changed
+        self.resume_outbox()
+        if data is None:
+            if not quiet:
+                self.statusBar().showMessage(f"{self.locker_model.rowCount()} lockers are up to date", 5000)
+            logger.debug("Fleet not modified since last refresh")
+            # Unchanged lockers still get their periodic sample and staleness check
+            self.record_telemetry()
+            self.run_alerts()
+            return False
+        # Covers the model diff and the view and proxy updates it triggers
+        with timed("table update"):
+            if data["partial"]:
+                inserted = changed = removed = 0
+                for locker in data["lockers"]:
+                    if self.locker_model.upsert_locker(locker) is None:
+                        inserted += 1
+                    else:
+                        changed += 1
+                for locker_id in data["deletedIds"]:
+                    if self.locker_model.remove_locker(locker_id) is not None:
+                        removed += 1
+            elif data["lockers"] is None:
+                # Every record was already added while the payload streamed in
+                inserted = removed = changed = 0
+            else:
+                inserted, removed, changed = self.locker_model.apply_lockers(data["lockers"])
+            self.overlay_outbox({locker["lockerId"]: locker for locker in data["lockers"]} if data["partial"] else None)
+        # Rows already added while the payload streamed in count as new too
+        loaded = self.streamed_lockers if data["lockers"] is None else len(data["lockers"])
+        inserted += self.streamed_lockers
+        self.streamed_lockers = 0
+        if not quiet or inserted or removed or changed:
+            self.statusBar().showMessage(
+                f"Loaded {loaded} lockers ({inserted} new, {removed} removed, {changed} changed)", 5000
+            )
+        logger.debug(f"Loaded {loaded} lockers")
+        if removed and self.telemetry is not None:
+            self.telemetry.prune(self.locker_store)
+        self.record_telemetry()
+        self.run_alerts(removed=bool(removed))
+        if self.locker_model.row_of(self.selected_locker_id) is None:
+            self.selected_locker_id = None
+        return bool(inserted or removed or changed)
+
+    def on_push_delta(self, delta):
+        # Deltas may carry partial records, so they are merged like command responses
+        self.merge_lockers(delta["lockers"])
+        removed = [locker_id for locker_id in delta["deletedIds"] if self.locker_model.remove_locker(locker_id) is not None]
+        if removed:
+            self.fleet_cache.remove(removed)
+            if self.telemetry is not None:
+                self.telemetry.remove(removed)
+        self.run_alerts(removed=bool(removed))
+        logger.debug(f"Applied push delta: {len(delta['lockers'])} updated, {len(removed)} removed")
+        if self.locker_model.row_of(self.selected_locker_id) is None:
+            self.selected_locker_id = None
+
+    def on_push_connected(self, connected):
+        self.sync_scheduler.set_push_connected(connected)
+        self.statusBar().showMessage("Live updates connected" if connected else "Live updates disconnected, polling instead", 5000)
+
+    def on_lockers_error(self, message):
+        self.streamed_lockers = 0
+        logger.error(f"Failed to fetch lockers: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to fetch lockers: {message}")
 
     def tambah_locker(self):
-        try:
-            response = requests.post("https://locker-api.vercel.app/locker/register")
-            response.raise_for_status()
-            if response.json()["success"]:
-                self.get_all_lockers()
-                self.statusBar().showMessage("Locker added successfully", 5000)
-        except Exception as e:
-            logger.error(f"Failed to add locker: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to add locker: {str(e)}")
+        self.btn_tambah_locker.setEnabled(False)
+        self.api_runner.submit(self.api_client.register_locker, on_result=self.on_locker_added, on_error=self.on_locker_add_error)
+
+    def on_locker_added(self, result):
+        self.btn_tambah_locker.setEnabled(True)
+        if isinstance(result.get("locker"), dict):
+            self.merge_locker(result["locker"])
+        else:
+            self.get_all_lockers()
+        self.statusBar().showMessage("Locker added successfully", 5000)
+
+    def on_locker_add_error(self, message):
+        self.btn_tambah_locker.setEnabled(True)
+        logger.error(f"Failed to add locker: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to add locker: {message}")
 
     def hapus_locker(self):
         locker_id = self.input_delete_locker_id.text().strip()
         if not locker_id:
             QMessageBox.warning(self, "Error", "Please paste a locker ID")
             return
-        try:
-            response = requests.delete(f"https://locker-api.vercel.app/locker/delete/{locker_id}")
-            response.raise_for_status()
-            if response.json()["success"]:
-                self.get_all_lockers()
-                self.input_delete_locker_id.clear()
-                self.statusBar().showMessage("Locker deleted successfully", 5000)
-        except Exception as e:
-            logger.error(f"Failed to delete locker: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to delete locker: {str(e)}")
+        self.btn_hapus_locker.setEnabled(False)
+        # Drop the row right away and put it back if the delete fails
+        previous = self.locker_model.remove_locker(locker_id)
+        self.api_runner.submit(
+            self.api_client.delete_locker, locker_id,
+            on_result=lambda result: self.on_locker_deleted(locker_id, result),
+            on_error=lambda message: self.on_locker_delete_error(message, previous)
+        )
+
+    def on_locker_deleted(self, locker_id, result):
+        self.fleet_cache.remove([locker_id])
+        if self.telemetry is not None:
+            self.telemetry.remove([locker_id])
+        if self.alert_engine is not None:
+            self.alert_engine.remove([locker_id])
+            self.alert_dock.forget([locker_id])
+        self.btn_hapus_locker.setEnabled(True)
+        self.input_delete_locker_id.clear()
+        self.statusBar().showMessage("Locker deleted successfully", 5000)
+
+    def on_locker_delete_error(self, message, previous=None):
+        self.btn_hapus_locker.setEnabled(True)
+        if previous is not None:
+            self.locker_model.upsert_locker(previous)
+        logger.error(f"Failed to delete locker: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to delete locker: {message}")
 
     def export_to_csv(self):
-        if not self.table_lockers_data:
+        if not len(self.locker_store):
             QMessageBox.information(self, "Info", "No data to export")
             return
+        if self.export_stop is not None:
+            QMessageBox.warning(self, "Error", "An export is already running")
+            return
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Export Lockers", "", ";;".join(EXPORT_FORMATS.values()))
+        if not file_path:
+            return
         try:
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)")
-            if file_path:
-                with open(file_path, 'w', newline='') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=self.table_lockers_data[0].keys())
-                    writer.writeheader()
-                    for locker in self.table_lockers_data:
-                        writer.writerow(locker)
-                QMessageBox.information(self, "Success", "Exported to CSV successfully")
-        except Exception as e:
-            logger.error(f"Failed to export to CSV: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to export to CSV: {str(e)}")
+            export_format(file_path)
+        except ValueError:
+            # No recognised extension typed, so take it from the chosen filter
+            extension = next((ext for ext, name in EXPORT_FORMATS.items() if name == selected_filter), "csv")
+            file_path = f"{file_path}.{extension}"
+
+        # Column copy of the store: rows may change while the export runs on the worker thread
+        records = self.locker_store.snapshot()
+        self.export_stop = threading.Event()
+        self.export_progress = QProgressDialog(f"Exporting {len(records)} lockers...", "Cancel", 0, len(records), self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setMinimumDuration(500)
+        self.export_progress.canceled.connect(self.export_stop.set)
+        logger.debug(f"Export of {len(records)} lockers to {file_path} started")
+        self.api_runner.submit(
+            self.run_export, records, file_path, self.export_stop, with_context=True,
+            on_result=self.on_export_finished, on_error=self.on_export_error,
+            on_progress=lambda done, total: self.export_progress.setValue(done)
+        )
+
+    def run_export(self, records, file_path, stop_event, context):
+        try:
+            return export_records(records, file_path, progress=context.report, stop_event=stop_event)
+        except ExportCancelled:
+            return None
+
+    def on_export_finished(self, result):
+        self.finish_export()
+        if result is None:
+            self.statusBar().showMessage("Export cancelled", 5000)
+            return
+        QMessageBox.information(self, "Success", f"Exported {result['rows']} lockers to {result['path']}")
+
+    def on_export_error(self, message):
+        self.finish_export()
+        logger.error(f"Failed to export: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to export: {message}")
+
+    def finish_export(self):
+        self.export_stop = None
+        self.export_progress.canceled.disconnect()
+        self.export_progress.close()
+
+    def import_lockers(self):
+        if self.import_stop is not None:
+            QMessageBox.warning(self, "Error", "An import is already running")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Lockers", "", ";;".join(["Locker Files (*.csv *.csv.gz *.json)"] + list(IMPORT_FORMATS.values()))
+        )
+        if not file_path:
+            return
+        # Rows are diffed against a column copy of the store, since the table may change during the import
+        current = self.locker_store.snapshot()
+        self.import_stop = threading.Event()
+        self.import_progress = QProgressDialog(f"Importing {file_path}...", "Stop", 0, 0, self)
+        self.import_progress.setWindowTitle("Import")
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.setMinimumDuration(500)
+        self.import_progress.canceled.connect(self.import_stop.set)
+        self.sync_scheduler.command_started()
+        logger.debug(f"Import of {file_path} started")
+        self.api_runner.submit(
+            self.run_import, file_path, current, self.import_stop, with_context=True,
+            on_result=self.on_import_finished, on_error=self.on_import_error,
+            on_progress=self.on_import_progress
+        )
+
+    def run_import(self, file_path, current, stop_event, context):
+        return import_records(self.api_client, file_path, current, progress=context.report, stop_event=stop_event)
+
+    def on_import_progress(self, done, total):
+        self.import_progress.setMaximum(total)
+        self.import_progress.setValue(done)
+
+    def on_import_finished(self, summary):
+        self.finish_import()
+        self.merge_lockers(summary["updated"])
+        lines = [
+            f"Read {summary['rows']} rows from {summary['path']}.",
+            f"Updated: {len(summary['updated'])}",
+            f"Unchanged: {summary['unchanged']}",
+            f"Errors: {len(summary['errors'])}",
+        ]
+        if summary["cancelled"]:
+            lines.append("Stopped before the end of the file")
+        if summary["errors_path"]:
+            lines.append(f"Row errors were written to {summary['errors_path']}")
+        QMessageBox.information(self, "Import", "\n".join(lines))
+        self.statusBar().showMessage(f"Import updated {len(summary['updated'])} lockers", 5000)
+
+    def on_import_error(self, message):
+        self.finish_import()
+        logger.error(f"Failed to import: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to import: {message}")
+
+    def finish_import(self):
+        self.import_stop = None
+        self.sync_scheduler.command_finished()
+        self.import_progress.canceled.disconnect()
+        self.import_progress.close()
+
+    def closeEvent(self, event):
+        self.sync_scheduler.stop()
+        self.outbox_timer.stop()
+        if self.outbox_stop is not None:
+            self.outbox_stop.set()
+        if self.push_transport is not None:
+            self.push_transport.stop()
+        self.api_runner.cancel_all()
+        self.api_client.close()
+        self.fleet_cache.close()
+        self.outbox.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
+    setup_logging()
+    # Lets QtWebEngine be imported after QApplication exists, so the map stack can load lazily
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     try:
         with open("styles.qss", "r") as style_file:
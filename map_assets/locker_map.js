@@ -0,0 +1,126 @@
+// Locker map page used by map_engine.MapEngine. The page is loaded once and kept warm;
+// Python drives it through the window.* functions below.
+// Rows are [lockerId, latitude, longitude, status, batteryPercentage].
+(function () {
+    // Default center when there are no lockers yet (Mataram)
+    var map = L.map("map", {preferCanvas: true}).setView([-8.5833, 116.1167], 12);
+    L.tileLayer("https://tile.openstreetmap.org/{z}/{x}/{y}.png", {
+        maxZoom: 19,
+        attribution: "&copy; <a href=\"https://www.openstreetmap.org/copyright\">OpenStreetMap</a> contributors"
+    }).addTo(map);
+
+    // chunkedLoading keeps the page responsive while tens of thousands of markers are added
+    var lockerCluster = L.markerClusterGroup({chunkedLoading: true, removeOutsideVisibleBounds: true});
+    map.addLayer(lockerCluster);
+    var lockerMarkers = {};
+
+    function lockerColor(status, battery) {
+        if (battery !== null && battery < 20) { return "#DC3545"; }
+        if (battery !== null && battery < 50) { return "#FF751A"; }
+        return "#28A745";
+    }
+
+    function lockerStyle(row) {
+        return {
+            radius: 7,
+            weight: 2,
+            color: row[3] === "unlocked" ? "#DC3545" : "#595959",
+            fillColor: lockerColor(row[3], row[4]),
+            fillOpacity: 0.9
+        };
+    }
+
+    // Ids and statuses come from the API; Leaflet renders popup and tooltip strings as HTML
+    function escapeHtml(value) {
+        return String(value).replace(/[&<>"']/g, function (char) {
+            return {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;", "'": "&#39;"}[char];
+        });
+    }
+
+    function lockerPopup(row) {
+        return "Locker ID: " + escapeHtml(row[0]) + "<br>Status: " + escapeHtml(row[3]) +
+            "<br>Battery: " + escapeHtml(row[4]) + "%";
+    }
+
+    window.updateLockers = function (rows) {
+        var added = [];
+        for (var i = 0; i < rows.length; i++) {
+            var row = rows[i];
+            var marker = lockerMarkers[row[0]];
+            if (marker) {
+                marker.setLatLng([row[1], row[2]]);
+                marker.setStyle(lockerStyle(row));
+                marker.setPopupContent(lockerPopup(row));
+            } else {
+                marker = L.circleMarker([row[1], row[2]], lockerStyle(row));
+                marker.bindTooltip(escapeHtml(row[0]));
+                marker.bindPopup(lockerPopup(row));
+                lockerMarkers[row[0]] = marker;
+                added.push(marker);
+            }
+        }
+        if (added.length) {
+            lockerCluster.addLayers(added);
+        }
+        lockerCluster.refreshClusters();
+    };
+
+    window.removeLockers = function (ids) {
+        var removed = [];
+        for (var i = 0; i < ids.length; i++) {
+            var marker = lockerMarkers[ids[i]];
+            if (marker) {
+                removed.push(marker);
+                delete lockerMarkers[ids[i]];
+            }
+        }
+        lockerCluster.removeLayers(removed);
+    };
+
+    window.clearLockers = function () {
+        lockerCluster.clearLayers();
+        lockerMarkers = {};
+    };
+
+    window.fitLockers = function () {
+        var bounds = lockerCluster.getBounds();
+        if (bounds.isValid()) {
+            map.fitBounds(bounds, {maxZoom: 15});
+        }
+    };
+
+    window.fitArea = function (area) {
+        map.fitBounds([[area[0], area[1]], [area[2], area[3]]], {maxZoom: 15});
+    };
+
+    window.focusLocker = function (lockerId) {
+        var marker = lockerMarkers[lockerId];
+        if (marker) {
+            lockerCluster.zoomToShowLayer(marker, function () {
+                marker.openPopup();
+            });
+        }
+    };
+
+    // Report the visible area to Python after every pan or zoom, so a large fleet can be
+    // sent to the page one viewport at a time
+    function reportViewport() {
+        if (!bridge) { return; }
+        var bounds = map.getBounds();
+        bridge.reportViewport(bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast());
+    }
+
+    var bridge = null;
+    if (typeof QWebChannel !== "undefined" && typeof qt !== "undefined") {
+        new QWebChannel(qt.webChannelTransport, function (channel) {
+            bridge = channel.objects.bridge;
+            reportViewport();
+        });
+    }
+    map.on("moveend", reportViewport);
+
+    // The view is reparented between dialogs, so tiles must be re-laid out after a resize
+    window.addEventListener("resize", function () {
+        map.invalidateSize();
+    });
+})();
@@ -1,24 +1,27 @@
-import os
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QMessageBox
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtCore import QUrl
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QMessageBox, QLabel
+from PyQt5.QtCore import QTimer
+import time
 import logging
+from map_engine import MapEngine, locker_marker_row, store_marker_rows
+from diagnostics import record, timed
 
-# Setup logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('app.log'), logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
-# Try importing folium
+# The spatial index needs NumPy; without it the fleet map falls back to sending every locker
 try:
-    import folium
-    logger.debug("Successfully imported folium")
-except ImportError as e:
-    logger.error(f"Failed to import folium: {str(e)}")
-    raise ImportError("The 'folium' module is not installed. Please install it using 'pip install folium'.")
+    from spatial_index import index_for_store
+except ImportError:
+    logger.warning("NumPy is not installed, the fleet map will send every locker to the page")
+    index_for_store = None
+
+# Fraction of the visible width/height added on each side when querying markers for the map
+VIEWPORT_MARGIN = 0.25
+
+
+def wrap_longitude(longitude):
+    if -180 <= longitude <= 180:
+        return longitude
+    return (longitude + 180) % 360 - 180
 
 class MapDialog(QDialog):
     def __init__(self, lockers, parent=None):
@@ -28,69 +31,171 @@ class MapDialog(QDialog):
         self.lockers = lockers
         logger.debug(f"Initializing MapDialog with {len(lockers)} lockers")
 
-        # Buat peta
-        map_file = self.create_map()
-        if not map_file:
-            logger.warning("No valid map file created")
+        # Filter locker dengan koordinat valid
+        valid_lockers = [locker for locker in lockers if locker_marker_row(locker)]
+        if not valid_lockers:
+            logger.warning("No valid coordinates found in lockers")
             QMessageBox.warning(self, "Warning", "No valid location data available for the selected locker")
             self.close()
             return
 
-        # Setup layout dan tampilkan peta
+        # Pinjam peta yang sudah hangat dan tampilkan locker yang dipilih
         layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
-        self.web_view.setUrl(QUrl.fromLocalFile(os.path.abspath(map_file)))
-        layout.addWidget(self.web_view)
         self.setLayout(layout)
+        self.engine = MapEngine.instance()
+        self.engine.attach(self, layout)
+        self.engine.show_lockers(valid_lockers)
+        if len(valid_lockers) == 1:
+            self.engine.focus_locker(valid_lockers[0]["lockerId"])
         logger.debug("MapDialog UI setup completed")
 
-    def create_map(self):
-        if not self.lockers:
-            logger.warning("No lockers provided for map creation")
-            return None
+    def done(self, result):
+        if hasattr(self, "engine"):
+            self.engine.detach(self)
+        super().done(result)
 
-        # Filter locker dengan koordinat valid
-        valid_lockers = [
-            locker for locker in self.lockers 
-            if locker.get("latitude") is not None and locker.get("longitude") is not None 
-            and isinstance(locker["latitude"], (int, float)) and isinstance(locker["longitude"], (int, float))
-            and not (locker["latitude"] == 0 and locker["longitude"] == 0)
-        ]
-        if not valid_lockers:
-            logger.warning("No valid coordinates found in lockers")
-            return None
-
-        # Hitung pusat peta berdasarkan rata-rata koordinat
-        avg_lat = sum(locker["latitude"] for locker in valid_lockers) / len(valid_lockers)
-        avg_lon = sum(locker["longitude"] for locker in valid_lockers) / len(valid_lockers)
-        logger.debug(f"Map centered at latitude: {avg_lat}, longitude: {avg_lon}")
-
-        # Inisialisasi peta
-        try:
-            m = folium.Map(location=[avg_lat, avg_lon], zoom_start=12)
-        except Exception as e:
-            logger.error(f"Failed to create Folium map: {str(e)}")
-            return None
-
-        # Tambahkan marker untuk setiap locker
-        for locker in valid_lockers:
-            try:
-                folium.Marker(
-                    [locker["latitude"], locker["longitude"]],
-                    popup=f"Locker ID: {locker['lockerId']}<br>Status: {locker['status']}",
-                    tooltip=locker["lockerId"]
-                ).add_to(m)
-                logger.debug(f"Added marker for locker {locker['lockerId']}")
-            except Exception as e:
-                logger.error(f"Failed to add marker for locker {locker['lockerId']}: {str(e)}")
-                continue
-
-        # Simpan peta sebagai file HTML sementara
-        map_file = "lockers_map.html"
-        try:
-            m.save(map_file)
-            logger.debug(f"Map saved to {map_file}")
-            return map_file
-        except Exception as e:
-            logger.error(f"Failed to save map to {map_file}: {str(e)}")
-            return None
\ No newline at end of file
+
+class FleetMapDialog(QDialog):
+    # Non-modal map of the whole fleet. While it is visible, changed lockers are pushed
+    # into the shared map page instead of regenerating and reloading the HTML. With the
+    # spatial index available only lockers inside the visible area (plus a margin) are
+    # sent, and the set is re-queried from the index on every pan or zoom.
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Fleet Map")
+        self.setMinimumSize(900, 650)
+        self.model = model
+        self.store = model.store
+        self.engine = MapEngine.instance()
+        self.dirty_ids = set()
+        self.removed_ids = set()
+        # Area of the page currently filled with markers: (south, west, north, east)
+        self.area = None
+        logger.debug(f"Initializing FleetMapDialog with {model.rowCount()} lockers")
+
+        self.map_layout = QVBoxLayout()
+        self.area_label = QLabel()
+        self.map_layout.addWidget(self.area_label)
+        self.setLayout(self.map_layout)
+
+        # Coalesce bursts of model changes into one push
+        self.push_timer = QTimer(self)
+        self.push_timer.setSingleShot(True)
+        self.push_timer.setInterval(200)
+        self.push_timer.timeout.connect(self.push_changes)
+
+        model.dataChanged.connect(self.on_rows_changed)
+        model.rowsInserted.connect(lambda parent, first, last: self.on_rows_changed(model.index(first, 0), model.index(last, 0)))
+        model.rowsAboutToBeRemoved.connect(self.on_rows_removed)
+        model.modelReset.connect(self.on_model_reset)
+        self.engine.bridge.viewportChanged.connect(self.on_viewport_changed)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Another dialog may have borrowed the view, so take it back and resync by content
+        self.engine.attach(self, self.map_layout)
+        self.dirty_ids = set()
+        self.removed_ids = set()
+        if index_for_store is None:
+            self.engine.show_lockers(self.store.records())
+            return
+        bounds = index_for_store(self.store).bounds()
+        if self.area is None and bounds:
+            # First showing: the page answers the fit with its viewport, which fills in the markers
+            self.engine.fit_area(*bounds)
+        self.show_area()
+
+    def hideEvent(self, event):
+        self.engine.detach(self)
+        super().hideEvent(event)
+
+    def focus_locker(self, locker_id):
+        # Make sure the marker is on the page even if it lies outside the current area
+        row = self.store.row_of(locker_id)
+        if row is not None:
+            self.engine.apply_changes(store_marker_rows(self.store, [row]), [])
+        self.push_changes()
+        self.engine.focus_locker(locker_id)
+
+    def on_viewport_changed(self, south, west, north, east):
+        if self.engine.host is not self or index_for_store is None:
+            return
+        # Pad by a quarter of the view on each side so short pans need no new markers.
+        # Leaflet reports unwrapped longitudes past +-180 when the world repeats.
+        lat_margin = (north - south) * VIEWPORT_MARGIN
+        lon_margin = (east - west) * VIEWPORT_MARGIN
+        if east - west + 2 * lon_margin >= 360:
+            west, east = -180.0, 180.0
+        else:
+            west, east = wrap_longitude(west - lon_margin), wrap_longitude(east + lon_margin)
+        self.area = (south - lat_margin, west, north + lat_margin, east)
+        self.show_area()
+
+    def show_area(self):
+        if self.area is None or index_for_store is None:
+            return
+        started = time.perf_counter()
+        rows = index_for_store(self.store).in_box(*self.area)
+        self.engine.show_rows(store_marker_rows(self.store, rows), fit=False)
+        self.dirty_ids = set()
+        self.removed_ids = set()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        record("map area query", elapsed_ms)
+        self.area_label.setText(f"{len(rows)} of {len(self.store)} lockers in this area")
+        logger.debug(f"Fleet map area query returned {len(rows)} lockers in {elapsed_ms:.1f} ms")
+
+    def in_area(self, marker_row):
+        if self.area is None:
+            return True
+        south, west, north, east = self.area
+        latitude, longitude = marker_row[1], marker_row[2]
+        if not south <= latitude <= north:
+            return False
+        if west <= east:
+            return west <= longitude <= east
+        return longitude >= west or longitude <= east
+
+    def on_rows_changed(self, top_left, bottom_right, roles=None):
+        if not self.isVisible():
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            locker_id = self.model.index(row, 0).data()
+            self.dirty_ids.add(locker_id)
+            self.removed_ids.discard(locker_id)
+        self.push_timer.start()
+
+    def on_rows_removed(self, parent, first, last):
+        if not self.isVisible():
+            return
+        for row in range(first, last + 1):
+            locker_id = self.model.index(row, 0).data()
+            self.removed_ids.add(locker_id)
+            self.dirty_ids.discard(locker_id)
+        self.push_timer.start()
+
+    def on_model_reset(self):
+        if not self.isVisible():
+            return
+        if index_for_store is None:
+            self.engine.show_lockers(self.store.records(), fit=False)
+        else:
+            self.show_area()
+
+    def push_changes(self):
+        if self.engine.host is not self:
+            return
+        rows = []
+        with timed("map push"):
+            for locker_id in self.dirty_ids:
+                locker = self.model.get_locker(locker_id)
+                row = locker_marker_row(locker) if locker else None
+                # Lockers that moved out of the area are taken off the page like removed ones
+                if row and self.in_area(row):
+                    rows.append(row)
+                else:
+                    self.removed_ids.add(locker_id)
+            self.engine.apply_changes(rows, list(self.removed_ids))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Pushed {len(rows)} updated and {len(self.removed_ids)} removed markers to fleet map")
+        self.dirty_ids = set()
+        self.removed_ids = set()
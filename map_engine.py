@@ -0,0 +1,143 @@
+import os
+import json
+import time
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineSettings
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal, pyqtSlot
+import logging
+from diagnostics import record, timed
+
+logger = logging.getLogger(__name__)
+
+# Leaflet, Leaflet.markercluster and the locker page are bundled here, so no CDN is needed
+MAP_ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map_assets")
+MAP_PAGE = os.path.join(MAP_ASSETS_DIR, "locker_map.html")
+
+
+def locker_marker_row(locker):
+    latitude = locker.get("latitude")
+    longitude = locker.get("longitude")
+    if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
+        return None
+    if latitude == 0 and longitude == 0:
+        return None
+    battery = locker.get("batteryPercentage")
+    return [
+        locker["lockerId"], latitude, longitude, locker.get("status"),
+        battery if isinstance(battery, (int, float)) else None
+    ]
+
+
+def store_marker_rows(store, rows):
+    # Marker rows straight from the store columns, without building a record per locker
+    marker_rows = []
+    for row in rows:
+        battery = store.battery[row]
+        marker_rows.append([
+            store.ids[row], store.latitude[row], store.longitude[row], store.status[row],
+            battery if battery == battery else None
+        ])
+    return marker_rows
+
+
+class MapBridge(QObject):
+    # Exposed to the page as "bridge" over QWebChannel; the page reports its visible area here
+    viewportChanged = pyqtSignal(float, float, float, float)
+
+    @pyqtSlot(float, float, float, float)
+    def reportViewport(self, south, west, north, east):
+        self.viewportChanged.emit(south, west, north, east)
+
+
+class MapEngine(QObject):
+    # One warm QWebEngineView shared by every map dialog. The page is loaded once from
+    # map_assets; after that only marker rows that differ from what the page shows are sent.
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.view = QWebEngineView()
+        # The page is a local file but map tiles still come from OpenStreetMap when online
+        self.view.settings().setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
+        self.view.loadFinished.connect(self.on_load_finished)
+        self.bridge = MapBridge(self)
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("bridge", self.bridge)
+        self.view.page().setWebChannel(self.channel)
+        self.page_ready = False
+        self.pending_js = []
+        # Rows currently on the page, keyed by lockerId
+        self.rows = {}
+        self.host = None
+        self.load_started = time.perf_counter()
+        self.view.setUrl(QUrl.fromLocalFile(MAP_PAGE))
+        logger.debug(f"MapEngine loading {MAP_PAGE}")
+
+    def on_load_finished(self, ok):
+        if not ok:
+            logger.error("Map page failed to load")
+            return
+        self.page_ready = True
+        record("map page load", (time.perf_counter() - self.load_started) * 1000)
+        for code in self.pending_js:
+            self.view.page().runJavaScript(code)
+        logger.debug(f"Map page loaded, flushed {len(self.pending_js)} queued scripts")
+        self.pending_js = []
+
+    def run_js(self, code):
+        if self.page_ready:
+            self.view.page().runJavaScript(code)
+        else:
+            self.pending_js.append(code)
+
+    def attach(self, host, layout):
+        # Move the warm view into a dialog; it is reparented, never recreated
+        self.host = host
+        layout.addWidget(self.view)
+        self.view.show()
+
+    def detach(self, host):
+        if self.host is host:
+            self.view.setParent(None)
+            self.host = None
+
+    def show_lockers(self, lockers, fit=True):
+        # Make the page show exactly these lockers, sending only rows whose content changed
+        return self.show_rows(filter(None, map(locker_marker_row, lockers)), fit)
+
+    def show_rows(self, marker_rows, fit=True):
+        with timed("map build"):
+            rows = {row[0]: row for row in marker_rows}
+            removed = [locker_id for locker_id in self.rows if locker_id not in rows]
+            changed = [row for locker_id, row in rows.items() if self.rows.get(locker_id) != row]
+            self.apply_changes(changed, removed)
+            if fit and (changed or removed):
+                self.run_js("fitLockers();")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Map shows {len(rows)} lockers ({len(changed)} sent, {len(removed)} removed)")
+        return len(rows)
+
+    def apply_changes(self, rows, removed_ids):
+        removed_ids = [locker_id for locker_id in removed_ids if locker_id in self.rows]
+        if removed_ids and len(removed_ids) == len(self.rows):
+            self.run_js("clearLockers();")
+        elif removed_ids:
+            self.run_js(f"removeLockers({json.dumps(removed_ids)});")
+        for locker_id in removed_ids:
+            self.rows.pop(locker_id, None)
+        if rows:
+            self.run_js(f"updateLockers({json.dumps(rows)});")
+            for row in rows:
+                self.rows[row[0]] = row
+
+    def focus_locker(self, locker_id):
+        self.run_js(f"focusLocker({json.dumps(locker_id)});")
+
+    def fit_area(self, south, west, north, east):
+        self.run_js(f"fitArea({json.dumps([south, west, north, east])});")
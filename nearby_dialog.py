@@ -0,0 +1,124 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton, QComboBox, QSpinBox,
+    QDoubleSpinBox, QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QMessageBox
+)
+from PyQt5.QtCore import pyqtSignal
+import time
+import logging
+from spatial_index import index_for_store
+
+logger = logging.getLogger(__name__)
+
+MODE_NEAREST = "nearest"
+MODE_RADIUS = "radius"
+
+
+class NearbyDialog(QDialog):
+    # Emitted with (action name, lockerId) like LockerActionDelegate, so the main window handles both the same way
+    actionTriggered = pyqtSignal(str, str)
+
+    def __init__(self, store, locker_id=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Nearby Lockers")
+        self.setMinimumSize(560, 480)
+        self.store = store
+        layout = QVBoxLayout()
+
+        form = QFormLayout()
+        self.input_latitude = QDoubleSpinBox()
+        self.input_latitude.setRange(-90, 90)
+        self.input_longitude = QDoubleSpinBox()
+        self.input_longitude.setRange(-180, 180)
+        for spin in (self.input_latitude, self.input_longitude):
+            spin.setDecimals(6)
+            spin.setSingleStep(0.001)
+        form.addRow("Latitude:", self.input_latitude)
+        form.addRow("Longitude:", self.input_longitude)
+        self.combo_mode = QComboBox()
+        self.combo_mode.addItem("Nearest lockers", MODE_NEAREST)
+        self.combo_mode.addItem("Within radius", MODE_RADIUS)
+        form.addRow("Find:", self.combo_mode)
+        self.spin_count = QSpinBox()
+        self.spin_count.setRange(1, 1000)
+        self.spin_count.setValue(10)
+        form.addRow("Count:", self.spin_count)
+        self.spin_radius = QDoubleSpinBox()
+        self.spin_radius.setRange(0.01, 20000)
+        self.spin_radius.setValue(1.0)
+        self.spin_radius.setSuffix(" km")
+        form.addRow("Radius:", self.spin_radius)
+        layout.addLayout(form)
+
+        self.btn_search = QPushButton("Search")
+        self.btn_search.clicked.connect(self.search)
+        layout.addWidget(self.btn_search)
+
+        self.result_label = QLabel()
+        layout.addWidget(self.result_label)
+        self.result_table = QTableWidget(0, 4)
+        self.result_table.setHorizontalHeaderLabels(["Locker ID", "Distance (km)", "Status", "Battery"])
+        self.result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.result_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.result_table.cellDoubleClicked.connect(lambda row, column: self.trigger("detail"))
+        layout.addWidget(self.result_table)
+
+        button_layout = QHBoxLayout()
+        self.btn_detail = QPushButton("Detail")
+        self.btn_detail.clicked.connect(lambda: self.trigger("detail"))
+        self.btn_map = QPushButton("View Map")
+        self.btn_map.setObjectName("map_button")
+        self.btn_map.clicked.connect(lambda: self.trigger("map"))
+        button_layout.addWidget(self.btn_detail)
+        button_layout.addWidget(self.btn_map)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.combo_mode.currentIndexChanged.connect(self.update_mode)
+        self.update_mode()
+        # Start from the selected locker's position when it has one
+        locker = store.get(locker_id) if locker_id else None
+        if locker and isinstance(locker.get("latitude"), (int, float)) and isinstance(locker.get("longitude"), (int, float)):
+            self.input_latitude.setValue(locker["latitude"])
+            self.input_longitude.setValue(locker["longitude"])
+            self.search()
+
+    def update_mode(self):
+        nearest = self.combo_mode.currentData() == MODE_NEAREST
+        self.spin_count.setEnabled(nearest)
+        self.spin_radius.setEnabled(not nearest)
+
+    def search(self):
+        latitude = self.input_latitude.value()
+        longitude = self.input_longitude.value()
+        try:
+            started = time.perf_counter()
+            index = index_for_store(self.store)
+            if self.combo_mode.currentData() == MODE_NEAREST:
+                rows, distances = index.nearest(latitude, longitude, self.spin_count.value())
+            else:
+                rows, distances = index.within_radius(latitude, longitude, self.spin_radius.value() * 1000)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            logger.error(f"Failed to search nearby lockers: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to search nearby lockers: {str(e)}")
+            return
+        logger.debug(f"Nearby search at {latitude}, {longitude} found {len(rows)} lockers in {elapsed_ms:.1f} ms")
+        self.result_label.setText(f"{len(rows)} lockers found among {len(index)} with a location")
+        self.result_table.setRowCount(len(rows))
+        for position, (row, distance) in enumerate(zip(rows.tolist(), distances.tolist())):
+            battery = self.store.battery[row]
+            values = [
+                self.store.ids[row], f"{distance / 1000:.3f}", self.store.status[row] or "",
+                f"{battery:.0f}%" if battery == battery else ""
+            ]
+            for column, value in enumerate(values):
+                self.result_table.setItem(position, column, QTableWidgetItem(value))
+
+    def trigger(self, action):
+        row = self.result_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Error", "Please select a locker")
+            return
+        self.actionTriggered.emit(action, self.result_table.item(row, 0).text())
@@ -0,0 +1,80 @@
+from datetime import datetime
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QAbstractItemView, QHeaderView
+)
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import pyqtSignal
+from command_outbox import describe, STATE_PENDING, STATE_SENDING, STATE_FAILED
+
+# Only the oldest queued entries are listed; the summary still counts all of them
+MAX_OUTBOX_ROWS = 1000
+STATE_COLORS = {STATE_SENDING: "#007BFF", STATE_FAILED: "#DC3545"}
+
+
+def outbox_summary(counts):
+    waiting = counts[STATE_PENDING] + counts[STATE_SENDING]
+    if not waiting and not counts[STATE_FAILED]:
+        return "Outbox empty"
+    text = f"Outbox: {waiting} queued"
+    if counts[STATE_FAILED]:
+        text += f", {counts[STATE_FAILED]} failed"
+    return text
+
+
+class OutboxDock(QDockWidget):
+    # Commands and updates waiting in the outbox with their state, attempts and last error
+    retryFailed = pyqtSignal()
+    discardFailed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__("Outbox", parent)
+        self.setObjectName("outbox_dock")
+        contents = QWidget()
+        layout = QVBoxLayout(contents)
+        header_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.btn_retry = QPushButton("Retry Failed")
+        self.btn_retry.setToolTip("Queue the failed entries again")
+        self.btn_retry.clicked.connect(self.retryFailed)
+        self.btn_discard = QPushButton("Discard Failed")
+        self.btn_discard.setToolTip("Drop the failed entries from the outbox")
+        self.btn_discard.clicked.connect(self.discardFailed)
+        header_layout.addWidget(self.summary_label, 1)
+        header_layout.addWidget(self.btn_retry)
+        header_layout.addWidget(self.btn_discard)
+        layout.addLayout(header_layout)
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["Queued", "Locker ID", "Command", "State", "Attempts", "Last Error"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+        self.setWidget(contents)
+        self.refresh([], {STATE_PENDING: 0, STATE_SENDING: 0, STATE_FAILED: 0})
+
+    def refresh(self, entries, counts):
+        self.summary_label.setText(outbox_summary(counts))
+        self.btn_retry.setEnabled(bool(counts[STATE_FAILED]))
+        self.btn_discard.setEnabled(bool(counts[STATE_FAILED]))
+        entries = entries[:MAX_OUTBOX_ROWS]
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            state = entry["state"]
+            if state == STATE_PENDING and entry["attempts"]:
+                state = f"retry at {datetime.fromtimestamp(entry['nextAttempt']).strftime('%H:%M:%S')}"
+            values = [
+                datetime.fromtimestamp(entry["created"]).strftime("%Y-%m-%d %H:%M:%S"), entry["lockerId"],
+                describe(entry), state, str(entry["attempts"]), entry["error"] or ""
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 3:
+                    item.setForeground(QColor(STATE_COLORS.get(entry["state"], "#595959")))
+                self.table.setItem(row, column, item)
+        for column in range(5):
+            self.table.resizeColumnToContents(column)
+        self.table.setUpdatesEnabled(True)
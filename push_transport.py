@@ -0,0 +1,142 @@
+import os
+import json
+import random
+import threading
+import logging
+import requests
+from PyQt5.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Reconnect delays in seconds after a dropped or refused stream
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+# (connect, read) timeouts; the read timeout bounds how long a silent stream is trusted,
+# so servers should send a comment line as keep-alive more often than this
+STREAM_TIMEOUT = (3.05, 90)
+
+
+def push_transport_from_env(parent=None):
+    # LOCKER_PUSH_URL turns push on; only Server-Sent Events are supported for now
+    url = os.environ.get("LOCKER_PUSH_URL")
+    if not url:
+        return None
+    return SsePushTransport(url, parent)
+
+
+class PushTransport(QObject):
+    # Base class for transports that deliver fleet deltas as they happen. A delta is
+    # {"lockers": [partial or full records], "deletedIds": [...]}. Subclasses run their own
+    # background thread; Qt queues the signals onto the GUI thread.
+    deltaReceived = pyqtSignal(dict)
+    connectedChanged = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.connected = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            self.connectedChanged.emit(connected)
+
+    def _emit_delta(self, payload):
+        lockers = payload.get("lockers")
+        if lockers is None and "lockerId" in payload:
+            # A single record on its own is a delta of one
+            lockers = [payload]
+        delta = {"lockers": lockers or [], "deletedIds": payload.get("deletedIds", [])}
+        if delta["lockers"] or delta["deletedIds"]:
+            self.deltaReceived.emit(delta)
+
+    def _run(self):
+        delay = RECONNECT_MIN_DELAY
+        while not self._stop.is_set():
+            try:
+                self.listen()
+                delay = RECONNECT_MIN_DELAY
+            except Exception as e:
+                logger.warning(f"Push stream {type(self).__name__} dropped: {str(e)}")
+            self._set_connected(False)
+            if self._stop.wait(random.uniform(0, delay)):
+                break
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def listen(self):
+        # Connect, then block delivering deltas until the stream ends or stop() is called
+        raise NotImplementedError
+
+
+class SsePushTransport(PushTransport):
+    # Server-Sent Events over a streaming requests response. Every "data" payload is a JSON
+    # delta; the last event id is sent back on reconnect so the server can replay what was missed.
+    def __init__(self, url, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.last_event_id = None
+        self.session = requests.Session()
+
+    def stop(self):
+        super().stop()
+        # Closing the session breaks a blocking read so the thread can exit
+        self.session.close()
+
+    def listen(self):
+        headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        if self.last_event_id:
+            headers["Last-Event-ID"] = self.last_event_id
+        with self.session.get(self.url, headers=headers, stream=True, timeout=STREAM_TIMEOUT) as response:
+            response.raise_for_status()
+            self._set_connected(True)
+            logger.debug(f"Push stream connected to {self.url}")
+            data = []
+            event = "message"
+            # chunk_size=None hands over each chunk of a chunked response as it arrives
+            # instead of waiting for a full buffer
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if self._stop.is_set():
+                    return
+                if line is None:
+                    continue
+                if not line:
+                    # A blank line ends the event
+                    if data:
+                        self.dispatch(event, "\n".join(data))
+                    data = []
+                    event = "message"
+                    continue
+                if line.startswith(":"):
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "data":
+                    data.append(value)
+                elif field == "event":
+                    event = value
+                elif field == "id":
+                    self.last_event_id = value
+
+    def dispatch(self, event, data):
+        if event not in ("message", "lockers"):
+            logger.debug(f"Ignoring push event '{event}'")
+            return
+        try:
+            payload = json.loads(data)
+        except ValueError as e:
+            logger.warning(f"Ignoring malformed push event: {str(e)}")
+            return
+        if isinstance(payload, dict):
+            self._emit_delta(payload)
@@ -0,0 +1,89 @@
+from datetime import datetime
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt5.QtCore import Qt, QPointF, QRectF, QSize
+
+# Colors for status values, picked in order of first appearance
+STRIP_COLORS = ["#FF751A", "#595959", "#2E86AB", "#6AAB2E", "#C0392B", "#8E44AD", "#F1C40F", "#16A085"]
+LINE_COLOR = "#FF751A"
+GRID_COLOR = "#DBDBD6"
+STRIP_HEIGHT = 8
+STRIP_SPACING = 3
+
+
+class Sparkline(QWidget):
+    # Battery history as a small line chart (0-100%) with status and light history as step
+    # strips underneath; each strip segment lasts from one sample to the next
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.times = []
+        self.battery = []
+        self.strips = []
+        self._colors = {}
+        self.setMinimumHeight(70)
+
+    def sizeHint(self):
+        return QSize(360, 80)
+
+    def set_series(self, times, battery, *strips):
+        self.times = [float(value) for value in times]
+        self.battery = [float(value) for value in battery]
+        self.strips = [list(strip) for strip in strips]
+        if self.times:
+            first = datetime.fromtimestamp(self.times[0]).strftime("%Y-%m-%d %H:%M")
+            last = datetime.fromtimestamp(self.times[-1]).strftime("%Y-%m-%d %H:%M")
+            known = [value for value in self.battery if value == value]
+            battery_text = f", battery {min(known):.0f}-{max(known):.0f}%" if known else ""
+            self.setToolTip(f"{len(self.times)} samples from {first} to {last}{battery_text}")
+        else:
+            self.setToolTip("No history yet")
+        self.update()
+
+    def color(self, value):
+        if value not in self._colors:
+            self._colors[value] = QColor(STRIP_COLORS[len(self._colors) % len(STRIP_COLORS)])
+        return self._colors[value]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = QRectF(self.rect()).adjusted(2, 2, -2, -2)
+        strips_height = len(self.strips) * (STRIP_HEIGHT + STRIP_SPACING)
+        chart = QRectF(rect.left(), rect.top(), rect.width(), rect.height() - strips_height)
+        painter.setPen(QPen(QColor(GRID_COLOR), 1))
+        painter.drawRect(chart)
+        if not self.times:
+            painter.drawText(chart, Qt.AlignCenter, "No history yet")
+            return
+        start, end = self.times[0], self.times[-1]
+        span = max(end - start, 1.0)
+
+        def x_of(value):
+            return chart.left() + (value - start) / span * chart.width()
+
+        # Missing battery readings break the line
+        painter.setPen(QPen(QColor(LINE_COLOR), 2))
+        points = []
+        for time_value, battery in zip(self.times, self.battery):
+            if battery != battery:
+                if len(points) > 1:
+                    painter.drawPolyline(QPolygonF(points))
+                points = []
+                continue
+            y = chart.bottom() - max(0.0, min(battery, 100.0)) / 100 * chart.height()
+            points.append(QPointF(x_of(time_value), y))
+        if len(points) > 1:
+            painter.drawPolyline(QPolygonF(points))
+        elif points:
+            painter.drawEllipse(points[0], 2, 2)
+
+        top = chart.bottom() + STRIP_SPACING
+        painter.setPen(Qt.NoPen)
+        for strip in self.strips:
+            edges = self.times[1:] + [end if len(self.times) > 1 else start + span]
+            for time_value, next_time, value in zip(self.times, edges, strip):
+                if value is None:
+                    continue
+                left = x_of(time_value)
+                painter.fillRect(QRectF(left, top, max(x_of(next_time) - left, 1.0), STRIP_HEIGHT), self.color(value))
+            top += STRIP_HEIGHT + STRIP_SPACING
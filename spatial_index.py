@@ -0,0 +1,158 @@
+import math
+import weakref
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mean earth radius used for haversine distances
+EARTH_RADIUS_M = 6371008.8
+# Grid cell size in degrees (about 5.5 km north-south)
+DEFAULT_CELL_DEGREES = 0.05
+# Boxes spanning more grid rows than this are answered with one vectorized pass instead
+MAX_SCAN_ROWS = 512
+
+_store_indexes = weakref.WeakKeyDictionary()
+
+
+def haversine_m(latitude, longitude, latitudes, longitudes):
+    # Great-circle distance in meters from one point to arrays of points
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - math.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def index_for_store(store):
+    # The index is rebuilt only when the store's coordinates or row layout changed since the last query
+    cached = _store_indexes.get(store)
+    if cached is not None and cached.version == store.coords_version:
+        return cached
+    index = SpatialIndex(store.latitude, store.longitude)
+    index.version = store.coords_version
+    _store_indexes[store] = index
+    return index
+
+
+class SpatialIndex:
+    # Uniform lat/lon grid over locker coordinates. Points are sorted by cell key
+    # (row-major, so the cells of one grid row inside a box are one contiguous key range);
+    # a box query is then one searchsorted per grid row plus an exact vectorized check.
+    # Lookups return row numbers of the arrays the index was built from.
+    def __init__(self, latitudes, longitudes, cell_degrees=DEFAULT_CELL_DEGREES):
+        latitude = np.asarray(latitudes, dtype=np.float64)
+        longitude = np.asarray(longitudes, dtype=np.float64)
+        # Same rule as the map: missing, out of range and 0,0 coordinates are not placed
+        valid = (
+            np.isfinite(latitude) & np.isfinite(longitude)
+            & (np.abs(latitude) <= 90) & (np.abs(longitude) <= 180)
+            & ~((latitude == 0) & (longitude == 0))
+        )
+        rows = np.flatnonzero(valid)
+        latitude = latitude[valid]
+        longitude = longitude[valid]
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees)) + 1
+        keys = self._cell_y(latitude) * self.columns + self._cell_x(longitude)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.rows = rows[order]
+        self.latitude = latitude[order]
+        self.longitude = longitude[order]
+        self.version = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _cell_y(self, latitude):
+        return np.floor((np.asarray(latitude) + 90) / self.cell_degrees).astype(np.int64)
+
+    def _cell_x(self, longitude):
+        return np.floor((np.asarray(longitude) + 180) / self.cell_degrees).astype(np.int64)
+
+    def bounds(self):
+        # (south, west, north, east) of every indexed locker, or None if there are none
+        if not len(self):
+            return None
+        return (
+            float(self.latitude.min()), float(self.longitude.min()),
+            float(self.latitude.max()), float(self.longitude.max())
+        )
+
+    def _box_positions(self, south, west, north, east):
+        south, north = max(south, -90.0), min(north, 90.0)
+        west, east = max(west, -180.0), min(east, 180.0)
+        if south > north or west > east or not len(self):
+            return np.empty(0, dtype=np.int64)
+        y0, y1 = int(self._cell_y(south)), int(self._cell_y(north))
+        if y1 - y0 + 1 > MAX_SCAN_ROWS:
+            candidates = np.arange(len(self))
+        else:
+            x0, x1 = int(self._cell_x(west)), int(self._cell_x(east))
+            grid_rows = np.arange(y0, y1 + 1, dtype=np.int64) * self.columns
+            starts = np.searchsorted(self.keys, grid_rows + x0, side="left")
+            ends = np.searchsorted(self.keys, grid_rows + x1, side="right")
+            spans = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+            if not spans:
+                return np.empty(0, dtype=np.int64)
+            candidates = np.concatenate(spans)
+        latitude = self.latitude[candidates]
+        longitude = self.longitude[candidates]
+        inside = (latitude >= south) & (latitude <= north) & (longitude >= west) & (longitude <= east)
+        return candidates[inside]
+
+    def _positions_in_box(self, south, west, north, east):
+        if west > east:
+            # The box crosses the antimeridian, so query both halves
+            return np.concatenate([
+                self._box_positions(south, west, north, 180.0),
+                self._box_positions(south, -180.0, north, east),
+            ])
+        return self._box_positions(south, west, north, east)
+
+    def in_box(self, south, west, north, east):
+        return self.rows[self._positions_in_box(south, west, north, east)]
+
+    def within_radius(self, latitude, longitude, meters):
+        # (rows, distances in meters) of lockers within meters of the point, nearest first
+        radians = meters / EARTH_RADIUS_M
+        angular = math.degrees(radians)
+        south, north = latitude - angular, latitude + angular
+        # Half-width in longitude of the circle's bounding box; points on the circle at the
+        # widest longitude lie poleward of the center, so angular / cos(latitude) falls short
+        ratio = math.sin(min(radians, math.pi / 2)) / max(math.cos(math.radians(latitude)), 1e-12)
+        if south <= -90 or north >= 90 or radians >= math.pi / 2 or ratio >= 1:
+            # Reaches a pole or wraps the globe: every longitude is in range
+            west, east = -180.0, 180.0
+        else:
+            span = math.degrees(math.asin(ratio))
+            west = (longitude - span + 180) % 360 - 180
+            east = (longitude + span + 180) % 360 - 180
+        positions = self._positions_in_box(south, west, north, east)
+        distances = haversine_m(latitude, longitude, self.latitude[positions], self.longitude[positions])
+        close = distances <= meters
+        positions, distances = positions[close], distances[close]
+        order = np.argsort(distances, kind="stable")
+        return self.rows[positions[order]], distances[order]
+
+    def nearest(self, latitude, longitude, k):
+        # (rows, distances in meters) of the k nearest lockers. The search radius starts at
+        # one grid cell and doubles until it holds k lockers; a radius query is exact, so the
+        # k closest inside it are the k closest overall.
+        k = min(k, len(self))
+        if k <= 0:
+            return self.rows[:0], np.empty(0)
+        cell_meters = self.cell_degrees * math.pi / 180 * EARTH_RADIUS_M
+        meters = cell_meters
+        # Past this radius the grid no longer narrows anything down, so measure every locker once
+        while meters * 2 < MAX_SCAN_ROWS * cell_meters:
+            rows, distances = self.within_radius(latitude, longitude, meters)
+            if len(rows) >= k:
+                return rows[:k], distances[:k]
+            meters *= 2
+        distances = haversine_m(latitude, longitude, self.latitude, self.longitude)
+        nearest = np.argpartition(distances, k - 1)[:k]
+        order = nearest[np.argsort(distances[nearest], kind="stable")]
+        return self.rows[order], distances[order]
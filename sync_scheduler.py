@@ -0,0 +1,91 @@
+import random
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Poll intervals in milliseconds
+FAST_INTERVAL_MS = 2 * 1000
+BASE_INTERVAL_MS = 15 * 1000
+IDLE_INTERVAL_MS = 2 * 60 * 1000
+ERROR_INTERVAL_MS = 5 * 60 * 1000
+# While a push transport is connected, polling is only a safety net
+PUSH_INTERVAL_MS = 5 * 60 * 1000
+# Growth factor for each poll that brings no changes, and for each failed poll
+IDLE_BACKOFF = 1.5
+ERROR_BACKOFF = 2
+
+
+class SyncScheduler(QObject):
+    # Decides when the next background refresh runs. Polls come quickly while commands are
+    # pending or refreshes keep bringing changes, slow down step by step while nothing
+    # changes, and back off exponentially on errors. Only one poll is in flight at a time.
+    intervalChanged = pyqtSignal(int)
+
+    def __init__(self, refresh, parent=None):
+        super().__init__(parent)
+        self.refresh = refresh
+        self.interval = BASE_INTERVAL_MS
+        self.pending_commands = 0
+        self.push_connected = False
+        self.in_flight = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.schedule()
+
+    def stop(self):
+        self.timer.stop()
+
+    def poll(self):
+        if self.in_flight:
+            return
+        self.in_flight = True
+        self.refresh()
+
+    def schedule(self, interval=None):
+        if interval is not None:
+            self.interval = interval
+        if self.pending_commands:
+            delay = FAST_INTERVAL_MS
+        elif self.push_connected:
+            delay = max(self.interval, PUSH_INTERVAL_MS)
+        else:
+            delay = self.interval
+        # Jitter so many clients started together do not poll in lockstep
+        delay = int(delay * random.uniform(0.9, 1.1))
+        self.timer.start(delay)
+        self.intervalChanged.emit(delay)
+        logger.debug(f"Next background sync in {delay} ms")
+
+    def report_result(self, changed):
+        self.in_flight = False
+        if changed:
+            self.schedule(FAST_INTERVAL_MS)
+        else:
+            self.schedule(min(max(int(self.interval * IDLE_BACKOFF), BASE_INTERVAL_MS // 2), IDLE_INTERVAL_MS))
+
+    def report_error(self):
+        self.in_flight = False
+        self.schedule(min(max(self.interval, BASE_INTERVAL_MS) * ERROR_BACKOFF, ERROR_INTERVAL_MS))
+
+    def command_started(self):
+        self.pending_commands += 1
+        if self.pending_commands == 1 and not self.in_flight:
+            self.schedule(FAST_INTERVAL_MS)
+
+    def command_finished(self):
+        self.pending_commands = max(0, self.pending_commands - 1)
+
+    def report_cancelled(self):
+        # Every request was cancelled, including any poll and pending commands
+        self.in_flight = False
+        self.pending_commands = 0
+        self.schedule()
+
+    def set_push_connected(self, connected):
+        self.push_connected = connected
+        if not self.in_flight:
+            self.schedule()
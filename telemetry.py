@@ -0,0 +1,231 @@
+import os
+import csv
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Samples kept in memory per locker; older samples are dropped or spilled to disk.
+# A sample takes 8 bytes, so 100k lockers cost about 50 MB.
+HISTORY_LENGTH = 64
+# An unchanged locker is sampled again only after this many seconds
+SAMPLE_INTERVAL = 10 * 60
+# Only samples this recent feed the hours-to-empty estimate
+FORECAST_WINDOW = 24 * 60 * 60
+# Fewer valid battery samples than this give no estimate
+FORECAST_MIN_SAMPLES = 3
+# Lockers per block in the forecast, bounding the size of temporary arrays
+FORECAST_BLOCK = 8192
+# Status codes are one byte; labels beyond that share the last code
+MAX_CODES = 256
+
+
+class TelemetryHistory:
+    # Fixed-size ring buffers of (time, battery, status, lightStatus) per locker. Every locker
+    # owns one slot, a row in each 2D array, so recording a refresh for the whole fleet and
+    # forecasting battery life are single vectorized passes. Times are whole epoch seconds,
+    # battery is float16 and status strings are one-byte codes. With spill_path set (or
+    # LOCKER_TELEMETRY_SPILL), samples pushed out of a full ring are appended to that CSV file
+    # instead of being lost.
+    def __init__(self, capacity=HISTORY_LENGTH, spill_path=None, initial_slots=1024):
+        self.capacity = capacity
+        self.spill_path = spill_path or os.environ.get("LOCKER_TELEMETRY_SPILL")
+        self._slot_of = {}
+        self._locker_of = []
+        self._free_slots = []
+        self._codes = {None: 0}
+        self._labels = [None]
+        # Slot numbers aligned to store rows, reused while the store's row layout is unchanged
+        self._store_slots = None
+        self._store_key = None
+        self._allocate(initial_slots)
+
+    def _allocate(self, slots):
+        self.times = np.zeros((slots, self.capacity), dtype=np.uint32)
+        self.battery = np.full((slots, self.capacity), np.nan, dtype=np.float16)
+        self.status = np.zeros((slots, self.capacity), dtype=np.uint8)
+        self.light_status = np.zeros((slots, self.capacity), dtype=np.uint8)
+        # Next write position and number of samples in each ring
+        self.head = np.zeros(slots, dtype=np.int64)
+        self.count = np.zeros(slots, dtype=np.int64)
+
+    def _grow(self, slots):
+        old = (self.times, self.battery, self.status, self.light_status, self.head, self.count)
+        used = len(old[-1])
+        self._allocate(slots)
+        for new, previous in zip((self.times, self.battery, self.status, self.light_status, self.head, self.count), old):
+            new[:used] = previous
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            if len(self._labels) == MAX_CODES:
+                return MAX_CODES - 1
+            code = self._codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+
+    def label(self, code):
+        return self._labels[code]
+
+    def slot(self, locker_id):
+        slot = self._slot_of.get(locker_id)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._locker_of)
+                self._locker_of.append(None)
+                if slot >= len(self.head):
+                    self._grow(len(self.head) * 2)
+            self._slot_of[locker_id] = slot
+            self._locker_of[slot] = locker_id
+            self.head[slot] = 0
+            self.count[slot] = 0
+        return slot
+
+    def remove(self, locker_ids):
+        for locker_id in locker_ids:
+            slot = self._slot_of.pop(locker_id, None)
+            if slot is not None:
+                self._locker_of[slot] = None
+                self._free_slots.append(slot)
+                self.count[slot] = 0
+        self._store_slots = None
+        self._store_key = None
+
+    def prune(self, store):
+        # Forget lockers that are no longer in the store
+        self.remove([locker_id for locker_id in self._slot_of if store.row_of(locker_id) is None])
+
+    def slots_for_store(self, store):
+        key = (id(store), store.coords_version, len(store))
+        if self._store_key != key:
+            self._store_slots = np.fromiter((self.slot(locker_id) for locker_id in store.ids), dtype=np.int64, count=len(store))
+            self._store_key = key
+        return self._store_slots
+
+    def record_store(self, store, now=None, rows=None):
+        # Sample every locker in the store (or only the given rows) at once. A locker gets a new
+        # sample when its battery, status or light changed since its last sample, or
+        # SAMPLE_INTERVAL has passed. Returns the number of samples written.
+        if not len(store):
+            return 0
+        now = time.time() if now is None else now
+        slots = self.slots_for_store(store)
+        if rows is None:
+            battery = np.array(store.battery, dtype=np.float16)
+            status_values, light_values = store.status, store.light_status
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            slots = slots[rows]
+            battery = np.array(store.battery, dtype=np.float64)[rows].astype(np.float16)
+            status_values = [store.status[row] for row in rows.tolist()]
+            light_values = [store.light_status[row] for row in rows.tolist()]
+        status = np.fromiter((self.code(value) for value in status_values), dtype=np.uint8, count=len(slots))
+        light_status = np.fromiter((self.code(value) for value in light_values), dtype=np.uint8, count=len(slots))
+
+        last = (self.head[slots] - 1) % self.capacity
+        last_battery = self.battery[slots, last]
+        same_battery = (last_battery == battery) | (np.isnan(last_battery) & np.isnan(battery))
+        due = (
+            (self.count[slots] == 0)
+            | ~same_battery
+            | (self.status[slots, last] != status)
+            | (self.light_status[slots, last] != light_status)
+            | (now - self.times[slots, last].astype(np.float64) >= SAMPLE_INTERVAL)
+        )
+        slots = slots[due]
+        if not len(slots):
+            return 0
+        position = self.head[slots]
+        if self.spill_path:
+            self._spill(slots[self.count[slots] == self.capacity])
+        self.times[slots, position] = now
+        self.battery[slots, position] = battery[due]
+        self.status[slots, position] = status[due]
+        self.light_status[slots, position] = light_status[due]
+        self.head[slots] = (position + 1) % self.capacity
+        self.count[slots] = np.minimum(self.count[slots] + 1, self.capacity)
+        return len(slots)
+
+    def _spill(self, slots):
+        # The oldest sample of a full ring sits at its head, where the new sample goes
+        if not len(slots):
+            return
+        position = self.head[slots]
+        try:
+            with open(self.spill_path, "a", newline="", encoding="utf-8") as spill_file:
+                writer = csv.writer(spill_file)
+                for slot, time_value, battery, status, light_status in zip(
+                    slots.tolist(), self.times[slots, position].tolist(), self.battery[slots, position].tolist(),
+                    self.status[slots, position].tolist(), self.light_status[slots, position].tolist()
+                ):
+                    writer.writerow([
+                        self._locker_of[slot], time_value, "" if battery != battery else battery,
+                        self.label(status) or "", self.label(light_status) or ""
+                    ])
+        except OSError as e:
+            logger.error(f"Failed to spill telemetry to {self.spill_path}: {str(e)}")
+
+    def series(self, locker_id):
+        # (times, battery, status labels, light labels) of one locker, oldest first
+        slot = self._slot_of.get(locker_id)
+        if slot is None or not self.count[slot]:
+            return np.empty(0), np.empty(0), [], []
+        count = int(self.count[slot])
+        order = (np.arange(self.head[slot] - count, self.head[slot])) % self.capacity
+        return (
+            self.times[slot, order].astype(np.float64),
+            self.battery[slot, order].astype(np.float64),
+            [self.label(code) for code in self.status[slot, order].tolist()],
+            [self.label(code) for code in self.light_status[slot, order].tolist()],
+        )
+
+    def hours_to_empty(self, store, now=None):
+        # Hours until the battery runs out for every store row, in one vectorized pass (in blocks
+        # of FORECAST_BLOCK lockers): inf when not draining, NaN without enough samples
+        now = time.time() if now is None else now
+        result = np.full(len(store), np.nan)
+        if not len(store):
+            return result
+        slots = self.slots_for_store(store)
+        current = np.array(store.battery, dtype=np.float64)
+        for start in range(0, len(slots), FORECAST_BLOCK):
+            result[start:start + FORECAST_BLOCK] = self._forecast(
+                slots[start:start + FORECAST_BLOCK], current[start:start + FORECAST_BLOCK], now
+            )
+        return result
+
+    def hours_left(self, locker_id, battery, now=None):
+        # hours_to_empty for one locker, or None if it has no history
+        slot = self._slot_of.get(locker_id)
+        if slot is None or battery is None:
+            return None
+        now = time.time() if now is None else now
+        return float(self._forecast(np.array([slot]), np.array([battery], dtype=np.float64), now)[0])
+
+    def _forecast(self, slots, battery, now):
+        # Least-squares battery trend per slot over the forecast window, extrapolated from the
+        # current battery down to 0. Hours relative to now keep the sums well conditioned.
+        t = (self.times[slots].astype(np.float64) - now) / 3600.0
+        b = self.battery[slots].astype(np.float64)
+        valid = (
+            (np.arange(self.capacity) < self.count[slots][:, None])
+            & ~np.isnan(b) & (t >= -FORECAST_WINDOW / 3600.0)
+        )
+        n = valid.sum(axis=1)
+        t = np.where(valid, t, 0.0)
+        b = np.where(valid, b, 0.0)
+        sum_t = t.sum(axis=1)
+        denominator = n * (t * t).sum(axis=1) - sum_t ** 2
+        numerator = n * (t * b).sum(axis=1) - sum_t * b.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = numerator / denominator
+            hours = np.where(slope < 0, battery / -slope, np.inf)
+        enough = (n >= FORECAST_MIN_SAMPLES) & (denominator > 1e-12) & ~np.isnan(battery)
+        return np.where(enough, hours, np.nan)
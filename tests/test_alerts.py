@@ -0,0 +1,81 @@
+import pytest
+from alerts import AlertEngine, AlertRule, DEFAULT_RULES
+from locker_store import LockerStore
+
+NOW = 1_800_000_000
+
+
+@pytest.fixture
+def engine():
+    return AlertEngine([AlertRule(**rule) for rule in DEFAULT_RULES if rule["field"] == "battery"])
+
+
+def run(engine, store, battery, locker_id="LKR0000001", now=NOW):
+    store.upsert({"lockerId": locker_id, "batteryPercentage": battery, "status": "locked", "lightStatus": "on"})
+    return sorted((event["rule"], event["raised"]) for event in engine.process(store, now=now))
+
+
+def active(engine):
+    return sorted((locker_id, rule.name) for locker_id, rule in engine.active_alerts())
+
+
+def test_critical_battery_does_not_also_raise_low(engine):
+    store = LockerStore()
+    assert run(engine, store, 3) == [("battery_critical", True)]
+    assert active(engine) == [("LKR0000001", "battery_critical")]
+
+
+def test_low_battery_hands_over_to_critical_and_back(engine):
+    store = LockerStore()
+    assert run(engine, store, 15) == [("battery_low", True)]
+    assert run(engine, store, 3) == [("battery_critical", True), ("battery_low", False)]
+    # Critical stays up until its clear threshold, then low takes over again
+    assert run(engine, store, 7) == []
+    assert run(engine, store, 9) == [("battery_critical", False), ("battery_low", True)]
+    assert active(engine) == [("LKR0000001", "battery_low")]
+
+
+def test_outranking_only_applies_to_the_same_locker(engine):
+    store = LockerStore()
+    run(engine, store, 3, "LKR0000001")
+    assert run(engine, store, 15, "LKR0000002") == [("battery_low", True)]
+    assert active(engine) == [("LKR0000001", "battery_critical"), ("LKR0000002", "battery_low")]
+
+
+def test_low_battery_clears_only_above_its_clear_threshold():
+    engine = AlertEngine([AlertRule("battery_low", "battery", "<", 20, clear=25)])
+    store = LockerStore()
+    assert run(engine, store, 19) == [("battery_low", True)]
+    # Hovering between the raise and clear thresholds keeps the alert without new events
+    assert run(engine, store, 22) == []
+    assert run(engine, store, 24.9) == []
+    assert run(engine, store, 18) == []
+    assert run(engine, store, 25) == [("battery_low", False)]
+    # Back under the clear threshold is not enough to raise it again
+    assert run(engine, store, 22) == []
+    assert run(engine, store, 19.5) == [("battery_low", True)]
+
+
+def test_rule_without_clear_threshold_clears_at_its_value():
+    engine = AlertEngine([AlertRule("battery_low", "battery", "<", 20)])
+    store = LockerStore()
+    assert run(engine, store, 19) == [("battery_low", True)]
+    assert run(engine, store, 20) == [("battery_low", False)]
+
+
+def test_hold_time_delays_the_alert():
+    engine = AlertEngine([AlertRule("stuck_unlocked", "status", "==", "unlocked", hold=30 * 60)])
+    store = LockerStore()
+
+    def run_status(status, now):
+        store.upsert({"lockerId": "LKR0000001", "status": status})
+        return [(event["rule"], event["raised"]) for event in engine.process(store, now=now)]
+
+    assert run_status("unlocked", NOW) == []
+    assert run_status("unlocked", NOW + 29 * 60) == []
+    assert run_status("unlocked", NOW + 30 * 60) == [("stuck_unlocked", True)]
+    assert run_status("locked", NOW + 31 * 60) == [("stuck_unlocked", False)]
+    # The hold starts over once the condition stopped holding
+    assert run_status("unlocked", NOW + 40 * 60) == []
+    assert run_status("unlocked", NOW + 69 * 60) == []
+    assert run_status("unlocked", NOW + 70 * 60) == [("stuck_unlocked", True)]
@@ -0,0 +1,191 @@
+import pytest
+import requests
+import command_outbox
+from command_outbox import (
+    CommandOutbox, flush_outbox, retry_delay, KIND_COMMAND, KIND_UPDATE, STATE_PENDING, STATE_SENDING, STATE_FAILED,
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+)
+
+NOW = 1_800_000_000
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = CommandOutbox(str(tmp_path / "outbox.sqlite3"))
+    yield outbox
+    outbox.close()
+
+
+def lock(locker_id):
+    return (locker_id, KIND_COMMAND, {"command": "lock"})
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+class FakeClient:
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.sent = []
+
+    def send_command(self, locker_id, command):
+        return self._send(locker_id, command)
+
+    def update_locker(self, locker_id, fields):
+        return self._send(locker_id, fields)
+
+    def _send(self, locker_id, request):
+        if locker_id in self.errors:
+            raise self.errors[locker_id]
+        self.sent.append((locker_id, request))
+        return {"lockerId": locker_id}
+
+
+def test_commands_coalesce_while_pending(outbox):
+    first = outbox.enqueue("a", KIND_COMMAND, {"command": "lock"})
+    assert outbox.enqueue("a", KIND_COMMAND, {"command": "unlock"}) == first
+    assert outbox.enqueue("a", KIND_COMMAND, {"command": "lock"}) == first
+    entries = outbox.entries()
+    assert [(entry["id"], entry["payload"]) for entry in entries] == [(first, {"command": "lock"})]
+
+
+def test_updates_merge_while_pending(outbox):
+    first = outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "on"})
+    assert outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "off", "name": "Dock"}) == first
+    assert outbox.entries()[0]["payload"] == {"lightStatus": "off", "name": "Dock"}
+
+
+def test_no_coalescing_across_kinds(outbox):
+    command = outbox.enqueue("a", KIND_COMMAND, {"command": "lock"})
+    update = outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "on"})
+    # Only the newest entry of the locker may absorb a new one, so the order of kinds is kept
+    assert outbox.enqueue("a", KIND_COMMAND, {"command": "unlock"}) not in (command, update)
+    assert len(outbox.entries()) == 3
+
+
+def test_in_flight_entries_are_not_changed(outbox):
+    update = outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "on"})
+    [taken] = outbox.take_batch(now=NOW)
+    assert taken["id"] == update
+    # The update being sent is left alone; the new one waits behind it
+    assert outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "off"}) != update
+    assert [entry["payload"] for entry in outbox.entries()] == [{"lightStatus": "on"}, {"lightStatus": "off"}]
+    assert outbox.take_batch(now=NOW) == []
+
+
+def test_enqueue_many_coalesces_within_the_batch(outbox):
+    ids = outbox.enqueue_many([lock("a"), lock("b"), ("a", KIND_COMMAND, {"command": "unlock"})])
+    assert ids[0] == ids[2] != ids[1]
+    assert outbox.expected() == {"a": {"status": "unlocked"}, "b": {"status": "locked"}}
+
+
+def test_take_batch_sends_one_entry_per_locker_in_order(outbox):
+    first = outbox.enqueue("a", KIND_COMMAND, {"command": "lock"})
+    second = outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "on"})
+    other = outbox.enqueue("b", KIND_COMMAND, {"command": "unlock"})
+    assert [entry["id"] for entry in outbox.take_batch(now=NOW)] == [first, other]
+    assert outbox.take_batch(now=NOW) == []
+    assert outbox.counts() == {STATE_PENDING: 1, STATE_SENDING: 2, STATE_FAILED: 0}
+    outbox.complete([first])
+    assert [entry["id"] for entry in outbox.take_batch(now=NOW)] == [second]
+
+
+def test_retry_later_backs_off(outbox, monkeypatch):
+    monkeypatch.setattr(command_outbox.random, "uniform", lambda low, high: high)
+    outbox.enqueue_many([lock("a")])
+    due = NOW
+    for attempts in range(1, 5):
+        [entry] = outbox.take_batch(now=due)
+        outbox.retry_later(entry, "timed out", now=due)
+        [entry] = outbox.entries()
+        assert entry["state"] == STATE_PENDING
+        assert entry["attempts"] == attempts
+        assert entry["nextAttempt"] == due + RETRY_BASE_DELAY * 2 ** (attempts - 1)
+        assert entry["error"] == "timed out"
+        # Not due until the delay has passed
+        assert outbox.take_batch(now=entry["nextAttempt"] - 1) == []
+        due = entry["nextAttempt"]
+    # The API answered again, so the entry is due right away
+    assert outbox.wake() == 1
+    assert outbox.take_batch(now=NOW)
+
+
+@pytest.mark.parametrize("attempts", [1, 2, 5, 8, 20])
+def test_retry_delay_is_jittered_and_capped(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    for _ in range(50):
+        assert delay / 2 <= retry_delay(attempts) <= delay
+
+
+def test_fail_and_retry_failed(outbox):
+    outbox.enqueue_many([lock("a"), lock("b")])
+    entry = outbox.take_batch(now=NOW)[0]
+    outbox.fail(entry, "400 rejected")
+    outbox.release([e["id"] for e in outbox.entries() if e["state"] == STATE_SENDING])
+    failed = next(e for e in outbox.entries() if e["state"] == STATE_FAILED)
+    assert (failed["lockerId"], failed["attempts"], failed["error"]) == ("a", 1, "400 rejected")
+    # A failed entry is not active, expected or taken, and new entries don't merge into it
+    assert not outbox.has_active("a")
+    assert outbox.expected() == {"b": {"status": "locked"}}
+    assert outbox.enqueue("a", KIND_COMMAND, {"command": "lock"}) != failed["id"]
+    assert outbox.retry_failed() == 1
+    assert outbox.counts() == {STATE_PENDING: 3, STATE_SENDING: 0, STATE_FAILED: 0}
+    assert outbox.entries()[0]["attempts"] == 0
+
+
+def test_discard_failed(outbox):
+    outbox.enqueue_many([lock("a"), lock("b")])
+    entry = outbox.take_batch(now=NOW)[0]
+    outbox.fail(entry, "400 rejected")
+    assert outbox.discard_failed() == 1
+    assert [e["lockerId"] for e in outbox.entries()] == ["b"]
+
+
+def test_sending_entries_are_recovered_after_restart(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    outbox = CommandOutbox(path)
+    outbox.enqueue_many([lock("a"), lock("b")])
+    outbox.take_batch(now=NOW)
+    outbox.close()
+    reopened = CommandOutbox(path)
+    try:
+        assert reopened.counts() == {STATE_PENDING: 2, STATE_SENDING: 0, STATE_FAILED: 0}
+        assert [entry["lockerId"] for entry in reopened.take_batch(now=NOW)] == ["a", "b"]
+    finally:
+        reopened.close()
+
+
+def test_expected_merges_later_entries(outbox):
+    outbox.enqueue("a", KIND_COMMAND, {"command": "lock"})
+    outbox.enqueue("a", KIND_UPDATE, {"lightStatus": "on"})
+    outbox.enqueue("a", KIND_COMMAND, {"command": "unlock"})
+    outbox.enqueue("b", KIND_UPDATE, {"status": "maintenance"})
+    assert outbox.expected("a") == {"a": {"status": "unlocked", "lightStatus": "on"}}
+    assert outbox.expected() == {"a": {"status": "unlocked", "lightStatus": "on"}, "b": {"status": "maintenance"}}
+    assert outbox.expected("c") == {}
+
+
+def test_flush_sorts_outcomes(outbox):
+    outbox.enqueue_many([lock("ok"), lock("rejected")])
+    client = FakeClient({"rejected": http_error(400)})
+    summary = flush_outbox(outbox, client)
+    assert [entry["lockerId"] for entry, _ in summary["sent"]] == ["ok"]
+    assert [entry["lockerId"] for entry, _ in summary["failed"]] == ["rejected"]
+    assert summary["retrying"] == []
+    assert [(e["lockerId"], e["state"]) for e in outbox.entries()] == [("rejected", STATE_FAILED)]
+
+
+@pytest.mark.parametrize("error", [requests.ConnectionError("down"), requests.Timeout("slow"), http_error(503), http_error(429)])
+def test_flush_backs_off_when_the_api_is_unreachable(outbox, error):
+    outbox.enqueue_many([lock("down"), lock("ok")])
+    outbox.enqueue("ok", KIND_UPDATE, {"lightStatus": "on"})
+    summary = flush_outbox(outbox, FakeClient({"down": error}))
+    assert [entry["lockerId"] for entry, _ in summary["retrying"]] == ["down"]
+    # The flush stops after the round that hit the error, leaving the next entry for later
+    assert [entry["lockerId"] for entry, _ in summary["sent"]] == ["ok"]
+    assert [(e["lockerId"], e["state"], e["attempts"]) for e in outbox.entries()] == [
+        ("down", STATE_PENDING, 1), ("ok", STATE_PENDING, 0)
+    ]
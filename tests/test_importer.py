@@ -0,0 +1,36 @@
+import pytest
+from api_client import STATUS_VALUES, LIGHT_STATUS_VALUES
+from importer import parse_row
+
+
+@pytest.mark.parametrize("status", STATUS_VALUES)
+@pytest.mark.parametrize("light_status", LIGHT_STATUS_VALUES)
+def test_parse_row_accepts_api_values(status, light_status):
+    record = {"lockerId": " LKR0000001 ", "status": status, "lightStatus": light_status, "batteryPercentage": "42"}
+    assert parse_row(record) == ("LKR0000001", {"status": status, "lightStatus": light_status, "batteryPercentage": 42.0})
+
+
+@pytest.mark.parametrize("field, value", [
+    ("status", "open"),
+    ("status", "Locked"),
+    ("status", True),
+    ("lightStatus", "blinking"),
+    ("lightStatus", 1),
+    ("batteryPercentage", "full"),
+    ("batteryPercentage", 101),
+    ("batteryPercentage", True),
+    ("latitude", -91),
+    ("longitude", 180.5),
+])
+def test_parse_row_rejects_invalid_values(field, value):
+    with pytest.raises(ValueError, match=field):
+        parse_row({"lockerId": "LKR0000001", field: value})
+
+
+def test_parse_row_skips_blank_cells():
+    assert parse_row({"lockerId": "LKR0000001", "status": "", "lightStatus": "  "}) == ("LKR0000001", {})
+
+
+def test_parse_row_requires_locker_id():
+    with pytest.raises(ValueError, match="lockerId"):
+        parse_row({"status": "locked"})
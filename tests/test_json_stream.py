@@ -0,0 +1,63 @@
+import io
+import json
+import pytest
+from json_stream import JsonArrayReader, read_chunks
+
+LOCKERS = [
+    {"lockerId": "LKR0000001", "status": "locked", "batteryPercentage": 87, "latitude": -33.8688, "longitude": 151.2093},
+    {"lockerId": "quote \" and \\ backslash", "name": "comma, ] bracket } brace [", "note": "tab\tline\nbreak é中\U0001f512"},
+    {"lockerId": "nested", "meta": {"tags": ["a", {"b": [1, 2.5e3, -0.125]}], "empty": {}, "none": []}, "flags": [True, False, None]},
+    12345678901234567890,
+    -1.5e-7,
+    "",
+    [],
+    {},
+]
+DOCUMENT = {"success": True, "count": len(LOCKERS), "lockers": LOCKERS, "meta": {"etag": "\"v1\"", "page": [1, 2]}}
+PAYLOAD = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode("utf-8")
+
+
+def read(chunks, key="lockers"):
+    reader = JsonArrayReader(chunks, key=key)
+    return list(reader), reader
+
+
+@pytest.mark.parametrize("offset", range(len(PAYLOAD) + 1))
+def test_split_at_every_offset(offset):
+    items, reader = read([PAYLOAD[:offset], PAYLOAD[offset:]])
+    assert items == LOCKERS
+    assert reader.found
+    assert reader.members == {key: value for key, value in DOCUMENT.items() if key != "lockers"}
+
+
+def test_one_byte_chunks():
+    items, reader = read(PAYLOAD[i:i + 1] for i in range(len(PAYLOAD)))
+    assert items == LOCKERS
+    assert reader.members["meta"] == DOCUMENT["meta"]
+
+
+def test_str_chunks():
+    text = PAYLOAD.decode("utf-8")
+    items, _ = read(text[i:i + 7] for i in range(0, len(text), 7))
+    assert items == LOCKERS
+
+
+def test_bare_array_with_bom_from_a_file():
+    payload = b"\xef\xbb\xbf" + json.dumps(LOCKERS).encode("utf-8")
+    items, reader = read(read_chunks(io.BytesIO(payload), size=3), key=None)
+    assert items == LOCKERS
+    assert reader.found
+
+
+@pytest.mark.parametrize("document, found", [({"success": True, "lockers": []}, True), ({"success": False, "error": "x"}, False), ({}, False)])
+def test_empty_or_missing_array(document, found):
+    items, reader = read([json.dumps(document).encode()])
+    assert items == []
+    assert reader.found == found
+    assert reader.members == {key: value for key, value in document.items() if key != "lockers"}
+
+
+@pytest.mark.parametrize("payload", [b'{"lockers": [1, 2', b'{"lockers": [{"a": "b"', b'[1 2]', b'{"lockers": [1], 3: 4}', b""])
+def test_malformed_input_raises(payload):
+    with pytest.raises(ValueError):
+        read([payload])
@@ -0,0 +1,133 @@
+import time
+from types import SimpleNamespace
+import pytest
+from locker_filter import LockerFilterProxyModel, LockerFilter, SEARCH_PREFIX
+
+
+def locker(number, battery=None, status="locked", prefix="A"):
+    return {
+        "lockerId": f"{prefix}{number:03d}", "batteryPercentage": number if battery is None else battery,
+        "status": status, "lightStatus": "on",
+    }
+
+
+@pytest.fixture
+def model(qapp):
+    from locker_table import LockerTableModel
+    model = LockerTableModel()
+    model.apply_lockers([locker(number, status="locked" if number % 2 else "unlocked") for number in range(40)])
+    return model
+
+
+def proxy_for(model, locker_filter=None, sort_key=None):
+    proxy = LockerFilterProxyModel()
+    proxy.setSourceModel(model)
+    if locker_filter is not None:
+        proxy.set_filter(locker_filter)
+    if sort_key is not None:
+        proxy.set_sort_key(sort_key)
+    return proxy
+
+
+def proxy_ids(proxy):
+    store = proxy.sourceModel().store
+    return [store.ids[proxy.mapToSource(proxy.index(row, 0)).row()] for row in range(proxy.rowCount())]
+
+
+def expected_ids(store, locker_filter, sort_key=None):
+    proxy = LockerFilterProxyModel()
+    rows = [row for row in range(len(store)) if proxy_matches(proxy, store, locker_filter, row)]
+    if sort_key is not None:
+        keys = sort_key(store)
+        rows.sort(key=keys.__getitem__)
+    return [store.ids[row] for row in rows]
+
+
+def proxy_matches(proxy, store, locker_filter, row):
+    proxy.store, proxy.filter = store, locker_filter
+    return proxy.matches(row)
+
+
+def battery_descending(store):
+    return [-battery for battery in store.battery]
+
+
+def count_signals(proxy):
+    counts = {"reset": 0, "inserted": 0, "removed": 0}
+    proxy.modelReset.connect(lambda: counts.__setitem__("reset", counts["reset"] + 1))
+    proxy.rowsInserted.connect(lambda *args: counts.__setitem__("inserted", counts["inserted"] + 1))
+    proxy.rowsRemoved.connect(lambda *args: counts.__setitem__("removed", counts["removed"] + 1))
+    return counts
+
+
+def test_sorted_prefix_filter_survives_removal(model):
+    prefix_filter = LockerFilter(text="A0", mode=SEARCH_PREFIX)
+    proxy = proxy_for(model, prefix_filter, battery_descending)
+    model.remove_locker("A001")
+    assert proxy_ids(proxy) == expected_ids(model.store, prefix_filter, battery_descending)
+    # Several scattered ranges in one refresh
+    model.apply_lockers([locker(number) for number in range(40) if number % 7])
+    assert proxy_ids(proxy) == expected_ids(model.store, prefix_filter, battery_descending)
+    assert "A000" not in proxy_ids(proxy)
+
+
+def test_filtered_insert_appends_matching_rows(model):
+    locked = LockerFilter(status="locked")
+    proxy = proxy_for(model, locked)
+    counts = count_signals(proxy)
+    model.upsert_locker(locker(41, status="locked"))
+    model.upsert_locker(locker(42, status="unlocked"))
+    assert counts == {"reset": 0, "inserted": 1, "removed": 0}
+    assert proxy_ids(proxy) == expected_ids(model.store, locked)
+    assert proxy_ids(proxy)[-1] == "A041"
+
+
+def test_filtered_remove_shifts_rows(model):
+    locked = LockerFilter(status="locked")
+    proxy = proxy_for(model, locked)
+    counts = count_signals(proxy)
+    model.remove_locker("A003")
+    model.remove_locker("A004")
+    assert counts == {"reset": 0, "inserted": 0, "removed": 1}
+    assert proxy_ids(proxy) == expected_ids(model.store, locked)
+
+
+def test_data_changed_shows_and_hides_rows(model):
+    locked = LockerFilter(status="locked")
+    proxy = proxy_for(model, locked)
+    counts = count_signals(proxy)
+    model.upsert_locker(locker(2, status="locked"))
+    model.upsert_locker(locker(5, status="unlocked"))
+    assert counts == {"reset": 0, "inserted": 1, "removed": 1}
+    assert proxy_ids(proxy) == expected_ids(model.store, locked)
+
+
+def test_sorted_proxy_ignores_rows_that_stay_hidden(model):
+    locked = LockerFilter(status="locked")
+    proxy = proxy_for(model, locked, battery_descending)
+    counts = count_signals(proxy)
+    model.upsert_locker(locker(2, battery=99, status="unlocked"))
+    assert counts["reset"] == 0
+    model.upsert_locker(locker(2, battery=99, status="locked"))
+    assert counts["reset"] == 1
+    assert proxy_ids(proxy) == expected_ids(model.store, locked, battery_descending)
+    assert proxy_ids(proxy)[0] == "A002"
+
+
+def test_drain_sort_puts_soonest_empty_first(model):
+    from telemetry import TelemetryHistory
+    from main import LockerApp
+    history = TelemetryHistory()
+    store = model.store
+    started = time.time() - 4 * 3600
+    # A010 drains 4 points an hour, A020 1 point an hour, A030 is steady and the rest have no history
+    for hour in range(4):
+        model.upsert_locker(locker(10, battery=50 - 4 * hour))
+        model.upsert_locker(locker(20, battery=50 - hour))
+        history.record_store(store, now=started + hour * 3600, rows=[store.row_of("A010"), store.row_of("A020"), store.row_of("A030")])
+    app = SimpleNamespace(telemetry=history)
+    proxy = proxy_for(model, sort_key=lambda store: LockerApp.drain_sort_keys(app, store))
+    ids = proxy_ids(proxy)
+    assert ids[:2] == ["A010", "A020"]
+    # Lockers without a forecast keep source order after the draining ones
+    assert ids[2:] == [locker_id for locker_id in store.ids if locker_id not in ("A010", "A020")]
@@ -0,0 +1,192 @@
+import random
+import pytest
+from locker_store import LockerStore, LockerSnapshot, battery_bucket, bits_to_rows, rows_to_bits
+
+STATUSES = ("locked", "unlocked", "maintenance")
+LIGHTS = ("on", "off")
+
+
+def make_locker(number, rng):
+    return {
+        "lockerId": f"LKR{number:07d}",
+        "status": rng.choice(STATUSES),
+        "lightStatus": rng.choice(LIGHTS),
+        "batteryPercentage": rng.randint(0, 100),
+        "latitude": rng.uniform(-60, 60),
+        "longitude": rng.uniform(-180, 180),
+    }
+
+
+def expected_bitsets(store):
+    # Bitsets built from scratch out of the columns, for checking the patched ones
+    rebuilt = LockerStore()
+    rebuilt._copy_columns_from(store)
+    return {key: bits for key, bits in rebuilt.bitsets().items() if bits}
+
+
+def assert_consistent(store):
+    assert {key: bits for key, bits in store.bitsets().items() if bits} == expected_bitsets(store)
+    assert {locker_id: row for row, locker_id in enumerate(store.ids)} == store._row_of
+    assert store.status_values() == sorted(set(value for value in store.status if value is not None))
+    assert store.light_status_values() == sorted(set(value for value in store.light_status if value is not None))
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(12)
+    store = LockerStore()
+    for number in range(200):
+        store.upsert(make_locker(number, rng))
+    return store
+
+
+def test_bits_round_trip():
+    rows = [0, 3, 7, 8, 63, 64, 200]
+    assert bits_to_rows(rows_to_bits(rows, 201)) == rows
+    assert bits_to_rows(0) == []
+
+
+@pytest.mark.parametrize("battery, bucket", [(0, 0), (9.9, 0), (10, 1), (55, 5), (100, 10), (120, 10), (-5, 0), (float("nan"), None)])
+def test_battery_bucket(battery, bucket):
+    assert battery_bucket(battery) == bucket
+
+
+def test_bitset_queries_match_columns(store):
+    locked = [row for row, status in enumerate(store.status) if status == "locked"]
+    assert bits_to_rows(store.status_bits("locked")) == locked
+    lit = [row for row, light in enumerate(store.light_status) if light == "on"]
+    assert bits_to_rows(store.light_status_bits("on")) == lit
+    low = [row for row, battery in enumerate(store.battery) if battery < 30]
+    assert bits_to_rows(store.battery_bits(0, 2)) == low
+    combined = bits_to_rows(store.status_bits("locked") & store.light_status_bits("on"))
+    assert combined == sorted(set(locked) & set(lit))
+    assert store.status_bits("missing") == 0
+
+
+def test_upsert_patches_indexes(store):
+    store.bitsets()
+    locker = store.get("LKR0000005")
+    row = store.row_of("LKR0000005")
+    new_status = next(status for status in STATUSES if status != locker["status"])
+    updated = dict(locker, status=new_status, batteryPercentage=(locker["batteryPercentage"] + 50) % 101)
+    assert store.upsert(updated) == (row, locker, True)
+    assert store.status_bits(new_status) >> row & 1
+    assert not store.status_bits(locker["status"]) >> row & 1
+    assert_consistent(store)
+
+
+def test_unchanged_upsert_reports_no_change(store):
+    locker = store.get("LKR0000010")
+    assert store.upsert(dict(locker)) == (store.row_of("LKR0000010"), None, False)
+
+
+def test_appended_rows_merge_into_built_bitsets(store):
+    store.bitsets()
+    rng = random.Random(5)
+    for number in range(200, 260):
+        store.upsert(make_locker(number, rng))
+    assert_consistent(store)
+
+
+def test_new_status_values_are_listed():
+    store = LockerStore()
+    store.upsert({"lockerId": "a", "status": "locked", "lightStatus": "off"})
+    store.upsert({"lockerId": "b", "status": "offline"})
+    assert store.status_values() == ["locked", "offline"]
+    store.upsert({"lockerId": "b", "status": "locked"})
+    assert store.status_values() == ["locked"]
+    assert store.light_status_values() == ["off"]
+
+
+@pytest.mark.parametrize("start, end", [(0, 0), (0, 9), (50, 120), (199, 199), (190, 199)])
+def test_remove_range_shifts_bitsets(store, start, end):
+    store.bitsets()
+    removed = store.ids[start:end + 1]
+    store.remove_range(start, end)
+    assert len(store) == 200 - (end - start + 1)
+    assert not any(locker_id in store for locker_id in removed)
+    assert_consistent(store)
+
+
+def test_remove_ranges_bottom_up_then_reindex(store):
+    store.bitsets()
+    rng = random.Random(3)
+    kept = list(store.ids)
+    ranges = [(150, 170), (90, 90), (20, 45), (3, 7)]
+    for start, end in ranges:
+        store.remove_range(start, end, reindex=False)
+        del kept[start:end + 1]
+    store.reindex_from(min(start for start, _ in ranges))
+    assert store.ids == kept
+    assert_consistent(store)
+    # The store keeps working after the removal
+    store.upsert(make_locker(999, rng))
+    store.upsert(dict(store.get(kept[0]), status="maintenance"))
+    assert_consistent(store)
+
+
+def test_take_changed(store):
+    assert len(store.take_changed()) == 200
+    assert store.take_changed() == set()
+    store.upsert(dict(store.get("LKR0000001"), lightStatus="blinking"))
+    store.upsert(dict(store.get("LKR0000002")))
+    store.upsert({"lockerId": "LKR0000300", "status": "locked"})
+    assert store.take_changed() == {"LKR0000001", "LKR0000300"}
+    # A removed locker is no longer reported as changed
+    store.upsert(dict(store.get("LKR0000003"), lightStatus="blinking"))
+    store.remove_range(store.row_of("LKR0000003"), store.row_of("LKR0000003"))
+    assert store.take_changed() == set()
+
+
+def test_coords_version(store):
+    version = store.coords_version
+    store.upsert(dict(store.get("LKR0000001"), batteryPercentage=101))
+    assert store.coords_version == version
+    store.upsert(dict(store.get("LKR0000001"), latitude=1.5))
+    assert store.coords_version == version + 1
+    store.remove_range(0, 0)
+    assert store.coords_version == version + 2
+
+
+def test_record_round_trip_keeps_payload():
+    store = LockerStore()
+    lockers = [
+        {"lockerId": "a", "status": "locked", "lightStatus": "on", "batteryPercentage": 42, "latitude": 1.25, "longitude": -3.5},
+        {"lockerId": "b", "batteryPercentage": 37.5, "name": "Dock", "tags": ["x"]},
+        # Values that don't fit their typed column stay verbatim
+        {"lockerId": "c", "status": 3, "batteryPercentage": "n/a"},
+    ]
+    for locker in lockers:
+        store.upsert(locker)
+    assert list(store.records()) == lockers
+    # A null coordinate reads back as missing
+    store.upsert({"lockerId": "d", "latitude": None})
+    assert store.get("d") == {"lockerId": "d"}
+    assert store.get("missing") is None
+
+
+def test_snapshot_is_frozen(store):
+    snapshot = store.snapshot()
+    before = list(snapshot)
+    store.upsert(dict(store.get("LKR0000000"), status="maintenance", batteryPercentage=1))
+    store.remove_range(10, 20)
+    store.upsert({"lockerId": "LKR0000500"})
+    assert len(snapshot) == 200
+    assert list(snapshot) == before
+    assert snapshot[5] == before[5]
+    assert snapshot[198:] == before[198:]
+    assert snapshot.get("LKR0000015") == before[15]
+
+
+def test_snapshot_without_copy_builds_its_index():
+    decoded = LockerStore()
+    decoded.ids = ["x", "y"]
+    decoded.status = ["locked", None]
+    decoded.light_status = [None, "off"]
+    decoded.battery.extend([5.0, float("nan")])
+    decoded.latitude.extend([float("nan")] * 2)
+    decoded.longitude.extend([float("nan")] * 2)
+    decoded.extras = [None, {"name": "Y"}]
+    snapshot = LockerSnapshot(decoded, copy=False)
+    assert snapshot.get("y") == {"lockerId": "y", "lightStatus": "off", "name": "Y"}
+    assert snapshot.get("x") == {"lockerId": "x", "status": "locked", "batteryPercentage": 5}
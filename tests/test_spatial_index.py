@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from spatial_index import SpatialIndex, haversine_m
+
+
+@pytest.fixture
+def fleet():
+    rng = np.random.default_rng(14)
+    latitudes = rng.uniform(-85, 85, 20000)
+    longitudes = rng.uniform(-180, 180, 20000)
+    return rng, latitudes, longitudes, SpatialIndex(latitudes, longitudes)
+
+
+@pytest.mark.parametrize("meters", [50_000, 200_000, 500_000, 2_000_000, 8_000_000])
+def test_within_radius_matches_brute_force(fleet, meters):
+    rng, latitudes, longitudes, index = fleet
+    for latitude, longitude in zip(rng.uniform(-89, 89, 100), rng.uniform(-180, 180, 100)):
+        rows, distances = index.within_radius(latitude, longitude, meters)
+        expected = np.flatnonzero(haversine_m(latitude, longitude, latitudes, longitudes) <= meters)
+        assert sorted(rows.tolist()) == expected.tolist()
+        assert np.all(np.diff(distances) >= 0)
+
+
+def test_nearest_matches_brute_force(fleet):
+    rng, latitudes, longitudes, index = fleet
+    for latitude, longitude in zip(rng.uniform(-89, 89, 50), rng.uniform(-180, 180, 50)):
+        rows, distances = index.nearest(latitude, longitude, 25)
+        expected = np.sort(haversine_m(latitude, longitude, latitudes, longitudes))[:25]
+        assert np.allclose(distances, expected)
@@ -0,0 +1,95 @@
+import csv
+import math
+import numpy as np
+import pytest
+from locker_store import LockerStore
+from telemetry import TelemetryHistory, SAMPLE_INTERVAL, FORECAST_WINDOW
+
+NOW = 1_800_000_000
+HOUR = 3600
+
+
+def record(history, store, locker_id, battery, now, status="locked"):
+    store.upsert({"lockerId": locker_id, "batteryPercentage": battery, "status": status, "lightStatus": "off"})
+    return history.record_store(store, now=now)
+
+
+def test_ring_wraps_around_keeping_the_newest_samples():
+    history, store = TelemetryHistory(capacity=4, initial_slots=2), LockerStore()
+    for step in range(7):
+        record(history, store, "a", 90 - step, NOW + step)
+    times, battery, status, light = history.series("a")
+    assert times.tolist() == [NOW + 3, NOW + 4, NOW + 5, NOW + 6]
+    assert battery.tolist() == [87, 86, 85, 84]
+    assert status == ["locked"] * 4 and light == ["off"] * 4
+
+
+def test_full_ring_spills_its_oldest_samples(tmp_path):
+    spill = tmp_path / "spill.csv"
+    history, store = TelemetryHistory(capacity=3, spill_path=str(spill)), LockerStore()
+    for step in range(5):
+        record(history, store, "a", 50 + step, NOW + step, status="locked" if step % 2 else "unlocked")
+    with open(spill, newline="", encoding="utf-8") as spill_file:
+        rows = list(csv.reader(spill_file))
+    assert rows == [["a", str(NOW), "50.0", "unlocked", "off"], ["a", str(NOW + 1), "51.0", "locked", "off"]]
+    assert history.series("a")[1].tolist() == [52, 53, 54]
+
+
+def test_unchanged_locker_is_sampled_once_per_interval():
+    history, store = TelemetryHistory(), LockerStore()
+    assert record(history, store, "a", 80, NOW) == 1
+    assert record(history, store, "a", 80, NOW + SAMPLE_INTERVAL - 1) == 0
+    assert record(history, store, "a", 80, NOW + SAMPLE_INTERVAL) == 1
+    assert record(history, store, "a", 79, NOW + SAMPLE_INTERVAL + 1) == 1
+    assert record(history, store, "a", 79, NOW + SAMPLE_INTERVAL + 2, status="unlocked") == 1
+    assert len(history.series("a")[0]) == 4
+
+
+def test_removed_slot_is_reused_empty():
+    history, store = TelemetryHistory(initial_slots=1), LockerStore()
+    record(history, store, "a", 80, NOW)
+    history.remove(["a"])
+    store.clear()
+    record(history, store, "b", 60, NOW + 1)
+    assert len(history) == 1
+    assert history.series("a")[0].size == 0
+    assert history.series("b")[1].tolist() == [60]
+
+
+def test_forecast_extrapolates_the_drain():
+    history, store = TelemetryHistory(), LockerStore()
+    # 2% per hour for six hours, ending at 50%
+    for hour in range(7):
+        record(history, store, "drain", 62 - 2 * hour, NOW - (6 - hour) * HOUR)
+        record(history, store, "flat", 70, NOW - (6 - hour) * HOUR)
+        record(history, store, "charge", 40 + hour, NOW - (6 - hour) * HOUR)
+    hours = history.hours_to_empty(store, now=NOW)
+    assert hours[store.row_of("drain")] == pytest.approx(25)
+    assert hours[store.row_of("flat")] == math.inf
+    assert hours[store.row_of("charge")] == math.inf
+    assert history.hours_left("drain", 50, now=NOW) == pytest.approx(25)
+    assert history.hours_left("missing", 50, now=NOW) is None
+
+
+def test_forecast_needs_enough_recent_samples():
+    history, store = TelemetryHistory(), LockerStore()
+    record(history, store, "a", 80, NOW - 2 * HOUR)
+    record(history, store, "a", 78, NOW - HOUR)
+    assert np.isnan(history.hours_to_empty(store, now=NOW)[0])
+    # Samples older than the window don't count either
+    history, store = TelemetryHistory(), LockerStore()
+    for hour in range(5):
+        record(history, store, "a", 90 - hour, NOW - FORECAST_WINDOW - (5 - hour) * HOUR)
+    record(history, store, "a", 60, NOW - HOUR)
+    record(history, store, "a", 58, NOW)
+    assert np.isnan(history.hours_to_empty(store, now=NOW)[0])
+
+
+def test_forecast_uses_only_the_window_after_wraparound():
+    history, store = TelemetryHistory(capacity=5), LockerStore()
+    # A fast drain that has been pushed out of the ring, then a slow one
+    for hour in range(5):
+        record(history, store, "a", 100 - 10 * hour, NOW - (14 - hour) * HOUR)
+    for hour in range(5):
+        record(history, store, "a", 44 - hour, NOW - (4 - hour) * HOUR)
+    assert history.hours_left("a", 40, now=NOW) == pytest.approx(40)